@@ -12,7 +12,7 @@ import enum
 import logging
 from functools import reduce
 from operator import itemgetter
-from typing import Dict, Mapping, Tuple
+from typing import Dict, Mapping, Optional, Tuple
 
 import networkx as nx
 
@@ -25,6 +25,7 @@ from pybel.constants import (
 )
 from pybel.typing import EdgeData
 from ..summary.contradictions import pair_has_contradiction
+from ..summary.pair_relations import PairRelationIndex, build_pair_relation_index
 from ..utils import pairwise
 
 __all__ = [
@@ -163,6 +164,7 @@ def run_cna(graph: BELGraph, root: BaseEntity, targets, relationship_dict=None):
     causal_effects = []
 
     relationship_dict = causal_effect_dict if relationship_dict is None else relationship_dict
+    pair_index = build_pair_relation_index(graph)
 
     for target in targets:
         try:
@@ -171,7 +173,7 @@ def run_cna(graph: BELGraph, root: BaseEntity, targets, relationship_dict=None):
             effects_in_path = set()
 
             for shortest_path in shortest_paths:
-                effects_in_path.add(get_path_effect(graph, shortest_path, relationship_dict))
+                effects_in_path.add(get_path_effect(graph, shortest_path, relationship_dict, pair_index=pair_index))
 
             if len(effects_in_path) == 1:
                 causal_effects.append((root, target, next(iter(effects_in_path))))  # Append the only predicted effect
@@ -194,17 +196,23 @@ def run_cna(graph: BELGraph, root: BaseEntity, targets, relationship_dict=None):
     return causal_effects
 
 
-def get_path_effect(graph: BELGraph, path, relationship_dict) -> Effect:
+def get_path_effect(
+    graph: BELGraph,
+    path,
+    relationship_dict,
+    pair_index: Optional[PairRelationIndex] = None,
+) -> Effect:
     """Calculate the final effect of the root node to the sink node in the path.
 
     :param graph: A BEL graph
     :param list path: Path from root to sink node
     :param dict relationship_dict: dictionary with relationship effects
+    :param pair_index: A pre-computed index from :func:`pybel_tools.summary.build_pair_relation_index`
     """
     causal_effect = []
 
     for predecessor, successor in pairwise(path):
-        if pair_has_contradiction(graph, predecessor, successor):
+        if pair_has_contradiction(graph, predecessor, successor, pair_index=pair_index):
             return Effect.ambiguous
 
         edges = graph.get_edge_data(predecessor, successor)
@@ -6,11 +6,14 @@ from __future__ import annotations
 
 import enum
 import logging
+import os
 from collections import Counter
 from dataclasses import dataclass
 from functools import partial
 from typing import List, Mapping, Optional, Tuple
 
+import numpy as np
+
 from pybel import BELGraph, BaseEntity
 from pybel.constants import (
     CAUSAL_DECREASE_RELATIONS, CAUSAL_INCREASE_RELATIONS, CAUSES_NO_CHANGE, NEGATIVE_CORRELATION, POSITIVE_CORRELATION,
@@ -18,6 +21,8 @@ from pybel.constants import (
 )
 from pybel.struct import get_subgraphs_by_annotation
 from pybel.struct.mutation import collapse_all_variants, collapse_to_genes
+from ..compiled import CompiledGraph, get_worker_snapshot, map_on_snapshot
+from ..integration.attribute_store import AttributeStore
 from ..mutation.random import random_by_edges, shuffle_node_data, shuffle_relations
 
 __all__ = [
@@ -27,6 +32,7 @@ __all__ = [
     'calculate_concordance',
     'calculate_concordance_by_annotation',
     'calculate_concordance_probability',
+    'calculate_concordance_probability_on_snapshot',
     'calculate_concordance_probability_by_annotation',
 ]
 
@@ -174,6 +180,8 @@ def calculate_concordance_helper(
     graph: BELGraph,
     key: str,
     cutoff: Optional[float] = None,
+    store: Optional[AttributeStore] = None,
+    compiled: Optional[CompiledGraph] = None,
 ) -> ConcordanceResult:
     """Help calculate network-wide concordance.
 
@@ -182,18 +190,100 @@ def calculate_concordance_helper(
     :param graph: A BEL graph
     :param key: The node data dictionary key storing the logFC
     :param cutoff: The optional logFC cutoff for significance
+    :param store: An optional attribute store for the graph whose node column with the given key is used instead of
+     the node data dictionaries. The concordance of all edges is then calculated at once on arrays.
+    :param compiled: An optional compiled snapshot of the graph, from :func:`pybel_tools.compiled.compile_graph`.
+     The concordance of all edges is then calculated at once on its arrays.
     """
+    if store is not None:
+        source_values, target_values = store.get_edge_endpoint_vectors(key)
+        relation_signs = np.array([
+            _RELATION_SIGNS.get(store.graph[u][v][k][RELATION], np.nan)
+            for u, v, k in store.edges.keys
+        ], dtype=float)
+        return _calculate_concordance_vectorized(source_values, target_values, relation_signs, cutoff=cutoff)
+
+    if compiled is not None:
+        return _calculate_concordance_on_compiled(compiled, compiled.get_node_vector(graph, key), cutoff=cutoff)
+
     return ConcordanceResult.from_iterable(
         edge_concords(graph, u, v, k, key, cutoff=cutoff)
         for u, v, k, d in graph.edges(keys=True, data=True)
     )
 
 
+_RELATION_SIGNS = {
+    **{relation: 1 for relation in UP},
+    **{relation: -1 for relation in DOWN},
+    CAUSES_NO_CHANGE: 0,
+}
+
+
+def _calculate_concordance_on_compiled(
+    compiled: CompiledGraph,
+    node_values: np.ndarray,
+    cutoff: Optional[float] = None,
+) -> ConcordanceResult:
+    relation_signs = np.array([
+        _RELATION_SIGNS.get(relation, np.nan)
+        for relation in compiled.relation_names
+    ], dtype=float)
+    return _calculate_concordance_vectorized(
+        node_values[compiled.sources],
+        node_values[compiled.targets],
+        relation_signs[compiled.relations] if len(relation_signs) else np.zeros(0),
+        cutoff=cutoff,
+    )
+
+
+def _calculate_concordance_vectorized(
+    source_values: np.ndarray,
+    target_values: np.ndarray,
+    relation_signs: np.ndarray,
+    cutoff: Optional[float] = None,
+) -> ConcordanceResult:
+    """Calculate the concordance of all edges at once with the same rules as :func:`edge_concords`.
+
+    :param source_values: The values of the edges' sources, with NaN for missing values
+    :param target_values: The values of the edges' targets, with NaN for missing values
+    :param relation_signs: The signs of the edges' relations, with NaN for relations that can't be assigned
+    :param cutoff: The optional logFC cutoff for significance
+    """
+    cutoff = cutoff if cutoff is not None else 0
+
+    source_values = source_values.astype(float)
+    target_values = target_values.astype(float)
+    source_regulation = np.sign(source_values) * (np.abs(source_values) > cutoff)
+    target_regulation = np.sign(target_values) * (np.abs(target_values) > cutoff)
+
+    assigned = ~(np.isnan(source_values) | np.isnan(target_values) | np.isnan(relation_signs))
+    is_cnc = relation_signs == 0
+    source_nonzero = assigned & (source_regulation != 0)
+
+    correct = np.where(
+        is_cnc,
+        target_regulation == 0,
+        (target_regulation != 0) & (source_regulation * target_regulation == relation_signs),
+    )
+    correct_count = int((source_nonzero & correct).sum() + (assigned & ~source_nonzero & is_cnc & correct).sum())
+    incorrect_count = int((source_nonzero & ~correct).sum())
+    ambiguous_count = int((assigned & ~source_nonzero & ~(is_cnc & correct)).sum())
+
+    return ConcordanceResult(
+        correct=correct_count,
+        incorrect=incorrect_count,
+        ambiguous=ambiguous_count,
+        unassigned=len(relation_signs) - correct_count - incorrect_count - ambiguous_count,
+    )
+
+
 def calculate_concordance(
     graph: BELGraph,
     key: str,
     cutoff: Optional[float] = None,
     use_ambiguous: bool = False,
+    store: Optional[AttributeStore] = None,
+    compiled: Optional[CompiledGraph] = None,
 ) -> float:
     """Calculate the network-wide concordance.
 
@@ -203,11 +293,16 @@ def calculate_concordance(
     :param key: The node data dictionary key storing the logFC
     :param cutoff: The optional logFC cutoff for significance
     :param use_ambiguous: Compare to ambiguous edges as well
+    :param store: An optional attribute store for the graph to read the data from
+    :param compiled: An optional compiled snapshot of the graph, from :func:`pybel_tools.compiled.compile_graph`
     """
-    correct, incorrect, ambiguous, _ = calculate_concordance_helper(graph, key, cutoff=cutoff)
+    result = calculate_concordance_helper(graph, key, cutoff=cutoff, store=store, compiled=compiled)
+    return _get_concordance_score(result, use_ambiguous=use_ambiguous)
 
+
+def _get_concordance_score(result: ConcordanceResult, use_ambiguous: bool = False) -> float:
     try:
-        return correct / (correct + incorrect + (ambiguous if use_ambiguous else 0))
+        return result.correct / (result.correct + result.incorrect + (result.ambiguous if use_ambiguous else 0))
     except ZeroDivisionError:
         return -1.0
 
@@ -271,6 +366,88 @@ def calculate_concordance_probability(
     return score, null_distribution, one_sided_score
 
 
+def calculate_concordance_probability_on_snapshot(
+    directory: str,
+    key: str,
+    cutoff: Optional[float] = None,
+    permutations: Optional[int] = None,
+    percentage: Optional[float] = None,
+    use_ambiguous: bool = False,
+    seed: Optional[int] = None,
+    processes: Optional[int] = None,
+) -> ConcordanceTest:
+    """Calculate a snapshot's concordance and its probability by shuffling node data in a pool of processes.
+
+    This is the parallel version of :func:`calculate_concordance_probability` with the ``shuffle_node_data``
+    permutation. The permutations are split between the workers, which each memory-map the snapshot once.
+
+    :param directory: The directory of a snapshot from :func:`pybel_tools.compiled.save_snapshot` whose node columns
+     include the given key. Collapse the graph to genes before compiling it to match
+     :func:`calculate_concordance_probability`.
+    :param key: The node data column storing the logFC
+    :param cutoff: The optional logFC cutoff for significance
+    :param permutations: The number of random permutations to test. Defaults to 500
+    :param percentage: The percentage of the nodes with data to permute. Defaults to 0.3
+    :param use_ambiguous: Compare to ambiguous edges as well
+    :param seed: A seed for the random number generators
+    :param processes: The number of worker processes. Defaults to the number of CPUs.
+    :returns: A triple of the concordance score, the null distribution, and the p-value.
+    """
+    permutations = permutations or 500
+    number_chunks = min(permutations, processes or os.cpu_count() or 1)
+    # each permutation gets its own seed so the results don't depend on how they're split between the workers
+    seeds = np.random.SeedSequence(seed).spawn(permutations)
+    chunks = [seeds[i::number_chunks] for i in range(number_chunks)]
+
+    func = partial(
+        _concordance_permutations_on_worker,
+        key=key,
+        cutoff=cutoff,
+        percentage=percentage if percentage is not None else 0.3,
+        use_ambiguous=use_ambiguous,
+    )
+    # the first chunk has no permutations and only calculates the score of the unpermuted data
+    chunks = map_on_snapshot(directory, func, [[]] + chunks, processes=processes)
+
+    score = chunks[0][0]
+    null_distribution = [
+        value
+        for i in range(permutations)
+        for value in [chunks[1 + i % number_chunks][i // number_chunks]]
+    ]
+    return score, null_distribution, one_sided(score, null_distribution)
+
+
+def _concordance_permutations_on_worker(
+    seeds: List[np.random.SeedSequence],
+    key: str,
+    cutoff: Optional[float],
+    percentage: float,
+    use_ambiguous: bool,
+) -> List[float]:
+    compiled = get_worker_snapshot()
+
+    original = compiled.get_node_column(key)
+    present = np.flatnonzero(~np.isnan(original))
+    number_permuted = int(len(present) * percentage)
+
+    def _score(values: np.ndarray) -> float:
+        result = _calculate_concordance_on_compiled(compiled, values, cutoff=cutoff)
+        return _get_concordance_score(result, use_ambiguous=use_ambiguous)
+
+    if not seeds:
+        return [_score(original)]
+
+    rv = []
+    for seed in seeds:
+        rng = np.random.default_rng(seed)
+        values = original.copy()
+        positions = rng.choice(present, size=number_permuted, replace=False)
+        values[positions] = original[rng.permutation(positions)]
+        rv.append(_score(values))
+    return rv
+
+
 def calculate_concordance_by_annotation(
     graph: BELGraph,
     annotation: str,
@@ -61,27 +61,33 @@ brain imaging features, whose experiments often measure their correlation with t
 
 from __future__ import annotations
 
+import itertools as itt
 import logging
 import random
-from collections import defaultdict
+from collections import Counter, defaultdict
+from functools import partial
 from operator import itemgetter
-from typing import Any, Callable, Hashable, Iterable, List, Mapping, Optional, Set, Tuple, TypeVar
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional, Set, Tuple, TypeVar
 
 import numpy as np
 from scipy import stats
 from tqdm import tqdm, trange
 
 from pybel import BELGraph
-from pybel.constants import BIOPROCESS, CAUSAL_DECREASE_RELATIONS, CAUSAL_INCREASE_RELATIONS, RELATION
+from pybel.constants import (
+    BIOPROCESS, CAUSAL_DECREASE_RELATIONS, CAUSAL_INCREASE_RELATIONS, CAUSAL_RELATIONS, RELATION,
+)
 from pybel.dsl import BaseEntity
 from pybel.struct.filters import get_nodes_by_function
 from pybel.struct.grouping import get_subgraphs_by_annotation
+from ..compiled import CompiledGraph, get_worker_snapshot, load_snapshot, map_on_snapshot
 from ..generation import generate_bioprocess_mechanisms, generate_mechanism
 
 __all__ = [
     'RESULT_LABELS',
     'calculate_average_scores_on_graph',
     'calculate_average_scores_on_subgraphs',
+    'calculate_average_scores_on_snapshot',
     'workflow',
     'multirun',
     'workflow_aggregate',
@@ -110,7 +116,13 @@ RESULT_LABELS = [
 ]
 
 H = TypeVar('H', bound=Hashable)
-SubgraphScores = Mapping[H, Tuple[float, float, float, float, int, int]]
+ScoreTuple = Tuple[Optional[float], Optional[float], Optional[float], Optional[float], int, int]
+SubgraphScores = Mapping[H, ScoreTuple]
+
+#: An edge in a mechanism on a snapshot, as its source, its target, and the identifier of an edge between them
+ArrayEdge = Tuple[int, int, int]
+#: A mechanism on a snapshot, as its node identifiers and its edges
+ArrayMechanism = Tuple[List[int], List[ArrayEdge]]
 
 
 def calculate_average_scores_on_graph(
@@ -199,41 +211,255 @@ def calculate_average_scores_on_subgraphs(
         it = tqdm(it, **_tqdm_kwargs)
 
     for node, subgraph in it:
-        number_first_neighbors = subgraph.in_degree(node)
-        number_first_neighbors = 0 if isinstance(number_first_neighbors, dict) else number_first_neighbors
+        number_first_neighbors = subgraph.in_degree(node) if node in subgraph else 0
         mechanism_size = subgraph.number_of_nodes()
 
         runners = workflow(subgraph, node, key=key, tag=tag, default_score=default_score, runs=runs)
         scores = [runner.get_final_score() for runner in runners]
+        results[node] = _get_score_tuple(scores, number_first_neighbors, mechanism_size)
 
-        if 0 == len(scores):
-            results[node] = (
-                None,
-                None,
-                None,
-                None,
-                number_first_neighbors,
-                mechanism_size,
-            )
-            continue
-
-        scores = np.array(scores)
+    return results
 
-        average_score = np.average(scores)
-        score_std = np.std(scores)
-        med_score = np.median(scores)
-        chi_2_stat, norm_p = stats.normaltest(scores)
 
-        results[node] = (
-            average_score,
-            score_std,
-            norm_p,
-            med_score,
+def _get_score_tuple(scores: List[float], number_first_neighbors: int, mechanism_size: int) -> ScoreTuple:
+    if 0 == len(scores):
+        return (
+            None,
+            None,
+            None,
+            None,
             number_first_neighbors,
             mechanism_size,
         )
 
-    return results
+    scores = np.array(scores)
+
+    average_score = np.average(scores)
+    score_std = np.std(scores)
+    med_score = np.median(scores)
+    chi_2_stat, norm_p = stats.normaltest(scores)
+
+    return (
+        average_score,
+        score_std,
+        norm_p,
+        med_score,
+        number_first_neighbors,
+        mechanism_size,
+    )
+
+
+def calculate_average_scores_on_snapshot(
+    directory: str,
+    key: Optional[str] = None,
+    default_score: Optional[float] = None,
+    runs: Optional[int] = None,
+    processes: Optional[int] = None,
+) -> SubgraphScores:
+    """Calculate the scores over all biological processes in a snapshot in a pool of processes.
+
+    This is the parallel version of :func:`calculate_average_scores_on_graph`. There is one task for each biological
+    process. Its worker generates the candidate mechanism by walking the in-adjacency arrays of the memory-mapped
+    snapshot, then runs the heat diffusion on the mechanism's edge arrays, so no worker rebuilds the graph.
+
+    :param directory: The directory of a snapshot from :func:`pybel_tools.compiled.save_snapshot` whose node columns
+     include the experimental data
+    :param key: The node data column representing the experimental data. Defaults to 'weight'. If given, the
+     mechanisms are pruned of nodes without a value, like in :func:`pybel_tools.generation.generate_mechanism`.
+    :param default_score: The initial score for all nodes. This number can go up or down.
+    :param runs: The number of times to run the heat diffusion workflow. Defaults to 100.
+    :param processes: The number of worker processes. Defaults to the number of CPUs.
+    :return: A dictionary of {pybel node tuple: results tuple}
+    """
+    nodes = load_snapshot(directory).nodes
+    node_ids = [i for i, node in enumerate(nodes) if node.function == BIOPROCESS]
+
+    func = partial(_calculate_scores_on_worker, key=key, default_score=default_score, runs=runs)
+    results = map_on_snapshot(directory, func, node_ids, processes=processes)
+
+    return {
+        nodes[node_id]: result
+        for node_id, result in zip(node_ids, results)
+    }
+
+
+def _calculate_scores_on_worker(
+    node_id: int,
+    key: Optional[str] = None,
+    default_score: Optional[float] = None,
+    runs: Optional[int] = None,
+) -> ScoreTuple:
+    compiled = get_worker_snapshot()
+    weights = compiled.node_columns.get(key or 'weight')
+    if key is not None and weights is None:
+        raise KeyError(f'snapshot does not have the node column: {key}')
+
+    is_causal = np.array([relation in CAUSAL_RELATIONS for relation in compiled.relation_names], dtype=bool)
+
+    def _get_snapshot_in_edges(node_ids: Iterable[int]) -> List[ArrayEdge]:
+        rv = []
+        for target in node_ids:
+            edge_ids = compiled.in_edge_ids(target)
+            edge_ids = edge_ids[is_causal[compiled.relations[edge_ids]]]
+            rv.extend(zip(compiled.sources[edge_ids].tolist(), itt.repeat(target), edge_ids.tolist()))
+        return rv
+
+    prune_weights = weights if key is not None else None
+
+    # like calculate_average_scores_on_graph, the mechanism is generated from the graph, then again from itself
+    # before running, since pruning it can leave new unweighted sources
+    mechanism_nodes, mechanism_edges = _generate_mechanism_on_arrays(
+        compiled, _get_snapshot_in_edges, node_id, weights=prune_weights,
+    )
+    number_first_neighbors = sum(target == node_id for _, target, _ in mechanism_edges)
+
+    mechanism_in_edges = defaultdict(list)
+    for edge in mechanism_edges:
+        mechanism_in_edges[edge[1]].append(edge)
+
+    def _get_mechanism_in_edges(node_ids: Iterable[int]) -> List[ArrayEdge]:
+        return [edge for target in node_ids for edge in mechanism_in_edges[target]]
+
+    nodes, edges = _generate_mechanism_on_arrays(compiled, _get_mechanism_in_edges, node_id, weights=prune_weights)
+    if len(nodes) <= 1:
+        return _get_score_tuple([], number_first_neighbors, len(mechanism_nodes))
+
+    local_ids = {node: i for i, node in enumerate(nodes)}
+    sources = np.array([local_ids[source] for source, _, _ in edges], dtype=np.int32)
+    targets = np.array([local_ids[target] for _, target, _ in edges], dtype=np.int32)
+    polarity = compiled.polarity[[edge_id for _, _, edge_id in edges]].astype(float)
+    initial = np.zeros(len(nodes)) if weights is None else np.nan_to_num(weights[nodes], nan=0.0)
+
+    scores = []
+    for i in range(runs or 100):
+        try:
+            score = _run_heat_diffusion_on_arrays(
+                sources, targets, polarity, local_ids[node_id], initial, default_score or DEFAULT_SCORE,
+            )
+        except Exception:
+            logger.debug('Run %s failed for %s', i, compiled.nodes[node_id])
+        else:
+            scores.append(score)
+
+    return _get_score_tuple(scores, number_first_neighbors, len(mechanism_nodes))
+
+
+def _generate_mechanism_on_arrays(
+    compiled: CompiledGraph,
+    get_in_edges: Callable[[Iterable[int]], List[ArrayEdge]],
+    node_id: int,
+    weights: Optional[np.ndarray] = None,
+) -> ArrayMechanism:
+    """Generate the mechanism upstream of a node like :func:`pybel_tools.generation.generate_mechanism`.
+
+    :param compiled: The snapshot the edge identifiers refer to
+    :param get_in_edges: A function that gets the causal in-edges of the given nodes
+    :param node_id: The identifier of the node
+    :param weights: The experimental data of each node, with NaN for nodes without a value. If given, the nodes
+     without a value are pruned from the periphery of the mechanism.
+    """
+    first_edges = get_in_edges([node_id])
+    if not first_edges:
+        return [], []
+
+    # dictionaries keep the nodes and the edges in the order they're added, like in the graph
+    nodes = dict.fromkeys([node_id] + [source for source, _, _ in first_edges])
+    pair_edges: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+    for source, target, edge_id in get_in_edges(list(nodes)):
+        nodes[source] = None
+        pair_edges[source, target].append(edge_id)
+
+    # keep one edge for each pair whose edges all have the same relation, and drop the others
+    edges = [
+        (source, target, edge_ids[0])
+        for (source, target), edge_ids in pair_edges.items()
+        if 1 == len(set(compiled.relations[edge_ids].tolist()))
+    ]
+
+    if weights is not None:
+        in_degrees = Counter(target for _, target, _ in edges)
+        out_degrees = Counter(source for source, _, _ in edges)
+        unweighted_leaves = {
+            node
+            for node in nodes
+            if 0 == in_degrees[node] and 1 == out_degrees[node] and np.isnan(weights[node])
+        }
+        edges = [edge for edge in edges if edge[0] not in unweighted_leaves]
+
+        in_degrees = Counter(target for _, target, _ in edges)
+        removed = unweighted_leaves | {
+            node
+            for node in nodes
+            if node not in unweighted_leaves and 0 == in_degrees[node] and np.isnan(weights[node])
+        }
+        edges = [edge for edge in edges if edge[0] not in removed]
+        nodes = {node: None for node in nodes if node not in removed}
+
+    return list(nodes), edges
+
+
+def _run_heat_diffusion_on_arrays(
+    sources: np.ndarray,
+    targets: np.ndarray,
+    polarity: np.ndarray,
+    target_node: int,
+    initial: np.ndarray,
+    default_score: float,
+) -> float:
+    """Run the heat diffusion like :meth:`Runner.run` on a mechanism whose nodes are numbered from zero.
+
+    :param sources: The source of each edge
+    :param targets: The target of each edge
+    :param polarity: The polarity of each edge: 1 for causal increases, -1 for causal decreases, and 0 otherwise
+    :param target_node: The node that is the focus of this analysis
+    :param initial: The score of each node without in-edges
+    :param default_score: The initial score for all other nodes
+    :return: The final score for the target node
+    """
+    number_nodes = len(initial)
+    remaining = np.ones(len(sources), dtype=bool)
+    scored = 0 == np.bincount(targets, minlength=number_nodes)
+    scores = np.where(scored, initial, 0.0)
+
+    while not scored[target_node]:
+        # a node is a leaf if it's unscored and all of its predecessors are scored
+        blocked = np.zeros(number_nodes, dtype=bool)
+        blocked[targets[remaining & ~scored[sources]]] = True
+        leaves = ~scored & ~blocked
+
+        if not leaves.any():
+            remaining[_get_random_edge_on_arrays(sources, targets, remaining, scored, target_node)] = False
+            continue
+
+        leaf_edges = remaining & leaves[targets]
+        heat = np.bincount(
+            targets[leaf_edges],
+            weights=polarity[leaf_edges] * scores[sources[leaf_edges]],
+            minlength=number_nodes,
+        )
+        scores[leaves] = default_score + heat[leaves]
+        scored |= leaves
+
+    return float(scores[target_node])
+
+
+def _get_random_edge_on_arrays(
+    sources: np.ndarray,
+    targets: np.ndarray,
+    remaining: np.ndarray,
+    scored: np.ndarray,
+    target_node: int,
+) -> int:
+    """Get a random in-edge of the unscored node with the lowest in/out degree ratio, like :class:`Runner`."""
+    in_degrees = np.bincount(targets[remaining], minlength=len(scored)).tolist()
+    out_degrees = np.bincount(sources[remaining], minlength=len(scored)).tolist()
+
+    node = min(
+        (node for node in np.flatnonzero(~scored).tolist() if node != target_node),
+        key=lambda node: in_degrees[node] / float(out_degrees[node]),
+    )
+
+    return random.choice(np.flatnonzero(remaining & (targets == node)).tolist())
 
 
 def workflow(
@@ -332,7 +558,7 @@ class Runner:
         self.tag = tag or SCORE
 
         for node, data in self.graph.nodes(data=True):
-            if not self.graph.predecessors(node):
+            if 0 == self.graph.in_degree(node):
                 self.graph.nodes[node][self.tag] = data.get(self.key, 0)
                 logger.log(5, 'initializing %s with %s', target_node, self.graph.nodes[node][self.tag])
 
@@ -397,7 +623,7 @@ class Runner:
         possible_edges = self.graph.in_edges(node, keys=True)
         logger.log(5, 'possible edges: %s', possible_edges)
 
-        edge_to_remove = random.choice(possible_edges)
+        edge_to_remove = random.choice(list(possible_edges))
         logger.log(5, 'chose: %s', edge_to_remove)
 
         return edge_to_remove
@@ -1,45 +1,231 @@
 # -*- coding: utf-8 -*-
 
-"""This module contains functions to compare generated sub-graphs to canonical sub-graphs."""
+"""This module contains functions to compare generated sub-graphs to canonical sub-graphs.
 
-from typing import Any, Mapping
+The candidate mechanisms are the ones :func:`pybel_tools.generation.generate_bioprocess_mechanisms` generates for each
+biological process and the canonical ones are the sub-graphs induced by the values of an annotation, like the
+NeuroMMSig signatures. Instead of building each sub-graph, the nodes are numbered once with
+:func:`pybel_tools.compiled.compile_graph` and both kinds of mechanisms are encoded as the rows of sparse node incidence
+matrices, so the tanimoto similarities of their nodes come from sparse matrix products.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
 
 from pybel import BELGraph
-from pybel.struct import get_subgraphs_by_annotation
-from ..generation import generate_bioprocess_mechanisms
-from ..utils import tanimoto_set_similarity
+from pybel.constants import ANNOTATIONS, BIOPROCESS, CAUSAL_RELATIONS
+from pybel.dsl import BaseEntity
+from ..compiled import CompiledGraph, compile_graph
+from ..utils import calculate_incidence_tanimoto_similarities, find_similar_set_pairs
 
 __all__ = [
+    'get_canonical_node_incidence',
+    'get_candidate_node_incidence',
     'compare',
+    'iterate_top_matches',
+    'get_top_matches',
+    'compare_approximate',
 ]
 
 
-def compare(graph: BELGraph, annotation: str = 'Subgraph') -> Mapping[str, Mapping[str, float]]:
+def get_canonical_node_incidence(
+    graph: BELGraph,
+    annotation: str = 'Subgraph',
+    compiled: Optional[CompiledGraph] = None,
+) -> Tuple[List[str], sparse.csr_matrix]:
+    """Encode the nodes of the sub-graphs induced by each value of the annotation in one pass over the edges.
+
+    :param graph: A BEL graph
+    :param annotation: The annotation whose values induce the canonical sub-graphs
+    :param compiled: The compiled graph, whose node identifiers are the columns. Defaults to :func:`compile_graph`.
+    :return: The values of the annotation and a sparse matrix with a row for each and a column for each node
+    """
+    if compiled is None:
+        compiled = compile_graph(graph)
+    node_index = compiled.node_index
+
+    names: Dict[str, int] = {}
+    rows, columns = [], []
+    last_u, u_id = None, None
+    for u, v, data in graph.edges(data=True):
+        values = data.get(ANNOTATIONS, {}).get(annotation)
+        if not values:
+            continue
+        if u is not last_u:
+            last_u, u_id = u, node_index[u]
+        v_id = node_index[v]
+        for value in values:
+            row = names.setdefault(value, len(names))
+            rows.extend((row, row))
+            columns.extend((u_id, v_id))
+
+    return list(names), _build_incidence(rows, columns, shape=(len(names), compiled.number_of_nodes()))
+
+
+def _build_incidence(rows, columns, shape: Tuple[int, int]) -> sparse.csr_matrix:
+    rv = sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, columns)), shape=shape)
+    rv.data[:] = 1
+    return rv
+
+
+def _get_causal_adjacency(compiled: CompiledGraph) -> sparse.csr_matrix:
+    """Get a sparse matrix with a one in row ``v`` and column ``u`` when there's a causal edge from ``u`` to ``v``."""
+    causal_codes = [code for code, relation in enumerate(compiled.relation_names) if relation in CAUSAL_RELATIONS]
+    causal = np.isin(compiled.relations, causal_codes)
+    return _build_incidence(
+        compiled.targets[causal],
+        compiled.sources[causal],
+        shape=(compiled.number_of_nodes(), compiled.number_of_nodes()),
+    )
+
+
+def get_candidate_node_incidence(
+    compiled: CompiledGraph,
+    processes: Optional[Sequence[int]] = None,
+    adjacency: Optional[sparse.csr_matrix] = None,
+) -> Tuple[List[BaseEntity], sparse.csr_matrix]:
+    """Encode the nodes of the mechanisms generated for biological processes with sparse matrix products.
+
+    The mechanism of a process from :func:`pybel_tools.generation.generate_mechanism` has the nodes with causal edges
+    to it, the nodes with causal edges to those, and the process itself. It's empty if nothing causally affects the
+    process.
+
+    :param compiled: A compiled graph
+    :param processes: The identifiers of the biological processes. Defaults to all of them.
+    :param adjacency: The causal adjacency matrix, if it was already built
+    :return: The biological processes and a sparse matrix with a row for each and a column for each node
+    """
+    if processes is None:
+        processes = [i for i, node in enumerate(compiled.nodes) if node.function == BIOPROCESS]
+    processes = np.asarray(processes, dtype=np.int64)
+    if adjacency is None:
+        adjacency = _get_causal_adjacency(compiled)
+
+    direct = adjacency[processes]
+    has_upstream = np.flatnonzero(np.diff(direct.indptr) > 0)
+    itself = _build_incidence(has_upstream, processes[has_upstream], shape=direct.shape)
+
+    rv = (direct + direct @ adjacency + itself).tocsr()
+    rv.data[:] = 1
+    return [compiled.nodes[i] for i in processes.tolist()], rv
+
+
+def compare(graph: BELGraph, annotation: str = 'Subgraph') -> Mapping[str, Mapping[BaseEntity, float]]:
     """Compare generated mechanisms to actual ones.
 
     1. Generates candidate mechanisms for each biological process
     2. Gets sub-graphs for all NeuroMMSig signatures
     3. Make tanimoto similarity comparison for all sets
 
+    For many biological processes, use :func:`iterate_top_matches` to avoid building the whole table.
+
     :return: A dictionary table comparing the canonical subgraphs to generated ones
     """
-    canonical_mechanisms = get_subgraphs_by_annotation(graph, annotation)
-    canonical_nodes = _transform_graph_dict_to_node_dict(canonical_mechanisms)
-
-    candidate_mechanisms = generate_bioprocess_mechanisms(graph)
-    candidate_nodes = _transform_graph_dict_to_node_dict(candidate_mechanisms)
-
+    compiled = compile_graph(graph)
+    names, canonical = get_canonical_node_incidence(graph, annotation, compiled=compiled)
+    processes, candidates = get_candidate_node_incidence(compiled)
+    similarities = calculate_incidence_tanimoto_similarities(canonical, candidates).toarray()
     return {
-        canonical_name: {
-            candidate_bp: tanimoto_set_similarity(candidate_nodes, canonical_nodes)
-            for candidate_bp, candidate_graph in candidate_nodes.items()
-        }
-        for canonical_name, canonical_graph in canonical_nodes.items()
+        name: dict(zip(processes, row.tolist()))
+        for name, row in zip(names, similarities)
     }
 
 
-def _transform_graph_dict_to_node_dict(d: Mapping[Any, BELGraph]):
+def iterate_top_matches(
+    graph: BELGraph,
+    annotation: str = 'Subgraph',
+    k: int = 5,
+    chunk_size: int = 1024,
+) -> Iterable[Tuple[BaseEntity, List[Tuple[str, float]]]]:
+    """Iterate over the biological processes and the canonical sub-graphs most similar to their mechanisms.
+
+    The mechanisms are generated and compared in chunks, so only a chunk's part of the similarity matrix is held in
+    memory at once.
+
+    :param graph: A BEL graph
+    :param annotation: The annotation whose values induce the canonical sub-graphs
+    :param k: The number of canonical sub-graphs to keep for each biological process
+    :param chunk_size: The number of biological processes to compare at once
+    :return: An iterable of pairs of biological processes and lists of up to ``k`` pairs of canonical sub-graphs and
+     similarities, from the most to the least similar. Sub-graphs that share no nodes with a mechanism aren't listed.
+    """
+    compiled = compile_graph(graph)
+    adjacency = _get_causal_adjacency(compiled)
+    names, canonical = get_canonical_node_incidence(graph, annotation, compiled=compiled)
+    processes = [i for i, node in enumerate(compiled.nodes) if node.function == BIOPROCESS]
+
+    for start in range(0, len(processes), chunk_size):
+        chunk, candidates = get_candidate_node_incidence(
+            compiled,
+            processes=processes[start:start + chunk_size],
+            adjacency=adjacency,
+        )
+        similarities = calculate_incidence_tanimoto_similarities(candidates, canonical).tocsr()
+        for i, process in enumerate(chunk):
+            row = slice(similarities.indptr[i], similarities.indptr[i + 1])
+            data, indices = similarities.data[row], similarities.indices[row]
+            top = np.lexsort((indices, -data))[:k]
+            yield process, [(names[j], s) for j, s in zip(indices[top].tolist(), data[top].tolist())]
+
+
+def get_top_matches(
+    graph: BELGraph,
+    annotation: str = 'Subgraph',
+    k: int = 5,
+) -> Mapping[BaseEntity, List[Tuple[str, float]]]:
+    """Get the canonical sub-graphs most similar to the mechanism of each biological process.
+
+    .. seealso:: :func:`iterate_top_matches`
+    """
+    return dict(iterate_top_matches(graph, annotation=annotation, k=k))
+
+
+def compare_approximate(
+    graph: BELGraph,
+    annotation: str = 'Subgraph',
+    threshold: float = 0.5,
+    num_perm: int = 128,
+    seed: Optional[int] = None,
+) -> Mapping[str, Mapping[BaseEntity, float]]:
+    """Find the generated mechanisms that are similar to each canonical one with MinHash and LSH.
+
+    Unlike :func:`compare`, only the pairs whose tanimoto similarity is estimated to be at least the threshold are
+    kept, so this scales to tens of thousands of generated mechanisms.
+
+    :param graph: A BEL graph
+    :param annotation: The annotation whose values induce the canonical sub-graphs
+    :param threshold: The minimum tanimoto similarity of the nodes
+    :param num_perm: The number of hash functions. More are more accurate, but slower.
+    :param seed: The seed for choosing the hash functions
+    :return: A dictionary from canonical sub-graphs to dictionaries from biological processes to the estimated
+     similarities of their candidate mechanisms
+
+    .. seealso:: :func:`pybel_tools.utils.find_similar_set_pairs`
+    """
+    compiled = compile_graph(graph)
+    names, canonical = get_canonical_node_incidence(graph, annotation, compiled=compiled)
+    processes, candidates = get_candidate_node_incidence(compiled)
+
+    pairs = find_similar_set_pairs(
+        _get_rows(names, canonical),
+        _get_rows(processes, candidates),
+        threshold=threshold,
+        num_perm=num_perm,
+        seed=seed,
+    )
+
+    rv: Dict[str, Dict[BaseEntity, float]] = defaultdict(dict)
+    for (canonical_name, candidate_bp), similarity in pairs.items():
+        rv[canonical_name][candidate_bp] = similarity
+    return dict(rv)
+
+
+def _get_rows(labels: Sequence, incidence: sparse.csr_matrix) -> Mapping:
+    """Get the node identifiers in each row of an incidence matrix."""
     return {
-        key: set(graph)
-        for key, graph in d.items()
+        label: incidence.indices[incidence.indptr[i]:incidence.indptr[i + 1]].tolist()
+        for i, label in enumerate(labels)
     }
@@ -8,23 +8,31 @@
 """
 
 import itertools as itt
+import json
 import logging
-from collections import Counter
-from typing import List, Mapping, Optional
+import os
+import random
+from collections import Counter, defaultdict, deque
+from functools import partial
+from typing import List, Mapping, Optional, Sequence
 
+import numpy as np
 from tqdm import tqdm
 
 from pybel import BELGraph, Pipeline
-from pybel.constants import GENE
+from pybel.constants import ANNOTATIONS, GENE
 from pybel.dsl import BaseEntity, Gene
 from pybel.struct import (
     collapse_all_variants, collapse_to_genes, enrich_protein_and_rna_origins, get_nodes_by_function,
     get_subgraphs_by_annotation,
 )
-from ...utils import calculate_betweenness_centality
+from ...compiled import CompiledGraph, get_worker_snapshot, map_on_snapshot, save_snapshot
+from ...utils import CENTRALITY_SAMPLES, calculate_betweenness_centality
 
 __all__ = [
     'get_neurommsig_scores',
+    'save_neurommsig_snapshot',
+    'get_neurommsig_scores_on_snapshot',
     'get_neurommsig_score',
     'neurommsig_graph_preprocessor',
 ]
@@ -141,6 +149,229 @@ def get_neurommsig_scores_prestratified(
     }
 
 
+def save_neurommsig_snapshot(
+    graph: BELGraph,
+    directory: str,
+    annotation: str = 'Subgraph',
+    preprocess: bool = False,
+) -> None:
+    """Save a snapshot of the graph with the edges of each of its subgraphs for the given annotation.
+
+    :param graph: A BEL graph
+    :param directory: The directory to save the snapshot in, for :func:`get_neurommsig_scores_on_snapshot`
+    :param annotation: The annotation to use to stratify the graph to subgraphs
+    :param preprocess: If true, preprocess the graph.
+    """
+    if preprocess:
+        graph = neurommsig_graph_preprocessor.run(graph)
+
+    compiled = CompiledGraph.from_graph(graph)
+    save_snapshot(compiled, directory)
+
+    subgraph_edges = defaultdict(list)
+    for edge_id in range(compiled.number_of_edges()):
+        u, v, key = compiled.get_edge(edge_id)
+        for value in graph[u][v][key].get(ANNOTATIONS, {}).get(annotation, ()):
+            subgraph_edges[value].append(edge_id)
+
+    names = list(subgraph_edges)
+    for i, name in enumerate(names):
+        np.save(_get_subgraph_path(directory, i), np.array(subgraph_edges[name], dtype=np.int32))
+
+    with open(os.path.join(directory, 'neurommsig.json'), 'w') as file:
+        json.dump({'annotation': annotation, 'subgraphs': names}, file)
+
+
+def _get_subgraph_path(directory: str, subgraph_id: int) -> str:
+    return os.path.join(directory, f'neurommsig_subgraph_{subgraph_id}.npy')
+
+
+def get_neurommsig_scores_on_snapshot(
+    directory: str,
+    genes: List[Gene],
+    ora_weight: Optional[float] = None,
+    hub_weight: Optional[float] = None,
+    top_percent: Optional[float] = None,
+    topology_weight: Optional[float] = None,
+    processes: Optional[int] = None,
+) -> Mapping[str, float]:
+    """Run NeuroMMSig on each subgraph of a snapshot in a pool of processes.
+
+    This is the parallel version of :func:`get_neurommsig_scores`. There is one task for each subgraph. Its worker
+    reads the subgraph's edges from the memory-mapped snapshot and calculates the scores on their arrays, so no
+    worker rebuilds the graph.
+
+    :param directory: The directory of a snapshot from :func:`save_neurommsig_snapshot`
+    :param genes: A list of gene nodes
+    :param ora_weight: The relative weight of the over-enrichment analysis score from
+     :py:func:`neurommsig_gene_ora`. Defaults to 1.0.
+    :param hub_weight: The relative weight of the hub analysis score from :py:func:`neurommsig_hubs`.
+     Defaults to 1.0.
+    :param top_percent: The percentage of top genes to use as hubs. Defaults to 5% (0.05).
+    :param topology_weight: The relative weight of the topolgical analysis core from
+     :py:func:`neurommsig_topology`. Defaults to 1.0.
+    :param processes: The number of worker processes. Defaults to the number of CPUs.
+    :return: A dictionary from {annotation value: NeuroMMSig composite score}
+    """
+    with open(os.path.join(directory, 'neurommsig.json')) as file:
+        names = json.load(file)['subgraphs']
+
+    if all(isinstance(gene, str) for gene in genes):
+        genes = [Gene('HGNC', gene) for gene in genes]
+
+    func = partial(
+        _get_neurommsig_score_on_worker,
+        directory=directory,
+        genes=list(genes),
+        ora_weight=ora_weight,
+        hub_weight=hub_weight,
+        top_percent=top_percent,
+        topology_weight=topology_weight,
+    )
+    scores = map_on_snapshot(directory, func, range(len(names)), processes=processes)
+
+    return dict(zip(names, scores))
+
+
+def _get_neurommsig_score_on_worker(
+    subgraph_id: int,
+    directory: str,
+    genes: List[Gene],
+    ora_weight: Optional[float] = None,
+    hub_weight: Optional[float] = None,
+    top_percent: Optional[float] = None,
+    topology_weight: Optional[float] = None,
+) -> float:
+    compiled = get_worker_snapshot()
+    edge_ids = np.load(_get_subgraph_path(directory, subgraph_id), mmap_mode='r')
+
+    # number the nodes in the order they first appear in the edges, like in the subgraph
+    endpoints = np.stack([compiled.sources[edge_ids], compiled.targets[edge_ids]], axis=1).ravel()
+    unique, first, inverse = np.unique(endpoints, return_index=True, return_inverse=True)
+    order = np.argsort(first)
+    node_ids = unique[order]
+    positions = np.empty(len(order), dtype=np.int64)
+    positions[order] = np.arange(len(order))
+    sources, targets = positions[inverse.ravel()].reshape(-1, 2).T
+
+    # parallel edges count once, like in the adjacency of the subgraph
+    codes = sources * len(node_ids) + targets
+    _, first = np.unique(codes, return_index=True)
+    first.sort()
+    sources, targets = sources[first], targets[first]
+
+    node_positions = {compiled.nodes[node_id]: i for i, node_id in enumerate(node_ids.tolist())}
+    gene_positions = np.array([node_positions.get(gene, -1) for gene in genes], dtype=np.int64)
+    graph_genes = np.array([
+        i
+        for i, node_id in enumerate(node_ids.tolist())
+        if compiled.nodes[node_id].function == GENE
+    ], dtype=np.int64)
+
+    ora_score = len(set(gene_positions.tolist()).intersection(graph_genes.tolist())) / len(graph_genes)
+    hub_score = _neurommsig_hubs_on_arrays(len(node_ids), sources, targets, graph_genes, gene_positions, top_percent)
+    topology_score = _neurommsig_topology_on_arrays(len(node_ids), sources, targets, gene_positions)
+
+    return _get_weighted_score(
+        ora_score, hub_score, topology_score,
+        ora_weight=ora_weight, hub_weight=hub_weight, topology_weight=topology_weight,
+    )
+
+
+def _neurommsig_hubs_on_arrays(
+    number_nodes: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    graph_genes: np.ndarray,
+    gene_positions: np.ndarray,
+    top_percent: Optional[float] = None,
+) -> float:
+    """Calculate the score of :func:`neurommsig_hubs` on a subgraph whose nodes are numbered from zero."""
+    top_percent = top_percent or 0.05
+
+    if number_nodes < 20:
+        logger.debug('Graph has less than 20 nodes')
+        return 0.0
+
+    betweenness = _calculate_betweenness_on_arrays(number_nodes, sources, targets)
+    central_genes = graph_genes[np.argsort(-betweenness[graph_genes], kind='stable')]
+    number_central_nodes = max(1, int(len(graph_genes) * top_percent))
+
+    return np.isin(central_genes[:number_central_nodes], gene_positions).sum() / number_central_nodes
+
+
+def _calculate_betweenness_on_arrays(
+    number_nodes: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    number_samples: int = CENTRALITY_SAMPLES,
+) -> np.ndarray:
+    """Calculate the unnormalized betweenness centrality of each node with Brandes' algorithm.
+
+    Like :func:`pybel_tools.utils.calculate_betweenness_centality`, the shortest paths are only counted from a sample
+    of the nodes if there are enough of them. The edges must not have duplicates.
+    """
+    order = np.argsort(sources, kind='stable')
+    indptr = np.zeros(number_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(sources, minlength=number_nodes), out=indptr[1:])
+    indptr, neighbors = indptr.tolist(), targets[order].tolist()
+
+    if number_samples <= number_nodes:
+        start_nodes: Sequence[int] = random.sample(range(number_nodes), number_samples)
+    else:
+        start_nodes = range(number_nodes)
+
+    betweenness = [0.0] * number_nodes
+    for start in start_nodes:
+        stack = []
+        predecessors = [[] for _ in range(number_nodes)]
+        sigma = [0.0] * number_nodes
+        sigma[start] = 1.0
+        distance = [-1] * number_nodes
+        distance[start] = 0
+        queue = deque([start])
+        while queue:
+            v = queue.popleft()
+            stack.append(v)
+            for w in neighbors[indptr[v]:indptr[v + 1]]:
+                if distance[w] < 0:
+                    queue.append(w)
+                    distance[w] = distance[v] + 1
+                if distance[w] == distance[v] + 1:
+                    sigma[w] += sigma[v]
+                    predecessors[w].append(v)
+
+        delta = [0.0] * number_nodes
+        while stack:
+            w = stack.pop()
+            coefficient = (1 + delta[w]) / sigma[w]
+            for v in predecessors[w]:
+                delta[v] += sigma[v] * coefficient
+            if w != start:
+                betweenness[w] += delta[w]
+
+    return np.array(betweenness)
+
+
+def _neurommsig_topology_on_arrays(
+    number_nodes: int,
+    sources: np.ndarray,
+    targets: np.ndarray,
+    gene_positions: np.ndarray,
+) -> float:
+    """Calculate the score of :func:`neurommsig_topology` on a subgraph whose nodes are numbered from zero."""
+    number_genes = len(gene_positions)
+
+    if number_genes <= 1:
+        return 0.0
+
+    u, v = np.meshgrid(gene_positions, gene_positions, indexing='ij')
+    mask = (0 <= u) & (0 <= v) & (u != v)
+    unnormalized_sum = np.isin(v[mask] * number_nodes + u[mask], sources * number_nodes + targets).sum()
+
+    return unnormalized_sum / (number_genes * (number_genes - 1.0))
+
+
 def get_neurommsig_score(
     graph: BELGraph,
     genes: List[Gene],
@@ -162,17 +393,31 @@ def get_neurommsig_score(
      :py:func:`neurommsig_topology`. Defaults to 1.0.
     :return: The NeuroMMSig composite score
     """
-    ora_weight = ora_weight or 1.0
-    hub_weight = hub_weight or 1.0
-    topology_weight = topology_weight or 1.0
-    total_weight = ora_weight + hub_weight + topology_weight
-
     genes = list(genes)
 
     ora_score = neurommsig_gene_ora(graph, genes)
     hub_score = neurommsig_hubs(graph, genes, top_percent=top_percent)
     topology_score = neurommsig_topology(graph, genes)
 
+    return _get_weighted_score(
+        ora_score, hub_score, topology_score,
+        ora_weight=ora_weight, hub_weight=hub_weight, topology_weight=topology_weight,
+    )
+
+
+def _get_weighted_score(
+    ora_score: float,
+    hub_score: float,
+    topology_score: float,
+    ora_weight: Optional[float] = None,
+    hub_weight: Optional[float] = None,
+    topology_weight: Optional[float] = None,
+) -> float:
+    ora_weight = ora_weight or 1.0
+    hub_weight = hub_weight or 1.0
+    topology_weight = topology_weight or 1.0
+    total_weight = ora_weight + hub_weight + topology_weight
+
     weighted_sum = (
         ora_weight * ora_score +
         hub_weight * hub_score +
@@ -222,7 +467,7 @@ def neurommsig_hubs(graph: BELGraph, genes: List[Gene], top_percent: Optional[fl
 
     number_mappable_central_nodes = sum(
         node in genes
-        for node in bc.most_common(number_central_nodes)
+        for node, _ in bc.most_common(number_central_nodes)
     )
 
     return number_mappable_central_nodes / number_central_nodes
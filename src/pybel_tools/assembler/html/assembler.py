@@ -31,19 +31,19 @@ render_template.environment.globals.update(
 )
 
 
-def to_html_path(graph: BELGraph, path: str) -> None:
+def to_html_path(graph: BELGraph, path: str, summary: Optional[BELGraphSummary] = None) -> None:
     """Write the graph as HTML to a file at the given path."""
     with open(path, 'w') as file:
-        to_html_file(graph, file)
+        to_html_file(graph, file, summary=summary)
 
 
-def to_html_file(graph: BELGraph, file: Optional[TextIO] = None) -> None:
+def to_html_file(graph: BELGraph, file: Optional[TextIO] = None, summary: Optional[BELGraphSummary] = None) -> None:
     """Write the graph as HTML to a file."""
-    html = to_html(graph)
+    html = to_html(graph, summary=summary)
     print(html, file=file)
 
 
-def to_html(graph: BELGraph) -> str:
+def to_html(graph: BELGraph, summary: Optional[BELGraphSummary] = None) -> str:
     """Render the graph as an HTML string.
 
     Common usage may involve writing to a file like:
@@ -51,8 +51,12 @@ def to_html(graph: BELGraph) -> str:
     >>> from pybel.examples import sialic_acid_graph
     >>> with open('html_output.html', 'w') as file:
     ...     print(to_html(sialic_acid_graph), file=file)
+
+    :param graph: A BEL graph
+    :param summary: A summary of the graph, if it has already been calculated
     """
-    summary = BELGraphSummary.from_graph(graph)
+    if summary is None:
+        summary = BELGraphSummary.from_graph(graph)
 
     confidence_data = [
         (label, summary.confidence_count.get(label, 0))
@@ -0,0 +1,513 @@
+# -*- coding: utf-8 -*-
+
+"""A cache for the results of functions of BEL graphs, keyed by the contents of the graphs.
+
+Functions opt in with the :func:`cached_on_graph` decorator. By default, they are called as usual. Once a
+:class:`ResultCache` is installed with :func:`set_result_cache` or :func:`use_result_cache`, their results are stored
+under a key made from the digest of the graph's contents (:func:`get_graph_digest`), the function's name, and its
+other arguments, so the same graph loaded again, even in another process, gets the stored result. The digest of a
+large graph that is queried many times can be calculated once and kept up to date as it's edited with
+:func:`track_graph_fingerprint`. Tracking is a promise to apply every edit to the fingerprint, since it's trusted
+without looking at the graph again.
+
+>>> from pybel.examples import sialic_acid_graph
+>>> from pybel_tools.cache import ResultCache, SQLiteCacheBackend, use_result_cache
+>>> from pybel_tools.summary import summarize_stability
+>>> cache = ResultCache(SQLiteCacheBackend('results.db', max_entries=1000))
+>>> with use_result_cache(cache):
+...     summarize_stability(sialic_acid_graph)  # calculated and stored
+...     summarize_stability(sialic_acid_graph)  # loaded
+>>> cache.statistics.hits
+1
+"""
+
+import functools
+import hashlib
+import inspect
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import time
+import weakref
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Mapping, Optional, Tuple, TypeVar
+
+from pybel import BELGraph
+from pybel.dsl import BaseEntity
+from pybel.utils import hash_edge
+
+__all__ = [
+    'GraphFingerprint',
+    'track_graph_fingerprint',
+    'untrack_graph_fingerprint',
+    'is_graph_fingerprint_tracked',
+    'get_graph_fingerprint',
+    'get_graph_digest',
+    'CacheStatistics',
+    'CacheBackend',
+    'MemoryCacheBackend',
+    'SQLiteCacheBackend',
+    'ResultCache',
+    'get_result_cache',
+    'set_result_cache',
+    'use_result_cache',
+    'cached_on_graph',
+]
+
+logger = logging.getLogger(__name__)
+
+X = TypeVar('X')
+
+
+_FINGERPRINT_MODULUS = 1 << 128
+
+
+def _hash_node(node: BaseEntity, data: Mapping[str, Any]) -> int:
+    if not data:
+        return int(node.md5, 16)
+    line = f'{node.md5}\t{json.dumps(data, sort_keys=True, default=str)}'
+    return int(hashlib.md5(line.encode('utf-8')).hexdigest(), 16)  # noqa: S303
+
+
+def _hash_edge(u: BaseEntity, v: BaseEntity, data: Mapping[str, Any]) -> int:
+    return int(hash_edge(u, v, data), 16)
+
+
+class GraphFingerprint:
+    """An order-independent digest of the nodes, the node data, and the edges of a graph.
+
+    It's the sum, modulo :math:`2^{128}`, of the MD5 hashes of the nodes with their data and of the edges from
+    :func:`pybel.utils.hash_edge`. Since a sum doesn't depend on the order of its terms and each term can be
+    subtracted again, adding or removing a node or an edge updates the fingerprint in constant time. Unlike XOR, two
+    copies of the same edge don't cancel each other out.
+
+    >>> from pybel.examples import sialic_acid_graph
+    >>> from pybel_tools.cache import track_graph_fingerprint
+    >>> graph = sialic_acid_graph.copy()
+    >>> fingerprint = track_graph_fingerprint(graph)
+    >>> for u, v, key, data in list(graph.edges(keys=True, data=True))[:2]:
+    ...     graph.remove_edge(u, v, key)
+    ...     fingerprint.remove_edge(u, v, data)
+    """
+
+    def __init__(self, value: int = 0, number_of_nodes: int = 0, number_of_edges: int = 0) -> None:
+        """Build a fingerprint, by default of an empty graph."""
+        self.value = value
+        self.number_of_nodes = number_of_nodes
+        self.number_of_edges = number_of_edges
+
+    @classmethod
+    def from_graph(cls, graph: BELGraph) -> 'GraphFingerprint':
+        """Calculate the fingerprint of the graph."""
+        value = sum(_hash_node(node, data) for node, data in graph.nodes(data=True))
+        value += sum(_hash_edge(u, v, data) for u, v, data in graph.edges(data=True))
+        return cls(
+            value=value % _FINGERPRINT_MODULUS,
+            number_of_nodes=graph.number_of_nodes(),
+            number_of_edges=graph.number_of_edges(),
+        )
+
+    def add_node(self, node: BaseEntity, data: Optional[Mapping[str, Any]] = None) -> None:
+        """Update the fingerprint for a node added to the graph, including one added along with a new edge."""
+        self.value = (self.value + _hash_node(node, data or {})) % _FINGERPRINT_MODULUS
+        self.number_of_nodes += 1
+
+    def remove_node(self, node: BaseEntity, data: Optional[Mapping[str, Any]] = None) -> None:
+        """Update the fingerprint for a node removed from the graph.
+
+        Its edges, which the graph removes with it, have to be removed with :meth:`remove_edge` too.
+        """
+        self.value = (self.value - _hash_node(node, data or {})) % _FINGERPRINT_MODULUS
+        self.number_of_nodes -= 1
+
+    def update_node(self, node: BaseEntity, old_data: Mapping[str, Any], new_data: Mapping[str, Any]) -> None:
+        """Update the fingerprint for a change to a node's data."""
+        self.value = (self.value - _hash_node(node, old_data) + _hash_node(node, new_data)) % _FINGERPRINT_MODULUS
+
+    def add_edge(self, u: BaseEntity, v: BaseEntity, data: Mapping[str, Any]) -> None:
+        """Update the fingerprint for an edge added to the graph."""
+        self.value = (self.value + _hash_edge(u, v, data)) % _FINGERPRINT_MODULUS
+        self.number_of_edges += 1
+
+    def remove_edge(self, u: BaseEntity, v: BaseEntity, data: Mapping[str, Any]) -> None:
+        """Update the fingerprint for an edge removed from the graph."""
+        self.value = (self.value - _hash_edge(u, v, data)) % _FINGERPRINT_MODULUS
+        self.number_of_edges -= 1
+
+    def matches_size(self, graph: BELGraph) -> bool:
+        """Check the fingerprint has counted as many nodes and edges as the graph has."""
+        return self.number_of_nodes == graph.number_of_nodes() and self.number_of_edges == graph.number_of_edges()
+
+    def hexdigest(self) -> str:
+        """Get the fingerprint as a hexadecimal string."""
+        return f'{self.value:032x}'
+
+    def copy(self) -> 'GraphFingerprint':
+        """Copy the fingerprint, like for a copy of the graph."""
+        return GraphFingerprint(self.value, self.number_of_nodes, self.number_of_edges)
+
+    def __eq__(self, other: Any) -> bool:
+        return isinstance(other, GraphFingerprint) and self.value == other.value
+
+    def __hash__(self) -> int:
+        return hash(self.value)
+
+    def __repr__(self) -> str:
+        return f'<GraphFingerprint {self.hexdigest()}>'
+
+
+_fingerprints: 'weakref.WeakKeyDictionary[BELGraph, GraphFingerprint]' = weakref.WeakKeyDictionary()
+
+
+def track_graph_fingerprint(graph: BELGraph, refresh: bool = False) -> GraphFingerprint:
+    """Calculate the fingerprint of the graph once and store it beside the graph.
+
+    Later calls, :func:`get_graph_digest`, :func:`cached_on_graph`, and :func:`pybel_tools.compiled.compile_graph`
+    trust the stored fingerprint without looking at the graph again, so every change to the graph has to be applied
+    to it with its methods, or followed by a call with ``refresh=True``. The only check is that the graph has as many
+    nodes and edges as the fingerprint counted, and if it doesn't, the fingerprint is calculated again. Changes that
+    keep the size of the graph, like changing a relation in place, shuffling relations, or editing node data, aren't
+    detected, and give stale results until the fingerprint is refreshed.
+
+    :param graph: A BEL graph
+    :param refresh: Should the fingerprint be calculated again anyway? Use this after edits that weren't applied to
+     the fingerprint.
+    """
+    fingerprint = _fingerprints.get(graph)
+    if refresh or fingerprint is None or not fingerprint.matches_size(graph):
+        if fingerprint is not None and not refresh:
+            logger.warning('recalculating the fingerprint of %s since it was changed without updating it', graph)
+        fingerprint = _fingerprints[graph] = GraphFingerprint.from_graph(graph)
+    return fingerprint
+
+
+def untrack_graph_fingerprint(graph: BELGraph) -> None:
+    """Stop storing the fingerprint of the graph."""
+    _fingerprints.pop(graph, None)
+
+
+def is_graph_fingerprint_tracked(graph: BELGraph) -> bool:
+    """Check if the fingerprint of the graph is stored with :func:`track_graph_fingerprint`."""
+    return graph in _fingerprints
+
+
+def get_graph_fingerprint(graph: BELGraph) -> GraphFingerprint:
+    """Get the stored fingerprint of the graph if it's tracked with :func:`track_graph_fingerprint`, or calculate it."""
+    if is_graph_fingerprint_tracked(graph):
+        return track_graph_fingerprint(graph)
+    return GraphFingerprint.from_graph(graph)
+
+
+def get_graph_digest(graph: BELGraph) -> str:
+    """Get a digest of the nodes, the node data, and the edges of the graph from its :class:`GraphFingerprint`.
+
+    The digest doesn't depend on the order in which the nodes and edges were added, or on the graph's metadata.
+    """
+    return get_graph_fingerprint(graph).hexdigest()
+
+
+@dataclass
+class CacheStatistics:
+    """Counts of the lookups in a cache."""
+
+    #: The number of results that were found in the cache
+    hits: int = 0
+    #: The number of results that had to be calculated
+    misses: int = 0
+    #: The number of calls whose arguments couldn't be made into a key, so they weren't cached
+    skips: int = 0
+    #: The number of results removed to keep the cache under its size limit
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """The fraction of the lookups that were hits."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class CacheBackend(ABC):
+    """Stores pickled results by their keys, evicting the least recently used ones once it's full."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """Get the pickled result stored with the given key and mark it as the most recently used."""
+
+    @abstractmethod
+    def set(self, key: str, value: bytes) -> int:
+        """Store the pickled result with the given key.
+
+        :return: The number of results that were evicted to make space
+        """
+
+    @abstractmethod
+    def clear(self) -> None:
+        """Remove all results."""
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Count the stored results."""
+
+
+def _get_evictions(
+    sizes: Iterable[Tuple[str, int]],
+    count: int,
+    total: int,
+    max_entries: Optional[int],
+    max_bytes: Optional[int],
+) -> Iterable[str]:
+    """Iterate over the keys to evict, given the keys and sizes from the least to the most recently used."""
+    for key, size in sizes:
+        if (max_entries is None or count <= max_entries) and (max_bytes is None or total <= max_bytes):
+            return
+        yield key
+        count -= 1
+        total -= size
+
+
+class MemoryCacheBackend(CacheBackend):
+    """Stores the results in memory."""
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        """Build an in-memory backend.
+
+        :param max_entries: The maximum number of results to keep
+        :param max_bytes: The maximum total size of the pickled results to keep
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._values: 'OrderedDict[str, bytes]' = OrderedDict()
+        self._total = 0
+
+    def get(self, key: str) -> Optional[bytes]:  # noqa: D102
+        value = self._values.get(key)
+        if value is not None:
+            self._values.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: bytes) -> int:  # noqa: D102
+        old = self._values.pop(key, None)
+        if old is not None:
+            self._total -= len(old)
+        self._values[key] = value
+        self._total += len(value)
+
+        evictions = list(_get_evictions(
+            ((key, len(value)) for key, value in self._values.items()),
+            count=len(self._values),
+            total=self._total,
+            max_entries=self.max_entries,
+            max_bytes=self.max_bytes,
+        ))
+        for evicted_key in evictions:
+            self._total -= len(self._values.pop(evicted_key))
+        return len(evictions)
+
+    def clear(self) -> None:  # noqa: D102
+        self._values.clear()
+        self._total = 0
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+class SQLiteCacheBackend(CacheBackend):
+    """Stores the results in a SQLite database on disk, so they can be shared between processes and sessions."""
+
+    def __init__(self, path: str, max_entries: Optional[int] = None, max_bytes: Optional[int] = None) -> None:
+        """Build a SQLite backend.
+
+        :param path: The path to the database file. It is created if it doesn't exist.
+        :param max_entries: The maximum number of results to keep
+        :param max_bytes: The maximum total size of the pickled results to keep
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._connection = None
+        self._pid = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Get a connection to the database, opening a new one in each process."""
+        if self._connection is None or self._pid != os.getpid():
+            self._connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS results '
+                '(key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)',
+            )
+            self._connection.execute('CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed)')
+            self._pid = os.getpid()
+        return self._connection
+
+    def __getstate__(self):
+        return {**self.__dict__, '_connection': None, '_pid': None}
+
+    def get(self, key: str) -> Optional[bytes]:  # noqa: D102
+        row = self.connection.execute('SELECT value FROM results WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return
+        self.connection.execute('UPDATE results SET accessed = ? WHERE key = ?', (time.time(), key))
+        return row[0]
+
+    def set(self, key: str, value: bytes) -> int:  # noqa: D102
+        connection = self.connection
+        with connection:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute(
+                'INSERT OR REPLACE INTO results (key, value, size, accessed) VALUES (?, ?, ?, ?)',
+                (key, value, len(value), time.time()),
+            )
+            if self.max_entries is None and self.max_bytes is None:
+                return 0
+
+            count, total = connection.execute('SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results').fetchone()
+            evictions = list(_get_evictions(
+                connection.execute('SELECT key, size FROM results ORDER BY accessed'),
+                count=count,
+                total=total,
+                max_entries=self.max_entries,
+                max_bytes=self.max_bytes,
+            ))
+            connection.executemany('DELETE FROM results WHERE key = ?', ((key,) for key in evictions))
+        return len(evictions)
+
+    def clear(self) -> None:  # noqa: D102
+        self.connection.execute('DELETE FROM results')
+
+    def __len__(self) -> int:
+        return self.connection.execute('SELECT COUNT(*) FROM results').fetchone()[0]
+
+
+class _UncacheableArgument(TypeError):
+    """Raised when an argument can't be encoded in a key."""
+
+
+def _encode_argument(value: Any) -> Any:
+    """Encode an argument as something that has a stable JSON representation."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, BaseEntity):
+        return value.as_bel()
+    if isinstance(value, BELGraph):
+        return get_graph_digest(value)
+    if isinstance(value, (list, tuple)):
+        return [_encode_argument(element) for element in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((_encode_argument(element) for element in value), key=json.dumps)
+    if isinstance(value, dict):
+        return sorted(([_encode_argument(k), _encode_argument(v)] for k, v in value.items()), key=json.dumps)
+    raise _UncacheableArgument(value)
+
+
+class ResultCache:
+    """A cache of the results of functions of graphs, keyed by the digests of the graphs and the other arguments."""
+
+    def __init__(self, backend: Optional[CacheBackend] = None) -> None:
+        """Build a cache.
+
+        :param backend: The backend that stores the results. Defaults to an unbounded :class:`MemoryCacheBackend`.
+        """
+        self.backend = backend if backend is not None else MemoryCacheBackend()
+        self.statistics = CacheStatistics()
+
+    @staticmethod
+    def get_key(digest: str, name: str, arguments: Any) -> str:
+        """Build the key for the result of the function with the given name on a graph with the given arguments."""
+        encoded = json.dumps([digest, name, _encode_argument(arguments)], sort_keys=True)
+        return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+    def get_or_calculate(self, key: str, calculate: Callable[[], X]) -> X:
+        """Get the result stored with the key, or calculate and store it."""
+        value = self.backend.get(key)
+        if value is not None:
+            self.statistics.hits += 1
+            return pickle.loads(value)
+
+        self.statistics.misses += 1
+        result = calculate()
+        self.statistics.evictions += self.backend.set(key, pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        return result
+
+    def clear(self) -> None:
+        """Remove all results and reset the statistics."""
+        self.backend.clear()
+        self.statistics = CacheStatistics()
+
+
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Get the cache used by functions decorated with :func:`cached_on_graph`, if one is installed."""
+    return _result_cache
+
+
+def set_result_cache(cache: Optional[ResultCache]) -> None:
+    """Install the cache used by functions decorated with :func:`cached_on_graph`, or uninstall it with None."""
+    global _result_cache
+    _result_cache = cache
+
+
+@contextmanager
+def use_result_cache(cache: ResultCache):
+    """Install the cache for the duration of a with block."""
+    previous = get_result_cache()
+    set_result_cache(cache)
+    try:
+        yield cache
+    finally:
+        set_result_cache(previous)
+
+
+def cached_on_graph(*, ignore: Iterable[str] = ()):
+    """Build a decorator that caches the results of a function of a graph in the installed :class:`ResultCache`.
+
+    The graph must be the function's first argument. Its other arguments are made part of the key, unless they're
+    in ``ignore``, so arguments that don't change the result, like progress bars or precomputed indexes, should be.
+    Calls with arguments that can't be encoded in a key are passed through without caching. Only deterministic
+    functions should be decorated, since a randomized one would return the same sample on every call.
+
+    The digest of a graph is calculated from scratch on each call, unless its fingerprint is tracked with
+    :func:`track_graph_fingerprint`. Then, the stored fingerprint is used as is, so edits to the graph that weren't
+    applied to it and keep its number of nodes and edges the same give stale results.
+
+    :param ignore: The names of the arguments to leave out of the key
+    """
+    ignore = set(ignore)
+
+    def _decorator(func: Callable[..., X]) -> Callable[..., X]:
+        signature = inspect.signature(func)
+        name = f'{func.__module__}.{func.__qualname__}'
+
+        @functools.wraps(func)
+        def _wrapped(graph: BELGraph, *args, **kwargs) -> X:
+            cache = get_result_cache()
+            if cache is None:
+                return func(graph, *args, **kwargs)
+
+            bound = signature.bind(graph, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = {
+                key: value
+                for key, value in list(bound.arguments.items())[1:]
+                if key not in ignore
+            }
+
+            try:
+                key = cache.get_key(get_graph_digest(graph), name, arguments)
+            except _UncacheableArgument as e:
+                logger.debug('not caching %s since an argument can not be encoded: %r', name, e.args[0])
+                cache.statistics.skips += 1
+                return func(graph, *args, **kwargs)
+
+            return cache.get_or_calculate(key, lambda: func(graph, *args, **kwargs))
+
+        return _wrapped
+
+    return _decorator
@@ -0,0 +1,383 @@
+# -*- coding: utf-8 -*-
+
+"""A compact, read-only snapshot of a BEL graph in compressed sparse row (CSR) format.
+
+Walking a :class:`pybel.BELGraph` means hashing and comparing :class:`pybel.dsl.BaseEntity` objects at every step. A
+:class:`CompiledGraph` numbers the nodes with int32 identifiers and stores the edges in flat NumPy arrays, so analyses
+that opt in can work on integers instead. It is picklable, so it can be sent to worker processes cheaply.
+
+>>> from pybel_tools.compiled import compile_graph
+>>> compiled = compile_graph(graph)
+>>> for target in compiled.successors(compiled.get_node_id(node)):
+...     print(compiled.nodes[target])
+
+A snapshot can also be saved as a directory of ``.npy`` files beside a JSON table of its nodes, relations, and edge
+keys. Loading it memory-maps the arrays, so many worker processes reading the same snapshot share the operating
+system's page cache instead of each holding a private copy of the graph.
+
+>>> from pybel_tools.compiled import load_snapshot, save_snapshot
+>>> save_snapshot(CompiledGraph.from_graph(graph, node_keys=['weight']), 'snapshot')
+>>> compiled = load_snapshot('snapshot')
+"""
+
+import json
+import os
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from pybel import BELGraph
+from pybel.constants import CAUSAL_DECREASE_RELATIONS, CAUSAL_INCREASE_RELATIONS, RELATION
+from pybel.dsl import BaseEntity
+from pybel.tokens import parse_result_to_dsl
+from .cache import GraphFingerprint, get_graph_fingerprint, is_graph_fingerprint_tracked
+
+__all__ = [
+    'CompiledGraph',
+    'compile_graph',
+    'save_snapshot',
+    'load_snapshot',
+    'get_worker_snapshot',
+    'map_on_snapshot',
+]
+
+X = TypeVar('X')
+Y = TypeVar('Y')
+
+#: The version of the snapshot directory format
+SNAPSHOT_VERSION = 1
+
+#: The arrays of a :class:`CompiledGraph` that are saved as ``.npy`` files
+_ARRAY_FIELDS = ('out_indptr', 'sources', 'targets', 'relations', 'polarity', 'in_indptr', 'in_edges')
+
+
+@dataclass(eq=False)
+class CompiledGraph:
+    """A snapshot of a BEL graph's nodes and edges in NumPy arrays.
+
+    The edges are numbered in the order of their sources, so the out-adjacency of node ``i`` is the slice
+    ``out_indptr[i]:out_indptr[i + 1]`` of :data:`targets`, :data:`relations`, and :data:`polarity`. The in-adjacency
+    of node ``i`` is the same slice of :data:`in_edges`, which holds edge identifiers ordered by target.
+    """
+
+    #: The node table. The identifier of each node is its position.
+    nodes: List[BaseEntity]
+    #: The relation table. The code of each relation is its position.
+    relation_names: List[str]
+    #: int64 offsets of each node's out-edges, of length ``number_of_nodes() + 1``
+    out_indptr: np.ndarray
+    #: int32 source node of each edge
+    sources: np.ndarray
+    #: int32 target node of each edge
+    targets: np.ndarray
+    #: int8 relation code of each edge
+    relations: np.ndarray
+    #: int8 polarity of each edge: 1 for causal increases, -1 for causal decreases, and 0 otherwise
+    polarity: np.ndarray
+    #: int64 offsets of each node's in-edges, of length ``number_of_nodes() + 1``
+    in_indptr: np.ndarray
+    #: int32 edge identifiers, ordered by their targets
+    in_edges: np.ndarray
+    #: The key of each edge in the original graph
+    keys: List[str]
+    #: Float columns of node data copied from the graph, with NaN for nodes without a value
+    node_columns: Dict[str, np.ndarray] = field(default_factory=dict)
+
+    _node_index: Optional[Dict[BaseEntity, int]] = field(default=None, repr=False)
+
+    @classmethod
+    def from_graph(cls, graph: BELGraph, node_keys: Iterable[str] = ()) -> 'CompiledGraph':
+        """Compile a BEL graph.
+
+        :param graph: A BEL graph
+        :param node_keys: Keys in the node data dictionaries whose values are copied into :data:`node_columns`
+        """
+        nodes = list(graph)
+        node_index = {node: i for i, node in enumerate(nodes)}
+
+        relation_names: List[str] = []
+        relation_index: Dict[str, int] = {}
+
+        sources, targets, relations, keys = [], [], [], []
+        for u, v, key, data in graph.edges(keys=True, data=True):
+            relation = data[RELATION]
+            code = relation_index.get(relation)
+            if code is None:
+                code = relation_index[relation] = len(relation_names)
+                relation_names.append(relation)
+
+            sources.append(node_index[u])
+            targets.append(node_index[v])
+            relations.append(code)
+            keys.append(key)
+
+        if len(relation_names) > np.iinfo(np.int8).max:
+            raise ValueError(f'too many relations to encode in int8: {len(relation_names)}')
+
+        sources = np.array(sources, dtype=np.int32)
+        targets = np.array(targets, dtype=np.int32)
+        relations = np.array(relations, dtype=np.int8)
+
+        # networkx already groups edges by their source, but sort stably to not depend on it
+        order = np.argsort(sources, kind='stable')
+        sources, targets, relations = sources[order], targets[order], relations[order]
+        keys = [keys[i] for i in order.tolist()]
+
+        relation_polarity = np.array([_get_polarity(name) for name in relation_names], dtype=np.int8)
+
+        return cls(
+            nodes=nodes,
+            relation_names=relation_names,
+            out_indptr=_get_indptr(sources, len(nodes)),
+            sources=sources,
+            targets=targets,
+            relations=relations,
+            polarity=relation_polarity[relations] if len(relations) else np.zeros(0, dtype=np.int8),
+            in_indptr=_get_indptr(targets, len(nodes)),
+            in_edges=np.argsort(targets, kind='stable').astype(np.int32),
+            keys=keys,
+            node_columns={
+                key: np.array([data.get(key, np.nan) for data in (graph.nodes[node] for node in nodes)], dtype=float)
+                for key in node_keys
+            },
+            _node_index=node_index,
+        )
+
+    def __getstate__(self):  # noqa: D105
+        state = self.__dict__.copy()
+        state['_node_index'] = None  # cheaper to rebuild than to pickle
+        return state
+
+    def number_of_nodes(self) -> int:
+        """Count the nodes."""
+        return len(self.nodes)
+
+    def number_of_edges(self) -> int:
+        """Count the edges."""
+        return len(self.targets)
+
+    @property
+    def node_index(self) -> Dict[BaseEntity, int]:
+        """A dictionary from each node to its identifier."""
+        if self._node_index is None:
+            self._node_index = {node: i for i, node in enumerate(self.nodes)}
+        return self._node_index
+
+    def get_node_id(self, node: BaseEntity) -> int:
+        """Get the identifier of a node."""
+        return self.node_index[node]
+
+    def get_relation_code(self, relation: str) -> int:
+        """Get the code of a relation, or -1 if it's not in the graph."""
+        try:
+            return self.relation_names.index(relation)
+        except ValueError:
+            return -1
+
+    def successors(self, node_id: int) -> np.ndarray:
+        """Get the targets of the out-edges of the node, with repeats for parallel edges."""
+        return self.targets[self.out_indptr[node_id]:self.out_indptr[node_id + 1]]
+
+    def predecessors(self, node_id: int) -> np.ndarray:
+        """Get the sources of the in-edges of the node, with repeats for parallel edges."""
+        return self.sources[self.in_edge_ids(node_id)]
+
+    def out_edge_ids(self, node_id: int) -> np.ndarray:
+        """Get the identifiers of the out-edges of the node."""
+        return np.arange(self.out_indptr[node_id], self.out_indptr[node_id + 1], dtype=np.int32)
+
+    def in_edge_ids(self, node_id: int) -> np.ndarray:
+        """Get the identifiers of the in-edges of the node."""
+        return self.in_edges[self.in_indptr[node_id]:self.in_indptr[node_id + 1]]
+
+    def get_edge(self, edge_id: int) -> Tuple[BaseEntity, BaseEntity, str]:
+        """Get the source, target, and key of an edge in the original graph."""
+        return self.nodes[self.sources[edge_id]], self.nodes[self.targets[edge_id]], self.keys[edge_id]
+
+    def get_node_vector(self, graph: BELGraph, key: str, default: float = np.nan) -> np.ndarray:
+        """Get a float array of the values for the given key in the graph's node data dictionaries."""
+        return np.array([
+            graph.nodes[node].get(key, default) if node in graph else default
+            for node in self.nodes
+        ], dtype=float)
+
+    def get_node_column(self, key: str) -> np.ndarray:
+        """Get a copy of a node data column saved in the snapshot.
+
+        :raises KeyError: if the column wasn't copied from the graph when compiling it
+        """
+        return np.array(self.node_columns[key], dtype=float)
+
+    def to_graph(self) -> BELGraph:
+        """Rebuild a BEL graph with the nodes, the edges' relations and keys, and the node data columns."""
+        rv = BELGraph()
+        for i, node in enumerate(self.nodes):
+            rv.add_node_from_data(node)
+            for key, column in self.node_columns.items():
+                value = column[i]
+                if not np.isnan(value):
+                    rv.nodes[node][key] = float(value)
+
+        for source, target, relation, key in zip(
+            self.sources.tolist(), self.targets.tolist(), self.relations.tolist(), self.keys,
+        ):
+            rv.add_edge(self.nodes[source], self.nodes[target], key=key, **{RELATION: self.relation_names[relation]})
+
+        return rv
+
+    def save(self, directory: str) -> None:
+        """Save the snapshot to a directory. See :func:`save_snapshot`."""
+        save_snapshot(self, directory)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'CompiledGraph':
+        """Load a snapshot from a directory. See :func:`load_snapshot`."""
+        return load_snapshot(directory, mmap=mmap)
+
+
+def save_snapshot(compiled: CompiledGraph, directory: str) -> None:
+    """Save a compiled graph as a directory of ``.npy`` files and a metadata table in ``metadata.json``.
+
+    :param compiled: A compiled graph
+    :param directory: The directory to write to. It is created if it does not exist.
+    """
+    os.makedirs(directory, exist_ok=True)
+
+    for name in _ARRAY_FIELDS:
+        np.save(os.path.join(directory, f'{name}.npy'), getattr(compiled, name))
+
+    node_columns = list(compiled.node_columns)
+    for i, key in enumerate(node_columns):
+        np.save(os.path.join(directory, f'node_column_{i}.npy'), compiled.node_columns[key])
+
+    with open(os.path.join(directory, 'metadata.json'), 'w') as file:
+        json.dump(
+            {
+                'version': SNAPSHOT_VERSION,
+                'relation_names': compiled.relation_names,
+                'node_columns': node_columns,
+                'nodes': compiled.nodes,
+                'keys': compiled.keys,
+            },
+            file,
+        )
+
+
+def load_snapshot(directory: str, mmap: bool = True) -> CompiledGraph:
+    """Load a compiled graph saved with :func:`save_snapshot`.
+
+    :param directory: The directory of the snapshot
+    :param mmap: Should the arrays be memory-mapped read-only? If false, they are read into memory.
+    :raises ValueError: if the snapshot was saved in a different version of the format
+    """
+    with open(os.path.join(directory, 'metadata.json')) as file:
+        metadata = json.load(file)
+
+    if metadata['version'] != SNAPSHOT_VERSION:
+        raise ValueError(f'unsupported snapshot version: {metadata["version"]}')
+
+    mmap_mode = 'r' if mmap else None
+
+    def _load(name: str) -> np.ndarray:
+        return np.load(os.path.join(directory, f'{name}.npy'), mmap_mode=mmap_mode)
+
+    return CompiledGraph(
+        nodes=[parse_result_to_dsl(node) for node in metadata['nodes']],
+        relation_names=metadata['relation_names'],
+        keys=metadata['keys'],
+        node_columns={
+            key: _load(f'node_column_{i}')
+            for i, key in enumerate(metadata['node_columns'])
+        },
+        **{name: _load(name) for name in _ARRAY_FIELDS},
+    )
+
+
+#: The snapshot of the current worker process, set by :func:`_initialize_worker`
+_worker_state: Dict[str, Any] = {}
+
+
+def _initialize_worker(directory: str) -> None:
+    _worker_state.clear()
+    _worker_state['snapshot'] = load_snapshot(directory)
+
+
+def get_worker_snapshot() -> CompiledGraph:
+    """Get the snapshot loaded by the current worker of :func:`map_on_snapshot`."""
+    return _worker_state['snapshot']
+
+
+def map_on_snapshot(
+    directory: str,
+    func: Callable[[X], Y],
+    items: Iterable[X],
+    processes: Optional[int] = None,
+) -> List[Y]:
+    """Apply the function to each item in a pool of processes that each memory-map the same snapshot once.
+
+    The function must be picklable, like a module-level function or a :func:`functools.partial` of one, and can
+    get the snapshot with :func:`get_worker_snapshot`. It should work on the snapshot's arrays directly, since
+    rebuilding a graph from it with :meth:`CompiledGraph.to_graph` gives each worker its own copy again.
+
+    :param directory: The directory of a snapshot saved with :func:`save_snapshot`
+    :param func: The function to apply to each item
+    :param items: The items
+    :param processes: The number of worker processes. Defaults to the number of CPUs. If 1, the items are processed
+     in this process instead.
+    :return: The results, in the order of the items
+    """
+    if processes == 1:
+        _initialize_worker(directory)
+        try:
+            return [func(item) for item in items]
+        finally:
+            _worker_state.clear()
+
+    with ProcessPoolExecutor(max_workers=processes, initializer=_initialize_worker, initargs=(directory,)) as executor:
+        return list(executor.map(func, items))
+
+
+def _get_polarity(relation: str) -> int:
+    if relation in CAUSAL_INCREASE_RELATIONS:
+        return 1
+    if relation in CAUSAL_DECREASE_RELATIONS:
+        return -1
+    return 0
+
+
+def _get_indptr(ids: np.ndarray, number_nodes: int) -> np.ndarray:
+    rv = np.zeros(number_nodes + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ids, minlength=number_nodes), out=rv[1:])
+    return rv
+
+
+_cache: 'weakref.WeakKeyDictionary[BELGraph, Tuple[GraphFingerprint, CompiledGraph]]' = weakref.WeakKeyDictionary()
+
+
+def compile_graph(graph: BELGraph, refresh: bool = False) -> CompiledGraph:
+    """Compile the graph, reusing the last snapshot of the same graph if its contents haven't changed.
+
+    Snapshots are only reused for graphs whose fingerprint is tracked with
+    :func:`pybel_tools.cache.track_graph_fingerprint`, since calculating the fingerprint of a graph from scratch takes
+    longer than compiling it. They're keyed on the fingerprint, so any edit applied to it, even one that keeps the
+    number of nodes and edges the same, makes the next call compile the graph again. Other graphs are compiled anew
+    on each call.
+
+    :param graph: A BEL graph
+    :param refresh: Should the snapshot be rebuilt anyway?
+    """
+    if not is_graph_fingerprint_tracked(graph):
+        _cache.pop(graph, None)
+        return CompiledGraph.from_graph(graph)
+
+    fingerprint = get_graph_fingerprint(graph)
+    cached = _cache.get(graph)
+    if not refresh and cached is not None and cached[0] == fingerprint:
+        return cached[1]
+
+    compiled = CompiledGraph.from_graph(graph)
+    _cache[graph] = fingerprint.copy(), compiled
+    return compiled
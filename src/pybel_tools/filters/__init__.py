@@ -3,5 +3,6 @@
 """Filters to supplement :mod:`pybel.struct.filters`."""
 
 from .edge_filters import *  # noqa: F401,F403
+from .edge_masks import *  # noqa: F401,F403
 from .node_deletion import *  # noqa: F401,F403
 from .node_filters import *  # noqa: F401,F403
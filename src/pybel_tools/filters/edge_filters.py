@@ -1,16 +1,22 @@
 # -*- coding: utf-8 -*-
 
-"""Edge filters to supplement :mod:`pybel.struct.filters.edge_filters`."""
+"""Edge filters to supplement :mod:`pybel.struct.filters.edge_filters`.
+
+Most of the predicates built here also have an ``edge_mask`` attribute for evaluating them on all edges at once with a
+:class:`pybel_tools.filters.EdgeTable`.
+"""
 
 from typing import Iterable, Mapping, Set
 
 from pybel import BELGraph
-from pybel.constants import CITATION, CITATION_AUTHORS, CITATION_IDENTIFIER, NAMESPACE
+from pybel.constants import CITATION, CITATION_AUTHORS, CITATION_IDENTIFIER, CONCEPT, NAMESPACE, RELATION
 from pybel.dsl import BaseEntity
-from pybel.struct.filters import (
-    build_annotation_dict_all_filter, build_annotation_dict_any_filter, count_passed_edge_filter,
+from pybel.struct.filters import build_annotation_dict_all_filter as _build_annotation_dict_all_filter
+from pybel.struct.filters import build_annotation_dict_any_filter as _build_annotation_dict_any_filter
+from pybel.struct.filters import count_passed_edge_filter
+from pybel.struct.filters.edge_predicates import (
+    edge_predicate, has_authors, has_pathology_causal, has_pubmed, keep_edge_permissive,
 )
-from pybel.struct.filters.edge_predicates import edge_predicate, has_authors, has_pathology_causal, has_pubmed
 from pybel.struct.filters.typing import EdgePredicate, EdgePredicates
 from pybel.typing import EdgeData, Strings
 from pybel.utils import subdict_matches
@@ -20,6 +26,7 @@ __all__ = [
     'build_edge_data_filter',
     'build_annotation_dict_all_filter',
     'build_annotation_dict_any_filter',
+    'build_relation_filter',
     'build_pmid_inclusion_filter',
     'build_pmid_exclusion_filter',
     'build_author_inclusion_filter',
@@ -55,6 +62,54 @@ def build_edge_data_filter(annotations: Mapping, partial_match: bool = True) ->
     return annotation_dict_filter
 
 
+def build_annotation_dict_all_filter(annotations: Mapping[str, Iterable[str]]) -> EdgePredicate:
+    """Pass for edges whose annotations include all of the given values, as in :mod:`pybel.struct.filters`.
+
+    :param annotations: The annotation query dict to match
+    """
+    rv = _build_annotation_dict_all_filter(annotations)
+    if rv is not keep_edge_permissive:
+        rv.edge_mask = lambda table, _: table.annotation_dict_all_mask(annotations)
+    return rv
+
+
+def build_annotation_dict_any_filter(annotations: Mapping[str, Iterable[str]]) -> EdgePredicate:
+    """Pass for edges whose annotations include any of the given values, as in :mod:`pybel.struct.filters`.
+
+    :param annotations: The annotation query dict to match
+    """
+    rv = _build_annotation_dict_any_filter(annotations)
+    if rv is not keep_edge_permissive:
+        rv.edge_mask = lambda table, _: table.annotation_dict_any_mask(annotations)
+    return rv
+
+
+def build_relation_filter(relations: Strings) -> EdgePredicate:
+    """Pass for edges with the given relation or one of the given relations.
+
+    :param relations: A relation or list of relations to filter for
+    """
+    if isinstance(relations, str):
+        @edge_predicate
+        def relation_filter(data: EdgeData) -> bool:
+            """Pass for edges with the contained relation."""
+            return data[RELATION] == relations
+
+    elif isinstance(relations, Iterable):
+        relations = set(relations)
+
+        @edge_predicate
+        def relation_filter(data: EdgeData) -> bool:
+            """Pass for edges with one of the contained relations."""
+            return data[RELATION] in relations
+
+    else:
+        raise TypeError
+
+    relation_filter.edge_mask = lambda table, _: table.relation_mask(relations)
+    return relation_filter
+
+
 def build_pmid_inclusion_filter(pmids: Strings) -> EdgePredicate:
     """Pass for edges with citations whose references are one of the given PubMed identifiers.
 
@@ -84,6 +139,7 @@ def build_pmid_inclusion_filter(pmids: Strings) -> EdgePredicate:
     else:
         raise TypeError
 
+    pmid_inclusion_filter.edge_mask = lambda table, _: table.pmid_mask(pmids)
     return pmid_inclusion_filter
 
 
@@ -115,6 +171,7 @@ def build_pmid_exclusion_filter(pmids: Strings) -> EdgePredicate:
     else:
         raise TypeError
 
+    pmid_exclusion_filter.edge_mask = lambda table, _: table.pubmed_mask() & ~table.pmid_mask(pmids)
     return pmid_exclusion_filter
 
 
@@ -149,18 +206,24 @@ def build_author_inclusion_filter(authors: Strings) -> EdgePredicate:
     else:
         raise TypeError
 
+    author_filter.edge_mask = lambda table, _: table.author_mask(authors)
     return author_filter
 
 
+def _get_namespace(node: BaseEntity):
+    concept = node.get(CONCEPT)
+    return concept.get(NAMESPACE) if concept is not None else None
+
+
 def node_has_namespace(node: BaseEntity, namespace: str) -> bool:
     """Pass for nodes that have the given namespace."""
-    ns = node.get(NAMESPACE)
+    ns = _get_namespace(node)
     return ns is not None and ns == namespace
 
 
 def node_has_namespaces(node: BaseEntity, namespaces: Set[str]) -> bool:
     """Pass for nodes that have one of the given namespaces."""
-    ns = node.get(NAMESPACE)
+    ns = _get_namespace(node)
     return ns is not None and ns in namespaces
 
 
@@ -182,6 +245,7 @@ def build_source_namespace_filter(namespaces: Strings) -> EdgePredicate:
     else:
         raise TypeError
 
+    source_namespace_filter.edge_mask = lambda table, _: table.source_namespace_mask(namespaces)
     return source_namespace_filter
 
 
@@ -203,4 +267,5 @@ def build_target_namespace_filter(namespaces: Strings) -> EdgePredicate:
     else:
         raise TypeError
 
+    target_namespace_filter.edge_mask = lambda table, _: table.target_namespace_mask(namespaces)
     return target_namespace_filter
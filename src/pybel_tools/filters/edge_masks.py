@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+
+"""Evaluate edge predicates as boolean masks over a columnar table of a graph's edges.
+
+Filtering with :func:`pybel.struct.filters.filter_edges` calls each predicate once per edge. An :class:`EdgeTable`
+reads the relations, the namespaces of the sources and targets, the PubMed identifiers, the authors, and the annotations
+of all edges in one pass, and stores them as integer codes in NumPy arrays. The predicates built by
+:mod:`pybel_tools.filters.edge_filters` know how to answer from these arrays for all edges at once. Any other predicate
+is still called once per edge, but only on the edges that the other predicates haven't decided already.
+
+>>> from pybel_tools.filters import EdgeTable, build_pmid_inclusion_filter, build_source_namespace_filter
+>>> table = EdgeTable(graph)
+>>> edges = table.filter([build_pmid_inclusion_filter(pmids), build_source_namespace_filter('HGNC')])
+"""
+
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from pybel import BELGraph
+from pybel.constants import (
+    ANNOTATIONS, CITATION, CITATION_AUTHORS, CITATION_DB, CITATION_IDENTIFIER, CITATION_TYPE_PUBMED, RELATION,
+)
+from pybel.dsl import BaseEntity
+from pybel.struct.filters.edge_predicates import keep_edge_permissive
+from pybel.struct.filters.typing import EdgePredicate, EdgePredicates
+from pybel.struct.mutation.utils import update_metadata, update_node_helper
+from pybel.typing import Strings
+from .edge_filters import _get_namespace
+
+__all__ = [
+    'EdgeTable',
+    'build_all_filter',
+    'build_any_filter',
+    'build_not_filter',
+]
+
+EdgeTuple = Tuple[BaseEntity, BaseEntity, str]
+
+#: The type of the ``edge_mask`` attribute of edge predicates that can be evaluated on an :class:`EdgeTable`. It
+#: takes the table and a mask of the edges that still need to be decided, and returns a mask of the edges passing
+#: the predicate. Its values outside of the given mask are ignored.
+EdgeMask = Callable[['EdgeTable', np.ndarray], np.ndarray]
+
+
+class _Column:
+    """A categorical column of strings, encoded as int32 codes with -1 for missing values."""
+
+    def __init__(self) -> None:
+        self.vocabulary: Dict[str, int] = {}
+        self._codes: List[int] = []
+        self.codes: Optional[np.ndarray] = None
+
+    def append(self, value: Optional[str]) -> None:
+        self._codes.append(-1 if value is None else self.vocabulary.setdefault(value, len(self.vocabulary)))
+
+    def freeze(self) -> None:
+        self.codes = np.array(self._codes, dtype=np.int32)
+        del self._codes
+
+    def lookup(self, values: Strings) -> np.ndarray:
+        """Get the codes of the values that appear in the column."""
+        values = {values} if isinstance(values, str) else set(values)
+        return np.array([self.vocabulary[value] for value in values if value in self.vocabulary], dtype=np.int32)
+
+    def isin(self, values: Strings) -> np.ndarray:
+        """Get a mask of the rows with one of the values."""
+        return np.isin(self.codes, self.lookup(values))
+
+
+class _MultiColumn(_Column):
+    """A categorical column with any number of values per edge, stored as parallel arrays of edges and codes."""
+
+    def __init__(self, size: int) -> None:
+        super().__init__()
+        self.size = size
+        self._edge_ids: List[int] = []
+        self.edge_ids: Optional[np.ndarray] = None
+        #: A mask of the edges that have the column, even if they have no values in it
+        self.present = np.zeros(size, dtype=bool)
+
+    def extend(self, edge_id: int, values: Iterable[str]) -> None:
+        self.present[edge_id] = True
+        for value in values:
+            self._edge_ids.append(edge_id)
+            self.append(value)
+
+    def freeze(self) -> None:
+        super().freeze()
+        self.edge_ids = np.array(self._edge_ids, dtype=np.int64)
+        del self._edge_ids
+
+    def isin(self, values: Strings) -> np.ndarray:
+        """Get a mask of the edges with one or more of the values."""
+        rv = np.zeros(self.size, dtype=bool)
+        rv[self.edge_ids[np.isin(self.codes, self.lookup(values))]] = True
+        return rv
+
+
+class EdgeTable:
+    """Columns of the edges of a graph, for evaluating edge predicates as boolean masks.
+
+    The edges are indexed in the order they were in the graph when the table was built, so the table should be rebuilt
+    after the graph changes.
+    """
+
+    def __init__(self, graph: BELGraph) -> None:
+        """Read the columns of all edges in the graph in one pass."""
+        self.graph = graph
+        self.edges: List[EdgeTuple] = list(graph.edges(keys=True))
+
+        self.relations = _Column()
+        self.source_namespaces = _Column()
+        self.target_namespaces = _Column()
+        self.pmids = _Column()
+        self.authors = _MultiColumn(len(self.edges))
+        self.annotations: Dict[str, _MultiColumn] = {}
+        #: A mask of the edges with an annotations dictionary, even if it's empty
+        self.annotated = np.zeros(len(self.edges), dtype=bool)
+
+        for edge_id, (u, v, data) in enumerate(graph.edges(data=True)):
+            self.relations.append(data[RELATION])
+            self.source_namespaces.append(_get_namespace(u))
+            self.target_namespaces.append(_get_namespace(v))
+
+            citation = data.get(CITATION)
+            self.pmids.append(
+                citation[CITATION_IDENTIFIER]
+                if citation is not None and citation.get(CITATION_DB) == CITATION_TYPE_PUBMED else
+                None
+            )
+            if citation is not None and citation.get(CITATION_AUTHORS):
+                self.authors.extend(edge_id, citation[CITATION_AUTHORS])
+
+            annotations = data.get(ANNOTATIONS)
+            if annotations is None:
+                continue
+            self.annotated[edge_id] = True
+            for annotation, values in annotations.items():
+                column = self.annotations.get(annotation)
+                if column is None:
+                    column = self.annotations[annotation] = _MultiColumn(len(self.edges))
+                column.extend(edge_id, values)
+
+        for column in (self.relations, self.source_namespaces, self.target_namespaces, self.pmids, self.authors):
+            column.freeze()
+        for column in self.annotations.values():
+            column.freeze()
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self.edges)
+
+    def relation_mask(self, relations: Strings) -> np.ndarray:
+        """Get a mask of the edges with the given relation or one of the given relations."""
+        return self.relations.isin(relations)
+
+    def source_namespace_mask(self, namespaces: Strings) -> np.ndarray:
+        """Get a mask of the edges whose sources have the given namespace or one of the given namespaces."""
+        return self.source_namespaces.isin(namespaces)
+
+    def target_namespace_mask(self, namespaces: Strings) -> np.ndarray:
+        """Get a mask of the edges whose targets have the given namespace or one of the given namespaces."""
+        return self.target_namespaces.isin(namespaces)
+
+    def pubmed_mask(self) -> np.ndarray:
+        """Get a mask of the edges with PubMed citations."""
+        return self.pmids.codes != -1
+
+    def pmid_mask(self, pmids: Strings) -> np.ndarray:
+        """Get a mask of the edges with PubMed citations matching the given identifier or one of the identifiers."""
+        return self.pmids.isin(pmids)
+
+    def author_mask(self, authors: Strings) -> np.ndarray:
+        """Get a mask of the edges with citations by the given author or one of the given authors."""
+        return self.authors.isin(authors)
+
+    def annotation_mask(self, annotation: str, values: Strings) -> np.ndarray:
+        """Get a mask of the edges annotated with the given value or one of the given values of the annotation."""
+        column = self.annotations.get(annotation)
+        if column is None:
+            return np.zeros(len(self.edges), dtype=bool)
+        return column.isin(values)
+
+    def annotation_dict_all_mask(self, query: Mapping[str, Iterable[str]]) -> np.ndarray:
+        """Get a mask as in :func:`pybel.struct.filters.build_annotation_dict_all_filter`.
+
+        Like it, edges need each of the annotations in the query, even the ones with no values.
+        """
+        rv = self.annotated.copy()
+        for annotation, values in query.items():
+            column = self.annotations.get(annotation)
+            if column is None:
+                return np.zeros(len(self.edges), dtype=bool)
+            rv &= column.present
+            for value in values:
+                rv &= column.isin(value)
+        return rv
+
+    def annotation_dict_any_mask(self, query: Mapping[str, Iterable[str]]) -> np.ndarray:
+        """Get a mask as in :func:`pybel.struct.filters.build_annotation_dict_any_filter`."""
+        rv = np.zeros(len(self.edges), dtype=bool)
+        for annotation, values in query.items():
+            rv |= self.annotation_mask(annotation, values)
+        return rv
+
+    def mask(self, edge_predicates: EdgePredicates) -> np.ndarray:
+        """Get a mask of the edges passing the given predicate or all of the given predicates.
+
+        Predicates that can't be evaluated on the table are called once per edge, but only on edges that passed the
+        other predicates.
+
+        :param edge_predicates: An edge predicate or list of edge predicates
+        """
+        return _get_all_mask(self, _as_tuple(edge_predicates), np.ones(len(self.edges), dtype=bool))
+
+    def filter(self, edge_predicates: EdgePredicates) -> List[EdgeTuple]:
+        """Get the edges passing the given predicate or all of the given predicates, like :func:`filter_edges`."""
+        return [self.edges[i] for i in np.flatnonzero(self.mask(edge_predicates)).tolist()]
+
+    def count(self, edge_predicates: EdgePredicates) -> int:
+        """Count the edges passing the given predicate or all of the given predicates."""
+        return int(self.mask(edge_predicates).sum())
+
+    def get_subgraph(self, edge_predicates: EdgePredicates) -> BELGraph:
+        """Induce a sub-graph over the edges passing the given predicates, like :func:`get_subgraph_by_edge_filter`."""
+        rv = self.graph.__class__()
+        rv.add_edges_from(
+            (u, v, k, self.graph[u][v][k])
+            for u, v, k in self.filter(edge_predicates)
+        )
+        update_node_helper(self.graph, rv)
+        update_metadata(self.graph, rv)
+        return rv
+
+
+def _as_tuple(edge_predicates: EdgePredicates) -> Tuple[EdgePredicate, ...]:
+    return tuple(edge_predicates) if isinstance(edge_predicates, Iterable) else (edge_predicates,)
+
+
+def _get_mask(table: EdgeTable, edge_predicate: EdgePredicate, where: np.ndarray) -> np.ndarray:
+    """Get the mask of the edges within the given mask that pass the predicate.
+
+    Uses the predicate's ``edge_mask`` attribute if it has one, and otherwise calls it on each edge in the mask.
+    """
+    if edge_predicate is keep_edge_permissive:
+        return where.copy()
+
+    edge_mask: Optional[EdgeMask] = getattr(edge_predicate, 'edge_mask', None)
+    if edge_mask is not None:
+        return edge_mask(table, where) & where
+
+    rv = np.zeros(len(table), dtype=bool)
+    for i in np.flatnonzero(where).tolist():
+        u, v, k = table.edges[i]
+        rv[i] = edge_predicate(table.graph, u, v, k)
+    return rv
+
+
+def _has_mask(edge_predicate: EdgePredicate) -> bool:
+    return edge_predicate is keep_edge_permissive or hasattr(edge_predicate, 'edge_mask')
+
+
+def _get_all_mask(table: EdgeTable, edge_predicates: Tuple[EdgePredicate, ...], where: np.ndarray) -> np.ndarray:
+    # evaluate the predicates with table masks first so the ones called per edge see as few edges as possible
+    for edge_predicate in sorted(edge_predicates, key=_has_mask, reverse=True):
+        where = _get_mask(table, edge_predicate, where)
+    return where
+
+
+def _get_any_mask(table: EdgeTable, edge_predicates: Tuple[EdgePredicate, ...], where: np.ndarray) -> np.ndarray:
+    rv = np.zeros(len(table), dtype=bool)
+    for edge_predicate in sorted(edge_predicates, key=_has_mask, reverse=True):
+        rv |= _get_mask(table, edge_predicate, where & ~rv)
+    return rv
+
+
+def build_all_filter(edge_predicates: EdgePredicates) -> EdgePredicate:
+    """Build an edge predicate that passes for edges passing all of the given predicates.
+
+    On an :class:`EdgeTable`, the masks of the given predicates are intersected.
+    """
+    edge_predicates = _as_tuple(edge_predicates)
+
+    def all_filter(graph: BELGraph, u: BaseEntity, v: BaseEntity, k: str) -> bool:
+        """Pass for edges passing all of the enclosed predicates."""
+        return all(edge_predicate(graph, u, v, k) for edge_predicate in edge_predicates)
+
+    all_filter.edge_mask = lambda table, where: _get_all_mask(table, edge_predicates, where)
+    return all_filter
+
+
+def build_any_filter(edge_predicates: EdgePredicates) -> EdgePredicate:
+    """Build an edge predicate that passes for edges passing any of the given predicates.
+
+    On an :class:`EdgeTable`, the masks of the given predicates are united.
+    """
+    edge_predicates = _as_tuple(edge_predicates)
+
+    def any_filter(graph: BELGraph, u: BaseEntity, v: BaseEntity, k: str) -> bool:
+        """Pass for edges passing any of the enclosed predicates."""
+        return any(edge_predicate(graph, u, v, k) for edge_predicate in edge_predicates)
+
+    any_filter.edge_mask = lambda table, where: _get_any_mask(table, edge_predicates, where)
+    return any_filter
+
+
+def build_not_filter(edge_predicate: EdgePredicate) -> EdgePredicate:
+    """Build an edge predicate that passes for edges failing the given predicate.
+
+    On an :class:`EdgeTable`, the mask of the given predicate is inverted.
+    """
+
+    def not_filter(graph: BELGraph, u: BaseEntity, v: BaseEntity, k: str) -> bool:
+        """Pass for edges failing the enclosed predicate."""
+        return not edge_predicate(graph, u, v, k)
+
+    not_filter.edge_mask = lambda table, where: ~_get_mask(table, edge_predicate, where)
+    return not_filter
@@ -27,7 +27,7 @@ from pybel.struct import data_missing_key_builder, get_nodes_by_function
 from pybel.struct.filters import filter_nodes
 from pybel.struct.mutation import expand_upstream_causal, get_upstream_causal_subgraph
 from pybel.struct.pipeline import in_place_transformation, transformation
-from .mutation import collapse_consistent_edges, remove_inconsistent_edges
+from .mutation import remove_inconsistent_and_collapse_consistent_edges
 
 __all__ = [
     'remove_unweighted_leaves',
@@ -45,7 +45,7 @@ def node_is_upstream_leaf(graph: BELGraph, node: BaseEntity) -> bool:
 
     An upstream leaf is defined as a node that has no in-edges, and exactly 1 out-edge.
     """
-    return 0 == len(graph.predecessors(node)) and 1 == len(graph.successors(node))
+    return 0 == graph.in_degree(node) and 1 == graph.out_degree(node)
 
 
 def get_upstream_leaves(graph: BELGraph) -> Iterable[BaseEntity]:
@@ -149,10 +149,9 @@ def generate_mechanism(graph: BELGraph, node: BaseEntity, key: Optional[str] = N
     :param key: The key in the node data dictionary representing the experimental data.
     :return: A sub-graph grown around the target BEL node
     """
-    subgraph = get_upstream_causal_subgraph(graph, node)
+    subgraph = get_upstream_causal_subgraph(graph, [node])
     expand_upstream_causal(graph, subgraph)
-    remove_inconsistent_edges(subgraph)
-    collapse_consistent_edges(subgraph)
+    remove_inconsistent_and_collapse_consistent_edges(subgraph)
 
     if key is not None:  # FIXME when is it not pruned?
         prune_mechanism_by_data(subgraph, key)
@@ -2,4 +2,5 @@
 
 """This module contains functions that help add more data to the network."""
 
+from .attribute_store import *  # noqa: F401,F403
 from .overlay import *  # noqa: F401,F403
@@ -0,0 +1,205 @@
+# -*- coding: utf-8 -*-
+
+"""A columnar store for node and edge attributes that sits beside a graph.
+
+Overlaying data, highlighting, and scoring normally write one value at a time into the nodes' and edges' data
+dictionaries, which are slow to read back for analysis. An :class:`AttributeStore` keeps these values in NumPy arrays
+indexed by a stable order of the graph's nodes and edges instead, and only writes them into the graph when asked.
+
+>>> from pybel_tools.integration import AttributeStore, overlay_data
+>>> store = AttributeStore(graph)
+>>> overlay_data(graph, {node: 1.5}, label='weight', store=store)
+>>> store.nodes.vector('weight')  # a float array with NaN for nodes without a value
+>>> store.sync_to_graph()
+"""
+
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from pybel import BELGraph
+from pybel.dsl import BaseEntity
+
+__all__ = [
+    'ColumnTable',
+    'AttributeStore',
+]
+
+EdgeKey = Tuple[BaseEntity, BaseEntity, str]
+
+
+class _Column:
+    """The values of one attribute, stored as a float array if possible and an object array otherwise."""
+
+    def __init__(self, size: int) -> None:
+        self.values = np.full(size, np.nan)
+        self.present = np.zeros(size, dtype=bool)
+
+    def set(self, positions: List[int], values: List[Any]) -> None:
+        if self.values.dtype != object and not all(_is_number(value) for value in values):
+            self.values = np.where(self.present, self.values, None).astype(object)
+        self.values[positions] = values
+        self.present[positions] = True
+
+    def remove(self, positions: List[int]) -> None:
+        self.values[positions] = np.nan if self.values.dtype != object else None
+        self.present[positions] = False
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+
+
+class ColumnTable:
+    """Columns of attribute values for a fixed list of nodes or edges."""
+
+    def __init__(self, keys: Iterable[Hashable]) -> None:
+        """Initialize the table.
+
+        :param keys: The nodes, or the (source, target, key) triples of the edges, in the order of the rows
+        """
+        self.keys = list(keys)
+        self.index: Dict[Hashable, int] = {key: i for i, key in enumerate(self.keys)}
+        self._columns: Dict[str, _Column] = {}
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self.keys)
+
+    def labels(self) -> List[str]:
+        """Get the labels of the columns."""
+        return list(self._columns)
+
+    def set(self, label: str, values: Mapping[Hashable, Any], overwrite: bool = True) -> None:
+        """Set the values in the column with the given label, creating it if necessary.
+
+        :param label: The label of the column
+        :param values: A dictionary from rows to their values. Rows not in the table are skipped.
+        :param overwrite: Should existing values be overwritten?
+        """
+        column = self._columns.get(label)
+        if column is None:
+            column = self._columns[label] = _Column(len(self.keys))
+
+        positions, new_values = [], []
+        for key, value in values.items():
+            position = self.index.get(key)
+            if position is None or (not overwrite and column.present[position]):
+                continue
+            positions.append(position)
+            new_values.append(value)
+
+        if positions:
+            column.set(positions, new_values)
+
+    def remove(self, label: str, keys: Optional[Iterable[Hashable]] = None) -> None:
+        """Remove the values in the column for the given rows, or the whole column if none are given."""
+        if label not in self._columns:
+            return
+        if keys is None:
+            del self._columns[label]
+            return
+        self._columns[label].remove([self.index[key] for key in keys if key in self.index])
+
+    def has(self, label: str, key: Hashable) -> bool:
+        """Check if the row has a value in the column."""
+        column = self._columns.get(label)
+        position = self.index.get(key)
+        return column is not None and position is not None and bool(column.present[position])
+
+    def get(self, label: str, key: Hashable, default: Any = None) -> Any:
+        """Get the value of the row in the column, or the default if it doesn't have one."""
+        if not self.has(label, key):
+            return default
+        value = self._columns[label].values[self.index[key]]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def vector(self, label: str) -> np.ndarray:
+        """Get the column as an array. Missing values are NaN for numeric columns and None otherwise."""
+        column = self._columns.get(label)
+        if column is None:
+            return np.full(len(self.keys), np.nan)
+        return column.values
+
+    def mask(self, label: str) -> np.ndarray:
+        """Get a boolean array of which rows have a value in the column."""
+        column = self._columns.get(label)
+        if column is None:
+            return np.zeros(len(self.keys), dtype=bool)
+        return column.present
+
+    def items(self, label: str) -> Iterable[Tuple[Hashable, Any]]:
+        """Iterate over the rows with values in the column and their values."""
+        for position in np.flatnonzero(self.mask(label)).tolist():
+            yield self.keys[position], self.get(label, self.keys[position])
+
+
+class AttributeStore:
+    """A columnar store of node and edge attributes for a graph, kept apart from its data dictionaries.
+
+    The nodes and edges are indexed in the order they were in the graph when the store was built, so the store should
+    be rebuilt if nodes or edges are added. Values for nodes or edges missing from the index are ignored.
+    """
+
+    def __init__(self, graph: BELGraph) -> None:
+        """Index the nodes and edges of the graph."""
+        self.graph = graph
+        self.nodes = ColumnTable(graph)
+        self.edges = ColumnTable(graph.edges(keys=True))
+
+        node_index = self.nodes.index
+        self.sources = np.array([node_index[u] for u, _, _ in self.edges.keys], dtype=np.int64)
+        self.targets = np.array([node_index[v] for _, v, _ in self.edges.keys], dtype=np.int64)
+
+    @classmethod
+    def from_graph(
+        cls,
+        graph: BELGraph,
+        node_labels: Iterable[str] = (),
+        edge_labels: Iterable[str] = (),
+    ) -> 'AttributeStore':
+        """Build a store and load the given attributes from the graph's data dictionaries."""
+        store = cls(graph)
+        for label in node_labels:
+            store.nodes.set(label, {
+                node: data[label]
+                for node, data in graph.nodes(data=True)
+                if label in data
+            })
+        for label in edge_labels:
+            store.edges.set(label, {
+                (u, v, k): data[label]
+                for u, v, k, data in graph.edges(keys=True, data=True)
+                if label in data
+            })
+        return store
+
+    def sync_to_graph(
+        self,
+        node_labels: Optional[Iterable[str]] = None,
+        edge_labels: Optional[Iterable[str]] = None,
+    ) -> None:
+        """Write the columns into the graph's data dictionaries, removing the values of rows without one.
+
+        :param node_labels: The node columns to write. Defaults to all.
+        :param edge_labels: The edge columns to write. Defaults to all.
+        """
+        for label in self.nodes.labels() if node_labels is None else node_labels:
+            mask = self.nodes.mask(label)
+            for node, present in zip(self.nodes.keys, mask.tolist()):
+                if present:
+                    self.graph.nodes[node][label] = self.nodes.get(label, node)
+                elif node in self.graph:
+                    self.graph.nodes[node].pop(label, None)
+
+        for label in self.edges.labels() if edge_labels is None else edge_labels:
+            mask = self.edges.mask(label)
+            for (u, v, k), present in zip(self.edges.keys, mask.tolist()):
+                if present:
+                    self.graph[u][v][k][label] = self.edges.get(label, (u, v, k))
+                elif self.graph.has_edge(u, v, k):
+                    self.graph[u][v][k].pop(label, None)
+
+    def get_edge_endpoint_vectors(self, label: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Get the values of a node column for the sources and targets of all edges, in the order of the edges."""
+        vector = self.nodes.vector(label)
+        return vector[self.sources], vector[self.targets]
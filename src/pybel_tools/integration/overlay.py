@@ -12,6 +12,7 @@ import pandas as pd
 from pybel import BELGraph
 from pybel.dsl import BaseConcept, BaseEntity
 from pybel.struct.pipeline import in_place_transformation
+from .attribute_store import AttributeStore
 
 __all__ = [
     'overlay_data',
@@ -28,6 +29,7 @@ def overlay_data(
     data: Mapping[BaseEntity, Any],
     label: Optional[str] = None,
     overwrite: bool = False,
+    store: Optional[AttributeStore] = None,
 ) -> None:
     """Overlay tabular data on the network.
 
@@ -35,10 +37,15 @@ def overlay_data(
     :param data: A dictionary of {tuple node: data for that node}
     :param label: The annotation label to put in the node dictionary
     :param overwrite: Should old annotations be overwritten?
+    :param store: If given, the data are written to this store's node columns instead of the node dictionaries
     """
     if label is None:
         label = 'weight'
 
+    if store is not None:
+        store.nodes.set(label, data, overwrite=overwrite)
+        return
+
     for node, value in data.items():
         if node not in graph:
             logger.debug('%s not in graph', node)
@@ -60,6 +67,7 @@ def overlay_type_data(
     label: Optional[str] = None,
     overwrite: bool = False,
     impute: Optional[float] = None,
+    store: Optional[AttributeStore] = None,
 ) -> None:
     """Overlay tabular data on the network using the given namespace.
 
@@ -74,6 +82,7 @@ def overlay_type_data(
     :param label: The annotation label to put in the node dictionary
     :param overwrite: Should old annotations be overwritten?
     :param impute: The value to use for missing data
+    :param store: If given, the data are written to this store's node columns instead of the node dictionaries
     """
     namespace = namespace.lower()
 
@@ -83,7 +92,7 @@ def overlay_type_data(
         if isinstance(node, node_cls) and node.namespace.lower() == namespace
     }
 
-    overlay_data(graph, new_data, label=label, overwrite=overwrite)
+    overlay_data(graph, new_data, label=label, overwrite=overwrite, store=store)
 
 
 def load_differential_gene_expression(
@@ -2,9 +2,9 @@
 
 """Collapse functions to supplement :mod:`pybel.struct.mutation.collapse`."""
 
-import itertools as itt
 import logging
 from collections import defaultdict
+from typing import Dict, Iterable, Optional, Tuple
 
 import networkx as nx
 from tqdm import tqdm
@@ -14,18 +14,22 @@ from pybel.constants import EQUIVALENT_TO, GENE, HAS_VARIANT, ORTHOLOGOUS, PROTE
 from pybel.dsl import BaseConcept, BaseEntity, CentralDogma, Gene, Protein
 from pybel.struct.filters import build_relation_predicate, filter_edges, has_polarity
 from pybel.struct.filters.typing import EdgePredicates
-from pybel.struct.mutation import collapse_nodes, collapse_pair, collapse_to_genes, get_subgraph_by_edge_filter
+from pybel.struct.mutation import collapse_nodes, collapse_to_genes, get_subgraph_by_edge_filter
 from pybel.struct.pipeline import in_place_transformation, transformation
 from pybel.typing import Strings
+from pybel.utils import hash_edge
 from ..filters.edge_filters import build_source_namespace_filter, build_target_namespace_filter
-from ..summary.edge_summary import pair_is_consistent
+from ..summary.pair_relations import build_pair_relation_index, mask_is_consistent
 
 __all__ = [
     'collapse_nodes',
+    'get_survivor_mapping',
+    'collapse_pairs',
     'rewire_variants_to_genes',
     'collapse_gene_variants',
     'collapse_protein_variants',
     'collapse_consistent_edges',
+    'remove_inconsistent_and_collapse_consistent_edges',
     'collapse_equivalencies_by_namespace',
     'collapse_orthologies_by_namespace',
     'collapse_to_protein_interactions',
@@ -49,9 +53,79 @@ def collapse_gene_variants(graph: BELGraph) -> None:
 
 def _collapse_variants_by_function(graph: BELGraph, func: str) -> None:
     """Collapse all of the given functions' variants' edges to their parents, in-place."""
-    for parent_node, variant_node, data in graph.edges(data=True):
-        if data[RELATION] == HAS_VARIANT and parent_node.function == func:
-            collapse_pair(graph, from_node=variant_node, to_node=parent_node)
+    collapse_pairs(graph, (
+        (variant_node, parent_node)
+        for parent_node, variant_node, data in graph.edges(data=True)
+        if data[RELATION] == HAS_VARIANT and parent_node.function == func
+    ))
+
+
+def get_survivor_mapping(pairs: Iterable[Tuple[BaseEntity, BaseEntity]]) -> Dict[BaseEntity, BaseEntity]:
+    """Resolve (victim, survivor) pairs to a dictionary from each victim to its final survivor.
+
+    Chains like A -> B -> C resolve to {A: C, B: C}. Only victims are ever merged into other nodes, so two survivors
+    are never merged with each other, even if they share a victim. A victim with several survivors, like a mouse gene
+    orthologous to two human genes, is collapsed into the first one, like with
+    :func:`pybel.struct.mutation.collapse_pair`. Pairs that would close a cycle are ignored, so the survivor of a cycle
+    is determined by the order of the pairs.
+
+    :param pairs: An iterable of (victim, survivor) pairs
+    """
+    parent = {}
+
+    def find(node: BaseEntity) -> BaseEntity:
+        while node in parent:
+            grandparent = parent[node]
+            if grandparent in parent:
+                parent[node] = grandparent = parent[grandparent]
+            node = grandparent
+        return node
+
+    for victim, survivor in pairs:
+        if victim in parent or find(survivor) == victim:
+            continue
+        parent[victim] = survivor
+
+    return {
+        victim: find(victim)
+        for victim in list(parent)
+    }
+
+
+def collapse_pairs(graph: BELGraph, pairs: Iterable[Tuple[BaseEntity, BaseEntity]]) -> Dict[BaseEntity, BaseEntity]:
+    """Collapse all of the (victim, survivor) pairs at once, in place.
+
+    Unlike calling :func:`pybel.struct.mutation.collapse_pair` for each pair, the pairs are resolved first with
+    :func:`get_survivor_mapping` so the edges of each victim are rewired exactly once, directly to its final survivor.
+    Edges that would become self-edges by collapsing are dropped.
+
+    :param graph: A BEL graph
+    :param pairs: An iterable of (victim, survivor) pairs
+    :return: The dictionary from each victim to its survivor
+    """
+    mapping = get_survivor_mapping(pairs)
+
+    edges = []
+    for victim in mapping:
+        if victim not in graph:
+            continue
+        for u, v, data in graph.out_edges(victim, data=True):
+            edges.append((u, v, data))
+        for u, v, data in graph.in_edges(victim, data=True):
+            if u not in mapping:  # edges between victims were already added as out-edges
+                edges.append((u, v, data))
+
+    graph.remove_nodes_from(mapping)
+    graph.add_edges_from(
+        (u, v, hash_edge(u, v, data), data)
+        for u, v, data in (
+            (mapping.get(u, u), mapping.get(v, v), data)
+            for u, v, data in edges
+        )
+        if u != v
+    )
+
+    return mapping
 
 
 @in_place_transformation
@@ -78,22 +152,24 @@ def rewire_variants_to_genes(graph: BELGraph) -> None:
 
 
 def _collapse_edge_passing_predicates(graph: BELGraph, edge_predicates: EdgePredicates = None) -> None:
-    """Collapse all edges passing the given edge predicates."""
-    for u, v, _ in filter_edges(graph, edge_predicates=edge_predicates):
-        collapse_pair(graph, survivor=u, victim=v)
+    """Collapse the source node of each edge passing the given edge predicates into its target node."""
+    collapse_pairs(graph, (
+        (u, v)
+        for u, v, _ in filter_edges(graph, edge_predicates=edge_predicates)
+    ))
 
 
 def _collapse_edge_by_namespace(
     graph: BELGraph,
     victim_namespaces: Strings,
-    survivor_namespaces: str,
+    survivor_namespaces: Strings,
     relations: Strings,
 ) -> None:
     """Collapse pairs of nodes with the given namespaces that have the given relationship.
 
     :param graph: A BEL Graph
     :param victim_namespaces: The namespace(s) of the node to collapse
-    :param survivor_namespaces: The namespace of the node to keep
+    :param survivor_namespaces: The namespace(s) of the node to keep
     :param relations: The relation(s) to search
     """
     relation_filter = build_relation_predicate(relations)
@@ -110,12 +186,16 @@ def _collapse_edge_by_namespace(
 
 
 @in_place_transformation
-def collapse_equivalencies_by_namespace(graph: BELGraph, victim_namespace: Strings, survivor_namespace: str) -> None:
+def collapse_equivalencies_by_namespace(
+    graph: BELGraph,
+    victim_namespace: Strings,
+    survivor_namespace: Strings,
+) -> None:
     """Collapse pairs of nodes with the given namespaces that have equivalence relationships.
 
     :param graph: A BEL graph
     :param victim_namespace: The namespace(s) of the node to collapse
-    :param survivor_namespace: The namespace of the node to keep
+    :param survivor_namespace: The namespace(s) of the node to keep
 
     To convert all ChEBI names to InChI keys, assuming there are appropriate equivalence relations between nodes with
     those namespaces:
@@ -127,12 +207,16 @@ def collapse_equivalencies_by_namespace(graph: BELGraph, victim_namespace: Strin
 
 
 @in_place_transformation
-def collapse_orthologies_by_namespace(graph: BELGraph, victim_namespace: Strings, survivor_namespace: str) -> None:
+def collapse_orthologies_by_namespace(
+    graph: BELGraph,
+    victim_namespace: Strings,
+    survivor_namespace: Strings,
+) -> None:
     """Collapse pairs of nodes with the given namespaces that have orthology relationships.
 
     :param graph: A BEL Graph
     :param victim_namespace: The namespace(s) of the node to collapse
-    :param survivor_namespace: The namespace of the node to keep
+    :param survivor_namespace: The namespace(s) of the node to keep
 
     To collapse all MGI nodes to their HGNC orthologs, use:
     >>> collapse_orthologies_by_namespace('MGI', 'HGNC')
@@ -188,15 +272,47 @@ def collapse_consistent_edges(graph: BELGraph):
 
     .. warning:: This operation doesn't preserve evidences or other annotations
     """
-    for u, v in graph.edges():
-        relation = pair_is_consistent(graph, u, v)
+    for (u, v), mask in build_pair_relation_index(graph).items():
+        relation = mask_is_consistent(mask)
 
         if not relation:
             continue
 
-        edges = [(u, v, k) for k in graph[u][v]]
-        graph.remove_edges_from(edges)
-        graph.add_edge(u, v, attr_dict={RELATION: relation})
+        _collapse_pair_edges(graph, u, v, relation)
+
+
+@in_place_transformation
+def remove_inconsistent_and_collapse_consistent_edges(graph: BELGraph) -> None:
+    """Remove all edges between node pairs with inconsistent edges and collapse the remaining edges, in one pass.
+
+    Each pair of nodes is classified once using :func:`pybel_tools.summary.build_pair_relation_index`.
+
+    .. warning:: This operation doesn't preserve evidences or other annotations
+
+    Equivalent to:
+
+    >>> from pybel_tools.mutation import collapse_consistent_edges, remove_inconsistent_edges
+    >>> remove_inconsistent_edges(graph)
+    >>> collapse_consistent_edges(graph)
+    """
+    inconsistent_edges = []
+
+    for (u, v), mask in build_pair_relation_index(graph).items():
+        relation = mask_is_consistent(mask)
+
+        if relation:
+            _collapse_pair_edges(graph, u, v, relation)
+        else:
+            inconsistent_edges.extend((u, v, k) for k in graph[u][v])
+
+    graph.remove_edges_from(inconsistent_edges)
+
+
+def _collapse_pair_edges(graph: BELGraph, u: BaseEntity, v: BaseEntity, relation: str) -> None:
+    """Replace all edges from u to v with a single edge with the given relation."""
+    edges = [(u, v, k) for k in graph[u][v]]
+    graph.remove_edges_from(edges)
+    graph.add_edge(u, v, **{RELATION: relation})
 
 
 @transformation
@@ -215,49 +331,35 @@ def collapse_to_protein_interactions(graph: BELGraph) -> BELGraph:
 
 @in_place_transformation
 def collapse_nodes_with_same_names(graph: BELGraph, priority, use_tqdm: bool = False) -> None:
-    """Collapse all nodes with the same name, merging namespaces by picking first alphabetical one."""
+    """Collapse all nodes with the same name, merging namespaces by the given priority.
+
+    Nodes are bucketed by their function, lower-cased name, and variants in a single pass, then the node whose
+    namespace comes first in the priority list survives in each bucket. If none of the namespaces in a bucket are in
+    the priority list, the namespace that sorts last wins.
+    """
     p = {namespace: i for i, namespace in enumerate(reversed(priority))}
 
-    survivor_mapping = defaultdict(set)  # Collapse mapping dict
-    victims = set()  # Things already mapped while iterating
+    buckets = defaultdict(list)
 
-    named_nodes = [node for node in graph if isinstance(node, BaseConcept)]
+    it = tqdm(graph, desc='bucketing named nodes') if use_tqdm else graph
+    for node in it:
+        if isinstance(node, BaseConcept) and node.name:
+            buckets[_get_name_bucket(node)].append(node)
 
-    it = itt.combinations(named_nodes, r=2)
-    if use_tqdm:
-        it = tqdm(use_tqdm, total=len(named_nodes) * (len(named_nodes) - 1) / 2)
-    for a, b in it:
-        if not _can_map(a, b):
+    survivor_mapping = {}  # Collapse mapping dict
+    for nodes in buckets.values():
+        if len(nodes) < 2:
             continue
 
-        a_priority = p.get(a.namespace)
-        b_priority = p.get(b.namespace)
-
-        if a_priority is None and b_priority is None:
-            no_swap = a.namespace > b.namespace
-        else:
-            no_swap = a_priority > b_priority
-
-        if no_swap:
-            survivor_mapping[a].add(b)
-            victims.add(b)
-        else:
-            survivor_mapping[b].add(a)
-            victims.add(a)
+        survivor = max(nodes, key=lambda node: (p.get(node.namespace, -1), node.namespace, str(node)))
+        survivor_mapping[survivor] = {node for node in nodes if node != survivor}
 
     collapse_nodes(graph, survivor_mapping)
 
 
-def _can_map(a: BaseConcept, b: BaseConcept) -> bool:
-    if a.function != b.function:
-        return False
-    if a.name.lower() != b.name.lower():
-        return False
-    if (
-        isinstance(a, CentralDogma)
-        and isinstance(b, CentralDogma)
-        and a.variants != b.variants
-    ):
-        return False
-
-    return True
+def _get_name_bucket(node: BaseConcept) -> Tuple[str, str, Optional[Tuple[str, ...]]]:
+    """Get a key that is shared by all nodes that can be collapsed by name."""
+    variants = None
+    if isinstance(node, CentralDogma) and node.variants is not None:
+        variants = tuple(variant.as_bel() for variant in node.variants)
+    return node.function, node.name.lower(), variants
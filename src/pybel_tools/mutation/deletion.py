@@ -7,7 +7,7 @@ from typing import Iterable, Tuple
 from pybel import BELGraph
 from pybel.dsl import BaseEntity
 from pybel.struct.pipeline import in_place_transformation
-from ..summary.edge_summary import pair_is_consistent
+from ..summary.pair_relations import build_pair_relation_index, mask_is_consistent
 
 __all__ = [
     'remove_inconsistent_edges',
@@ -21,13 +21,13 @@ def remove_inconsistent_edges(graph: BELGraph) -> None:
     This is the all-or-nothing approach. It would be better to do more careful investigation of the evidences during
     curation.
     """
-    for u, v in get_inconsistent_edges(graph):
+    for u, v in list(get_inconsistent_edges(graph)):
         edges = [(u, v, k) for k in graph[u][v]]
         graph.remove_edges_from(edges)
 
 
 def get_inconsistent_edges(graph: BELGraph) -> Iterable[Tuple[BaseEntity]]:
     """Iterate over pairs of nodes with inconsistent edges."""
-    for u, v in graph.edges():
-        if not pair_is_consistent(graph, u, v):
+    for (u, v), mask in build_pair_relation_index(graph).items():
+        if not mask_is_consistent(mask):
             yield u, v
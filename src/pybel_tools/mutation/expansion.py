@@ -2,7 +2,6 @@
 
 """Deletion functions to supplement :mod:`pybel.struct.mutation.expansion`."""
 
-import itertools as itt
 import logging
 import typing
 from collections import Counter, defaultdict
@@ -325,17 +324,22 @@ def expand_internal_causal(universe: BELGraph, graph: BELGraph) -> None:
     >>> expand_internal(universe, graph, edge_predicates=is_causal_relation)
     """
     for u, v, key in iterate_internal(universe, graph):
-        data = universe.edges[u][v][key]
+        data = universe[u][v][key]
         if is_causal_relation(data):
             graph.add_edge(u, v, key=key, **data)
 
 
 def iterate_internal(universe: BELGraph, graph: BELGraph) -> EdgeIterator:
-    """Iterate over edges that are in the universe but not the target graph."""
-    for u, v in itt.product(graph, repeat=2):
-        if graph.has_edge(u, v):
-            continue
-        if not universe.has_edge(u, v):
+    """Iterate over edges that are in the universe but not the target graph.
+
+    Only the successors of each node in the target graph are checked, so this takes time proportional to the sum of
+    their degrees in the universe rather than the square of the number of nodes in the target graph.
+    """
+    for u in graph:
+        if u not in universe:
             continue
-        for key in universe[u][v]:
-            yield u, v, key
+        for v, keys in universe[u].items():
+            if v not in graph or graph.has_edge(u, v):
+                continue
+            for key in keys:
+                yield u, v, key
@@ -1,6 +1,11 @@
 # -*- coding: utf-8 -*-
 
-"""Functions for adding highlighting tags to nodes and edges in BEL graphs."""
+"""Functions for adding highlighting tags to nodes and edges in BEL graphs.
+
+Each function optionally takes a :class:`pybel_tools.integration.AttributeStore`, in which case the highlights are
+kept in its columns under :data:`NODE_HIGHLIGHT` and :data:`EDGE_HIGHLIGHT` instead of in the graph's data
+dictionaries until :meth:`pybel_tools.integration.AttributeStore.sync_to_graph` is called.
+"""
 
 from typing import Iterable, Optional
 
@@ -8,6 +13,7 @@ from pybel import BELGraph
 from pybel.dsl import BaseEntity
 from pybel.struct.filters.typing import EdgeIterator
 from pybel.struct.pipeline import in_place_transformation, uni_in_place_transformation
+from ..integration.attribute_store import AttributeStore
 
 __all__ = [
     'NODE_HIGHLIGHT',
@@ -33,20 +39,30 @@ def highlight_nodes(
     graph: BELGraph,
     nodes: Optional[Iterable[BaseEntity]] = None,
     color: Optional[str] = None,
+    store: Optional[AttributeStore] = None,
 ) -> None:
     """Add a highlight tag to the given nodes.
 
     :param graph: A BEL graph
     :param nodes: The nodes to add a highlight tag on
     :param color: The color to highlight (use something that works with CSS)
+    :param store: An optional attribute store to write the highlights to instead of the graph
     """
     color = color or NODE_HIGHLIGHT_DEFAULT_COLOR
-    for node in nodes if nodes is not None else graph:
+    nodes = nodes if nodes is not None else graph
+
+    if store is not None:
+        store.nodes.set(NODE_HIGHLIGHT, {node: color for node in nodes})
+        return
+
+    for node in nodes:
         graph.nodes[node][NODE_HIGHLIGHT] = color
 
 
-def is_node_highlighted(graph: BELGraph, node: BaseEntity) -> bool:
+def is_node_highlighted(graph: BELGraph, node: BaseEntity, store: Optional[AttributeStore] = None) -> bool:
     """Return if the given node is highlighted."""
+    if store is not None:
+        return store.nodes.has(NODE_HIGHLIGHT, node)
     return NODE_HIGHLIGHT in graph.nodes[node]
 
 
@@ -54,12 +70,18 @@ def is_node_highlighted(graph: BELGraph, node: BaseEntity) -> bool:
 def remove_highlight_nodes(
     graph: BELGraph,
     nodes: Optional[Iterable[BaseEntity]] = None,
+    store: Optional[AttributeStore] = None,
 ) -> None:
     """Remove the highlight from the given nodes, or all nodes if none given.
 
     :param graph: A BEL graph
     :param nodes: The list of nodes to un-highlight
+    :param store: An optional attribute store to remove the highlights from instead of the graph
     """
+    if store is not None:
+        store.nodes.remove(NODE_HIGHLIGHT, nodes)
+        return
+
     for node in graph if nodes is None else nodes:
         if is_node_highlighted(graph, node):
             del graph.nodes[node][NODE_HIGHLIGHT]
@@ -70,22 +92,38 @@ def highlight_edges(
     graph: BELGraph,
     edges: Optional[EdgeIterator] = None,
     color: Optional[str] = None,
+    store: Optional[AttributeStore] = None,
 ) -> None:
     """Add a highlight tag to the given edges.
 
     :param graph: A BEL graph
     :param edges: The edges (3-tuples of u, v, k) to add a highlight tag on
     :param color: The color to highlight (use something that works with CSS)
+    :param store: An optional attribute store to write the highlights to instead of the graph
     """
     if color is None:
         color = EDGE_HIGHLIGHT_DEFAULT_COLOR
 
-    for u, v, k, d in edges if edges is not None else graph.edges(keys=True, data=True):
+    edges = edges if edges is not None else graph.edges(keys=True)
+
+    if store is not None:
+        store.edges.set(EDGE_HIGHLIGHT, {(u, v, k): color for u, v, k in edges})
+        return
+
+    for u, v, k in edges:
         graph[u][v][k][EDGE_HIGHLIGHT] = color
 
 
-def is_edge_highlighted(graph: BELGraph, u: BaseEntity, v: BaseEntity, k: str) -> bool:
+def is_edge_highlighted(
+    graph: BELGraph,
+    u: BaseEntity,
+    v: BaseEntity,
+    k: str,
+    store: Optional[AttributeStore] = None,
+) -> bool:
     """Return if the given edge is highlighted."""
+    if store is not None:
+        return store.edges.has(EDGE_HIGHLIGHT, (u, v, k))
     return EDGE_HIGHLIGHT in graph[u][v][k]
 
 
@@ -93,34 +131,42 @@ def is_edge_highlighted(graph: BELGraph, u: BaseEntity, v: BaseEntity, k: str) -
 def remove_highlight_edges(
     graph: BELGraph,
     edges: Optional[EdgeIterator] = None,
+    store: Optional[AttributeStore] = None,
 ) -> None:
     """Remove the highlight from the given edges, or all edges if none given.
 
     :param graph: A BEL graph
     :param edges: The edges (3-tuple of u, v, k) to remove the highlight from)
+    :param store: An optional attribute store to remove the highlights from instead of the graph
     """
+    if store is not None:
+        store.edges.remove(EDGE_HIGHLIGHT, edges)
+        return
+
     for u, v, k in graph.edges(keys=True) if edges is None else edges:
         if is_edge_highlighted(graph, u, v, k):
             del graph[u][v][k][EDGE_HIGHLIGHT]
 
 
 @uni_in_place_transformation
-def highlight_subgraph(universe: BELGraph, graph: BELGraph) -> None:
+def highlight_subgraph(universe: BELGraph, graph: BELGraph, store: Optional[AttributeStore] = None) -> None:
     """Highlight all nodes/edges in the universe that in the given graph.
 
     :param universe: The universe of knowledge
     :param graph: The BEL graph to mutate
+    :param store: An optional attribute store for the universe to write the highlights to instead
     """
-    highlight_nodes(universe, graph.nodes())
-    highlight_edges(universe, graph.edges())
+    highlight_nodes(universe, graph.nodes(), store=store)
+    highlight_edges(universe, graph.edges(keys=True), store=store)
 
 
 @in_place_transformation
-def remove_highlight_subgraph(graph: BELGraph, subgraph: BELGraph) -> None:
+def remove_highlight_subgraph(graph: BELGraph, subgraph: BELGraph, store: Optional[AttributeStore] = None) -> None:
     """Remove the highlight from all nodes/edges in the graph that are in the subgraph.
 
     :param graph: The BEL graph to mutate
     :param subgraph: The subgraph from which to remove the highlighting
+    :param store: An optional attribute store for the graph to remove the highlights from instead
     """
-    remove_highlight_nodes(graph, subgraph.nodes())
-    remove_highlight_edges(graph, subgraph.edges())
+    remove_highlight_nodes(graph, subgraph.nodes(), store=store)
+    remove_highlight_edges(graph, subgraph.edges(keys=True), store=store)
@@ -2,8 +2,6 @@
 
 """Inference functions."""
 
-import itertools as itt
-
 from pybel import BELGraph, BaseEntity
 from pybel.constants import RELATION, TWO_WAY_RELATIONS
 from pybel.struct import enrich_protein_and_rna_origins
@@ -50,13 +48,25 @@ def infer_missing_backwards_edge(graph: BELGraph, u: BaseEntity, v: BaseEntity,
 def enrich_internal_unqualified_edges(graph: BELGraph, subgraph: BELGraph) -> None:
     """Add the missing unqualified edges between entities in the subgraph that are contained within the full graph.
 
+    The out-edges of each node in the subgraph are checked against the subgraph's nodes, so edges in both directions
+    between each pair are found in time proportional to the sum of the nodes' degrees in the full graph.
+
     :param graph: The full BEL graph
     :param subgraph: The query BEL subgraph
     """
-    for u, v in itt.combinations(subgraph, 2):
-        if not graph.has_edge(u, v):
+    for u in subgraph:
+        if u not in graph:
             continue
 
-        for k in graph[u][v]:
-            if k < 0:
-                subgraph.add_edge(u, v, key=k, **graph[u][v][k])
+        for v, edges in graph[u].items():
+            if u == v or v not in subgraph:
+                continue
+
+            for k, data in edges.items():
+                if _is_unqualified_key(k):
+                    subgraph.add_edge(u, v, key=k, **data)
+
+
+def _is_unqualified_key(key) -> bool:
+    """Check if the edge key is one of the negative integers used for unqualified edges."""
+    return isinstance(key, int) and key < 0
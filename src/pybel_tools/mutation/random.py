@@ -3,109 +3,349 @@
 """Random graph permutation functions."""
 
 import random
-from typing import Optional
+from typing import Iterable, List, Optional, Tuple
+
+import networkx as nx
+import numpy as np
 
 from pybel import BELGraph
+from pybel.constants import RELATION
+from pybel.dsl import BaseEntity
 from pybel.struct.pipeline import transformation
 from pybel.struct.utils import update_node_helper
+from pybel.typing import EdgeData
 
 __all__ = [
+    'SubgraphView',
+    'GraphIndex',
+    'get_random_node_view',
+    'get_random_edge_view',
+    'iter_random_node_views',
+    'iter_random_edge_views',
     'random_by_nodes',
     'random_by_edges',
     'shuffle_node_data',
+    'iter_shuffled_node_data',
     'shuffle_relations',
+    'iter_shuffled_relations',
 ]
 
 
-@transformation
-def random_by_nodes(graph: BELGraph, percentage: Optional[float] = None) -> BELGraph:
-    """Get a random graph by inducing over a percentage of the original nodes.
+class SubgraphView:
+    """A lazy view of a sub-graph, selected by boolean masks over the nodes and edges of a graph.
 
-    :param graph: A BEL graph
-    :param percentage: The percentage of edges to keep
+    Nothing is copied from the graph until :meth:`materialize` is called, so sampling many views only costs one mask
+    per sample. Use :meth:`as_graph` to pass the view to functions that expect a graph.
+    """
+
+    def __init__(self, index: 'GraphIndex', node_mask: np.ndarray, edge_mask: np.ndarray) -> None:
+        """Initialize the view.
+
+        :param index: The index of the graph's nodes and edges
+        :param node_mask: A boolean array over the indexed nodes
+        :param edge_mask: A boolean array over the indexed edges
+        """
+        self.index = index
+        self.node_mask = node_mask
+        self.edge_mask = edge_mask
+
+    @property
+    def graph(self) -> BELGraph:
+        """The graph this is a view of."""
+        return self.index.graph
+
+    def number_of_nodes(self) -> int:
+        """Count the nodes in the view."""
+        return int(self.node_mask.sum())
+
+    def number_of_edges(self) -> int:
+        """Count the edges in the view."""
+        return int(self.edge_mask.sum())
+
+    def nodes(self) -> List[BaseEntity]:
+        """Get the nodes in the view."""
+        return [self.index.nodes[i] for i in np.flatnonzero(self.node_mask).tolist()]
+
+    def edges(self) -> List[Tuple[BaseEntity, BaseEntity, str, EdgeData]]:
+        """Get the edges in the view as (source, target, key, data) tuples, sharing their data with the graph."""
+        return [self.index.edges[i] for i in np.flatnonzero(self.edge_mask).tolist()]
+
+    def as_graph(self) -> BELGraph:
+        """Get a read-only :mod:`networkx` view of the graph that hides the nodes and edges not in this view."""
+        nodes = set(self.nodes())
+        edges = {(u, v, k) for u, v, k, _ in self.edges()}
+        return nx.subgraph_view(
+            self.graph,
+            filter_node=nodes.__contains__,
+            filter_edge=lambda u, v, k: (u, v, k) in edges,
+        )
+
+    def materialize(self) -> BELGraph:
+        """Copy the nodes and edges in the view to a new BEL graph."""
+        rv = BELGraph()
+        rv.add_nodes_from(self.nodes())
+        rv.add_edges_from(self.edges())
+        update_node_helper(self.graph, rv)
+        return rv
+
+
+class GraphIndex:
+    """An index of the nodes and edges of a graph, for sampling :class:`SubgraphView` instances.
+
+    Build this once and reuse it when sampling many sub-graphs of the same graph.
     """
+
+    def __init__(self, graph: BELGraph) -> None:
+        """Index the nodes and edges of the graph."""
+        self.graph = graph
+        self.nodes = list(graph)
+        self.edges = list(graph.edges(keys=True, data=True))
+
+        node_to_id = {node: i for i, node in enumerate(self.nodes)}
+        self.sources = np.array([node_to_id[u] for u, _, _, _ in self.edges], dtype=np.int64)
+        self.targets = np.array([node_to_id[v] for _, v, _, _ in self.edges], dtype=np.int64)
+
+    def view_by_nodes(self, percentage: float, rng: np.random.Generator) -> SubgraphView:
+        """Get a view induced by a random sample of the nodes."""
+        node_mask = _sample_mask(len(self.nodes), percentage, rng)
+        edge_mask = node_mask[self.sources] & node_mask[self.targets]
+        return SubgraphView(self, node_mask, edge_mask)
+
+    def view_by_edges(self, percentage: float, rng: np.random.Generator) -> SubgraphView:
+        """Get a view of a random sample of the edges and the nodes they connect."""
+        edge_mask = _sample_mask(len(self.edges), percentage, rng)
+        node_mask = np.zeros(len(self.nodes), dtype=bool)
+        node_mask[self.sources[edge_mask]] = True
+        node_mask[self.targets[edge_mask]] = True
+        return SubgraphView(self, node_mask, edge_mask)
+
+
+def _sample_mask(n: int, percentage: float, rng: np.random.Generator) -> np.ndarray:
+    """Get a boolean mask with the given percentage of n positions chosen uniformly at random."""
+    mask = np.zeros(n, dtype=bool)
+    mask[rng.choice(n, size=int(n * percentage), replace=False)] = True
+    return mask
+
+
+def _get_percentage(percentage: Optional[float]) -> float:
     if percentage is None:
         percentage = 0.9
     assert 0 < percentage <= 1
+    return percentage
 
-    nodes = graph.nodes()
-    n = int(len(nodes) * percentage)
 
-    subnodes = random.sample(nodes, n)
+def get_random_node_view(
+    graph: BELGraph,
+    percentage: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> SubgraphView:
+    """Get a lazy view of a random graph induced over a percentage of the original nodes.
 
-    result = graph.subgraph(subnodes)
+    :param graph: A BEL graph
+    :param percentage: The percentage of nodes to keep
+    :param seed: A seed for the random number generator
+    """
+    return GraphIndex(graph).view_by_nodes(_get_percentage(percentage), np.random.default_rng(seed))
+
+
+def get_random_edge_view(
+    graph: BELGraph,
+    percentage: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> SubgraphView:
+    """Get a lazy view of a random graph keeping a percentage of the original edges.
+
+    :param graph: A BEL graph
+    :param percentage: The percentage of edges to keep
+    :param seed: A seed for the random number generator
+    """
+    return GraphIndex(graph).view_by_edges(_get_percentage(percentage), np.random.default_rng(seed))
 
-    update_node_helper(graph, result)
 
-    return result
+def iter_random_node_views(
+    graph: BELGraph,
+    number_views: int,
+    percentage: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> Iterable[SubgraphView]:
+    """Iterate over lazy views of random graphs induced over a percentage of the original nodes.
+
+    The graph is only indexed once, so this is suited to bootstrapping.
+
+    :param graph: A BEL graph
+    :param number_views: The number of views to generate
+    :param percentage: The percentage of nodes to keep
+    :param seed: A seed for the random number generator
+    """
+    percentage = _get_percentage(percentage)
+    index = GraphIndex(graph)
+    rng = np.random.default_rng(seed)
+    for _ in range(number_views):
+        yield index.view_by_nodes(percentage, rng)
+
+
+def iter_random_edge_views(
+    graph: BELGraph,
+    number_views: int,
+    percentage: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> Iterable[SubgraphView]:
+    """Iterate over lazy views of random graphs keeping a percentage of the original edges.
+
+    The graph is only indexed once, so this is suited to bootstrapping.
+
+    :param graph: A BEL graph
+    :param number_views: The number of views to generate
+    :param percentage: The percentage of edges to keep
+    :param seed: A seed for the random number generator
+    """
+    percentage = _get_percentage(percentage)
+    index = GraphIndex(graph)
+    rng = np.random.default_rng(seed)
+    for _ in range(number_views):
+        yield index.view_by_edges(percentage, rng)
 
 
 @transformation
-def random_by_edges(graph: BELGraph, percentage: Optional[float] = None) -> BELGraph:
+def random_by_nodes(graph: BELGraph, percentage: Optional[float] = None, seed: Optional[int] = None) -> BELGraph:
+    """Get a random graph by inducing over a percentage of the original nodes.
+
+    :param graph: A BEL graph
+    :param percentage: The percentage of nodes to keep
+    :param seed: A seed for the random number generator
+
+    .. seealso:: :func:`get_random_node_view` to avoid copying the graph
+    """
+    return get_random_node_view(graph, percentage=percentage, seed=seed).materialize()
+
+
+@transformation
+def random_by_edges(graph: BELGraph, percentage: Optional[float] = None, seed: Optional[int] = None) -> BELGraph:
     """Get a random graph by keeping a certain percentage of original edges.
 
     :param graph: A BEL graph
     :param percentage: What percentage of eges to take
-    """
-    if percentage is None:
-        percentage = 0.9
-    assert 0 < percentage <= 1
+    :param seed: A seed for the random number generator
 
-    number_edges = int(graph.number_of_edges() * percentage)
-    rv = BELGraph()
-    rv.add_edges_from(random.sample(graph.edges(keys=True, data=True), number_edges))
-    update_node_helper(graph, rv)
-    return rv
+    .. seealso:: :func:`get_random_edge_view` to avoid copying the graph
+    """
+    return get_random_edge_view(graph, percentage=percentage, seed=seed).materialize()
 
 
 @transformation
-def shuffle_node_data(graph: BELGraph, key: str, percentage: Optional[float] = None) -> BELGraph:
+def shuffle_node_data(
+    graph: BELGraph,
+    key: str,
+    percentage: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> BELGraph:
     """Shuffle the graphs' nodes' data.
 
     Useful for permutation testing. For example, shuffling differential gene expression values.
 
     :param graph: A BEL graph
     :param key: The node data dictionary key
-    :param percentage: What percentage of possible swaps to make
+    :param percentage: What percentage of the nodes with the given key to permute
+    :param seed: A seed for the random number generator
+    """
+    return next(iter_shuffled_node_data(graph, key, 1, percentage=percentage, seed=seed))
+
+
+def iter_shuffled_node_data(
+    graph: BELGraph,
+    key: str,
+    number_permutations: int,
+    percentage: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> Iterable[BELGraph]:
+    """Iterate over graphs with the given node data permuted, as in :func:`shuffle_node_data`.
+
+    A randomly chosen percentage of the nodes with the given key have their values permuted with a Fisher-Yates
+    shuffle, which takes linear time. Only one copy of the graph is made, so the same graph is yielded each time with
+    its values rewritten. Copy it if it needs to outlive the next iteration.
+
+    :param graph: A BEL graph
+    :param key: The node data dictionary key
+    :param number_permutations: The number of permuted graphs to generate
+    :param percentage: What percentage of the nodes with the given key to permute. Defaults to 0.3.
+    :param seed: A seed for the random number generator
     """
     if percentage is None:
         percentage = 0.3
     assert 0 < percentage <= 1
 
-    n = graph.number_of_nodes()
-    swaps = int(percentage * n * (n - 1) / 2)
-
+    rng = random.Random(seed)
     result: BELGraph = graph.copy()
 
-    for _ in range(swaps):
-        s, t = random.sample(result.node, 2)
-        result.nodes[s][key], result.nodes[t][key] = result.nodes[t][key], result.nodes[s][key]
+    nodes = [node for node, data in result.nodes(data=True) if key in data]
+    original = [result.nodes[node][key] for node in nodes]
+    values = list(original)
 
-    return result
+    for _ in range(number_permutations):
+        values[:] = original
+        _permute_fraction(values, percentage, rng)
+        for node, value in zip(nodes, values):
+            result.nodes[node][key] = value
+        yield result
 
 
 @transformation
-def shuffle_relations(graph: BELGraph, percentage: Optional[str] = None) -> BELGraph:
+def shuffle_relations(
+    graph: BELGraph,
+    percentage: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> BELGraph:
     """Shuffle the relations.
 
     Useful for permutation testing.
 
     :param graph: A BEL graph
-    :param percentage: What percentage of possible swaps to make
+    :param percentage: What percentage of the edges to permute
+    :param seed: A seed for the random number generator
+    """
+    return next(iter_shuffled_relations(graph, 1, percentage=percentage, seed=seed))
+
+
+def iter_shuffled_relations(
+    graph: BELGraph,
+    number_permutations: int,
+    percentage: Optional[float] = None,
+    seed: Optional[int] = None,
+) -> Iterable[BELGraph]:
+    """Iterate over graphs with their relations permuted, as in :func:`shuffle_relations`.
+
+    A randomly chosen percentage of the edges have their relations permuted with a Fisher-Yates shuffle, which takes
+    linear time. Only one copy of the graph is made, so the same graph is yielded each time with its relations
+    rewritten. Copy it if it needs to outlive the next iteration.
+
+    :param graph: A BEL graph
+    :param number_permutations: The number of permuted graphs to generate
+    :param percentage: What percentage of the edges to permute. Defaults to 0.3.
+    :param seed: A seed for the random number generator
     """
     if percentage is None:
         percentage = 0.3
     assert 0 < percentage <= 1
 
-    n = graph.number_of_edges()
-    swaps = int(percentage * n * (n - 1) / 2)
+    rng = random.Random(seed)
+    rv: BELGraph = graph.copy()
 
-    rv = graph.copy()
+    edges = [data for _, _, data in rv.edges(data=True)]
+    original = [data[RELATION] for data in edges]
+    relations = list(original)
 
-    edges = rv.edges(keys=True)
+    for _ in range(number_permutations):
+        relations[:] = original
+        _permute_fraction(relations, percentage, rng)
+        for data, relation in zip(edges, relations):
+            data[RELATION] = relation
+        yield rv
 
-    for _ in range(swaps):
-        (s1, t1, k1), (s2, t2, k2) = random.sample(edges, 2)
-        rv[s1][t1][k1], rv[s2][t2][k2] = rv[s2][t2][k2], rv[s1][t1][k1]
 
-    return rv
+def _permute_fraction(values: List, percentage: float, rng: random.Random) -> None:
+    """Permute a random subset of the values in place with a Fisher-Yates shuffle."""
+    positions = rng.sample(range(len(values)), int(len(values) * percentage))
+    chosen = [values[position] for position in positions]
+    rng.shuffle(chosen)
+    for position, value in zip(positions, chosen):
+        values[position] = value
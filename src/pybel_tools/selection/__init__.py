@@ -4,6 +4,8 @@
 
 from .group_nodes import *  # noqa: F401,F403
 from .metapaths import *  # noqa: F401,F403
+from .null_models import *  # noqa: F401,F403
 from .paths import *  # noqa: F401,F403
+from .rewiring import *  # noqa: F401,F403
 from .search import *  # noqa: F401,F403
 from .utils import *  # noqa: F401,F403
@@ -2,13 +2,21 @@
 
 """Functions for producing random permutations over networks.
 
-Random permutations are useful in statistical testing over aggregate statistics.
+Random permutations are useful in statistical testing over aggregate statistics. See
+:mod:`pybel_tools.selection.null_models` for degree-preserving randomizations.
 """
 
 import random
 
 from pybel.constants import RELATION
 from pybel.struct.pipeline import transformation
+from pybel.utils import hash_edge
+
+__all__ = [
+    'is_edge_consistent',
+    'all_edges_consistent',
+    'rewire_targets',
+]
 
 
 def is_edge_consistent(graph, u, v):
@@ -23,7 +31,7 @@ def is_edge_consistent(graph, u, v):
     if not graph.has_edge(u, v):
         raise ValueError('{} does not contain an edge ({}, {})'.format(graph, u, v))
 
-    return 0 == len(set(d[RELATION] for d in graph.edge[u][v].values()))
+    return 1 == len(set(d[RELATION] for d in graph[u][v].values()))
 
 
 def all_edges_consistent(graph):
@@ -45,6 +53,7 @@ def rewire_targets(graph, rewiring_probability):
 
     - For BEL graphs, assumes edge consistency (all edges between two given nodes are have the same relation)
     - Doesn't make self-edges
+    - Doesn't preserve the in-degrees of the nodes. Use :func:`pybel_tools.selection.iter_null_graphs` for that.
 
     :param pybel.BELGraph graph: A BEL graph
     :param float rewiring_probability: The probability of rewiring (between 0 and 1)
@@ -54,10 +63,13 @@ def rewire_targets(graph, rewiring_probability):
         raise ValueError('{} is not consistent'.format(graph))
 
     result = graph.copy()
-    nodes = result.nodes()
+    nodes = list(result)
+
+    for u, v, k, data in list(result.edges(keys=True, data=True)):
+        if random.random() >= rewiring_probability:
+            continue
 
-    for u, v in result.edges():
-        if random.random() < rewiring_probability:
+        if len(nodes) <= len(set(result[u]) | {u}):  # no node left to rewire to
             continue
 
         w = random.choice(nodes)
@@ -65,7 +77,7 @@ def rewire_targets(graph, rewiring_probability):
         while w == u or result.has_edge(u, w):
             w = random.choice(nodes)
 
-        result.add_edge(w, v)
-        result.remove_edge(u, v)
+        result.add_edge(u, w, key=hash_edge(u, w, data), **data)
+        result.remove_edge(u, v, k)
 
     return result
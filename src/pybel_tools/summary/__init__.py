@@ -6,12 +6,16 @@ These scripts are designed to assist in the analysis of errors within BEL docume
 and provide some suggestions for fixes.
 """
 
+from .accumulators import *  # noqa: F401,F403
+from .batch import *  # noqa: F401,F403
 from .composite_summary import *  # noqa: F401,F403
 from .contradictions import *  # noqa: F401,F403
 from .edge_summary import *  # noqa: F401,F403
 from .error_summary import *  # noqa: F401,F403
 from .node_properties import *  # noqa: F401,F403
+from .pair_relations import *  # noqa: F401,F403
 from .provenance import *  # noqa: F401,F403
 from .stability import *  # noqa: F401,F403
+from .stability_monitor import *  # noqa: F401,F403
 from .subgraph_summary import *  # noqa: F401,F403
 from .visualization import *  # noqa: F401,F403
@@ -0,0 +1,8 @@
+# -*- coding: utf-8 -*-
+
+"""Run the batch summary CLI."""
+
+from .batch import main
+
+if __name__ == '__main__':
+    main()
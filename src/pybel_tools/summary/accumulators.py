@@ -0,0 +1,675 @@
+# -*- coding: utf-8 -*-
+
+"""Accumulators for calculating many summary statistics in a single pass over a BEL graph.
+
+Each statistic is an :class:`Accumulator` that overrides any of the :meth:`Accumulator.on_node`,
+:meth:`Accumulator.on_edge`, and :meth:`Accumulator.on_warning` callbacks. :func:`accumulate` walks the nodes, edges,
+and warnings of the graph once, feeding each to all of the accumulators that have the corresponding callback.
+
+Statistics that aren't a simple function of the nodes, edges, or warnings, like the unstable triples, are calculated
+when the pass is finished from the structures built by the accumulators they depend on. For example, the
+:class:`PairRelationAccumulator` builds a :data:`pybel_tools.summary.pair_relations.PairRelationIndex` during the pass
+that all of the pair and triple statistics share.
+
+New statistics can be calculated in the same pass as the summary by adding them to the accumulators from
+:func:`get_summary_accumulators`:
+
+>>> from pybel_tools.summary.accumulators import FunctionAccumulator, accumulate, get_summary_accumulators
+>>> results = accumulate(graph, {**get_summary_accumulators(), 'my_function_count': FunctionAccumulator()})
+"""
+
+import itertools as itt
+from abc import ABC, abstractmethod
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
+
+from pybel import BELGraph, BaseAbundance, BaseEntity
+from pybel.constants import (
+    ACTIVITY, ANNOTATIONS, CITATION, CITATION_AUTHORS, CITATION_DATE, CITATION_DB, CITATION_IDENTIFIER,
+    CORRELATIVE_RELATIONS, DEGRADATION, EFFECT, FROM_LOC, IDENTIFIER, KIND, LOCATION, MODIFIER, NAME,
+    NEGATIVE_CORRELATION, OBJECT, POSITIVE_CORRELATION, RELATION, SUBJECT, TO_LOC, TRANSLOCATION,
+)
+from pybel.dsl import CentralDogma, Pathology
+from pybel.language import Entity
+from pybel.parser.exc import (
+    BELSyntaxError, MissingNamespaceNameWarning, MissingNamespaceRegexWarning, NakedNameWarning,
+    UndefinedAnnotationWarning, UndefinedNamespaceWarning,
+)
+from pybel.struct.summary.node_summary import iterate_node_entities
+from pybel.typing import EdgeData
+from .node_properties import remove_falsy_values
+from .pair_relations import (
+    CAUSAL_DECREASE_MASK, CAUSAL_INCREASE_MASK, get_relation_bit, mask_has_contradiction, mask_to_relations,
+    relations_to_mask,
+)
+from .provenance import _ensure_datetime, create_timeline
+from ..typing import NodePair
+
+__all__ = [
+    'Accumulator',
+    'accumulate',
+    'get_summary_accumulators',
+    'FunctionAccumulator',
+    'ModificationAccumulator',
+    'RelationAccumulator',
+    'AuthorAccumulator',
+    'VariantAccumulator',
+    'NamespaceAccumulator',
+    'AnnotationAccumulator',
+    'WarningAccumulator',
+    'PairRelationAccumulator',
+    'CitationYearAccumulator',
+    'ConfidenceAccumulator',
+]
+
+
+class Accumulator(ABC):
+    """A statistic that is accumulated during one pass over the nodes, edges, and warnings of a graph.
+
+    Subclasses only need to override the callbacks they use, since :func:`accumulate` skips the others, and
+    :meth:`get_result`.
+    """
+
+    #: Other accumulators whose structures this one uses when it finishes. They are fed during the same pass and
+    #: finished before this one.
+    dependencies: Sequence['Accumulator'] = ()
+
+    def on_node(self, node: BaseEntity) -> None:
+        """Handle a node in the graph."""
+
+    def on_edge(self, u: BaseEntity, v: BaseEntity, key: str, data: EdgeData) -> None:
+        """Handle an edge in the graph."""
+
+    def on_warning(self, path: Optional[str], exc: Exception, context: Mapping[str, Any]) -> None:
+        """Handle a warning from compiling the graph."""
+
+    def finish(self, graph: BELGraph) -> None:
+        """Finish calculating once all of the nodes, edges, and warnings have been handled."""
+
+    @abstractmethod
+    def get_result(self) -> Any:
+        """Get the value of the statistic."""
+
+
+def _iterate_accumulators(accumulators: Iterable[Accumulator]) -> List[Accumulator]:
+    """List the accumulators and their dependencies, with each appearing after all of its dependencies."""
+    rv = []
+    seen = set()
+
+    def _visit(accumulator: Accumulator) -> None:
+        if id(accumulator) in seen:
+            return
+        seen.add(id(accumulator))
+        for dependency in accumulator.dependencies:
+            _visit(dependency)
+        rv.append(accumulator)
+
+    for accumulator in accumulators:
+        _visit(accumulator)
+
+    return rv
+
+
+def _get_callbacks(accumulators: Iterable[Accumulator], name: str) -> List[Callable]:
+    """Get the bound callbacks with the given name for the accumulators that override it."""
+    base = getattr(Accumulator, name)
+    return [
+        getattr(accumulator, name)
+        for accumulator in accumulators
+        if getattr(type(accumulator), name) is not base
+    ]
+
+
+def accumulate(graph: BELGraph, accumulators: Mapping[str, Accumulator]) -> Dict[str, Any]:
+    """Calculate the statistics in one pass over the nodes, edges, and warnings in the graph.
+
+    :param graph: A BEL graph
+    :param accumulators: A dictionary of {name: accumulator}
+    :return: A dictionary of {name: result of the accumulator}
+    """
+    ordered = _iterate_accumulators(accumulators.values())
+
+    node_callbacks = _get_callbacks(ordered, 'on_node')
+    if node_callbacks:
+        for node in graph:
+            for callback in node_callbacks:
+                callback(node)
+
+    edge_callbacks = _get_callbacks(ordered, 'on_edge')
+    if edge_callbacks:
+        for u, v, key, data in graph.edges(keys=True, data=True):
+            for callback in edge_callbacks:
+                callback(u, v, key, data)
+
+    warning_callbacks = _get_callbacks(ordered, 'on_warning')
+    if warning_callbacks:
+        for path, exc, context in graph.warnings:
+            for callback in warning_callbacks:
+                callback(path, exc, context)
+
+    for accumulator in ordered:
+        accumulator.finish(graph)
+
+    return {
+        name: accumulator.get_result()
+        for name, accumulator in accumulators.items()
+    }
+
+
+class _CounterAccumulator(Accumulator):
+    """An accumulator whose result is a counter."""
+
+    def __init__(self) -> None:
+        self.counter = Counter()
+
+    def get_result(self) -> Counter:  # noqa: D102
+        return self.counter
+
+
+class FunctionAccumulator(_CounterAccumulator):
+    """Count the nodes with each function, like :func:`pybel.struct.summary.count_functions`."""
+
+    def on_node(self, node: BaseEntity) -> None:  # noqa: D102
+        self.counter[node.function] += 1
+
+
+class VariantAccumulator(_CounterAccumulator):
+    """Count each kind of variant, like :func:`pybel.struct.summary.count_variants`."""
+
+    def on_node(self, node: BaseEntity) -> None:  # noqa: D102
+        if isinstance(node, CentralDogma) and node.variants:
+            for variant in node.variants:
+                self.counter[variant[KIND]] += 1
+
+
+class RelationAccumulator(_CounterAccumulator):
+    """Count the edges with each relation, like :func:`pybel.struct.summary.count_relations`."""
+
+    def on_edge(self, u: BaseEntity, v: BaseEntity, key: str, data: EdgeData) -> None:  # noqa: D102
+        self.counter[data[RELATION]] += 1
+
+
+class AuthorAccumulator(_CounterAccumulator):
+    """Count the edges in which each author appears, like :func:`pybel_tools.summary.count_authors`."""
+
+    def on_edge(self, u: BaseEntity, v: BaseEntity, key: str, data: EdgeData) -> None:  # noqa: D102
+        citation = data.get(CITATION)
+        if citation is not None and CITATION_AUTHORS in citation:
+            self.counter.update(citation[CITATION_AUTHORS])
+
+
+class ConfidenceAccumulator(_CounterAccumulator):
+    """Count the confidences of the qualified edges, like :func:`pybel_tools.summary.count_confidences`."""
+
+    def on_edge(self, u: BaseEntity, v: BaseEntity, key: str, data: EdgeData) -> None:  # noqa: D102
+        if CITATION not in data:
+            return
+        if ANNOTATIONS not in data or 'Confidence' not in data[ANNOTATIONS]:
+            self.counter['None'] += 1
+        else:
+            self.counter[list(data[ANNOTATIONS]['Confidence'])[0]] += 1
+
+
+class ModificationAccumulator(Accumulator):
+    """Count the translocated, degraded, and active nodes, like :func:`pybel_tools.summary.count_modifications`."""
+
+    def __init__(self) -> None:
+        self.nodes: Dict[str, Set[BaseEntity]] = defaultdict(set)
+
+    def on_edge(self, u: BaseEntity, v: BaseEntity, key: str, data: EdgeData) -> None:  # noqa: D102
+        for side, node in ((SUBJECT, u), (OBJECT, v)):
+            side_data = data.get(side)
+            if side_data is not None and MODIFIER in side_data:
+                self.nodes[side_data[MODIFIER]].add(node)
+
+    def get_result(self) -> Mapping[str, int]:  # noqa: D102
+        return remove_falsy_values({
+            'Translocations': len(self.nodes[TRANSLOCATION]),
+            'Degradations': len(self.nodes[DEGRADATION]),
+            'Molecular Activities': len(self.nodes[ACTIVITY]),
+        })
+
+
+def _iterate_edge_data_entities(data: EdgeData) -> Iterable[Entity]:
+    """Iterate over the entities in the modifiers and locations of the edge, like in the node summary of PyBEL."""
+    for side in (SUBJECT, OBJECT):
+        side_data = data.get(side)
+        if side_data is None:
+            continue
+
+        modifier = side_data.get(MODIFIER)
+        effect = side_data.get(EFFECT)
+
+        if modifier == ACTIVITY and effect is not None:
+            yield effect
+        elif modifier == TRANSLOCATION and effect is not None:
+            yield effect[FROM_LOC]
+            yield effect[TO_LOC]
+
+        location = side_data.get(LOCATION)
+        if location is not None:
+            yield location
+
+
+class NamespaceAccumulator(_CounterAccumulator):
+    """Count the namespaces of the entities in the nodes and edges, like :func:`pybel.struct.summary.count_namespaces`.
+
+    The result of :meth:`get_unused` is the same as :func:`pybel.struct.summary.get_unused_namespaces`.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.unused: Set[str] = set()
+
+    def on_node(self, node: BaseEntity) -> None:  # noqa: D102
+        for entity in iterate_node_entities(node):
+            self.counter[entity.namespace] += 1
+
+    def on_edge(self, u: BaseEntity, v: BaseEntity, key: str, data: EdgeData) -> None:  # noqa: D102
+        for entity in _iterate_edge_data_entities(data):
+            self.counter[entity.namespace] += 1
+
+    def finish(self, graph: BELGraph) -> None:  # noqa: D102
+        self.unused = graph.defined_namespace_keywords - set(self.counter)
+
+    def get_unused(self) -> Set[str]:
+        """Get the namespaces that are defined in the graph, but never used."""
+        return self.unused
+
+
+class AnnotationAccumulator(Accumulator):
+    """Collect the values used for each annotation.
+
+    Its result is the same as :func:`pybel.struct.summary.get_unused_list_annotation_values` and the result of
+    :meth:`get_unused` is the same as :func:`pybel.struct.summary.get_unused_annotations`.
+    """
+
+    def __init__(self) -> None:
+        self.values: Dict[str, Set[str]] = defaultdict(set)
+        self.unused: Set[str] = set()
+        self.unused_list_values: Dict[str, Set[str]] = {}
+
+    def on_edge(self, u: BaseEntity, v: BaseEntity, key: str, data: EdgeData) -> None:  # noqa: D102
+        annotations = data.get(ANNOTATIONS)
+        if annotations:
+            for annotation, values in annotations.items():
+                self.values[annotation].update(values)
+
+    def finish(self, graph: BELGraph) -> None:  # noqa: D102
+        self.unused = graph.defined_annotation_keywords - set(self.values)
+        self.unused_list_values = {}
+        for annotation, values in graph.annotation_list.items():
+            used_values = self.values.get(annotation, set())
+            if len(used_values) == len(values):  # all values have been used
+                continue
+            self.unused_list_values[annotation] = set(values) - used_values
+
+    def get_unused(self) -> Set[str]:
+        """Get the annotations that are defined in the graph, but never used."""
+        return self.unused
+
+    def get_result(self) -> Mapping[str, Set[str]]:  # noqa: D102
+        return self.unused_list_values
+
+
+class WarningAccumulator(Accumulator):
+    """Group the warnings from compiling the graph, like the functions in :mod:`pybel_tools.summary.error_summary`."""
+
+    def __init__(self) -> None:
+        self.error_count = Counter()
+        self.errors = Counter()
+        self.undefined_namespaces: Set[str] = set()
+        self.undefined_annotations: Set[str] = set()
+        self.namespaces_with_incorrect_names: Set[str] = set()
+        self.naked_names: Set[str] = set()
+        self.syntax_errors = []
+
+    def on_warning(self, path: Optional[str], exc: Exception, context: Mapping[str, Any]) -> None:  # noqa: D102
+        self.error_count[exc.__class__.__name__] += 1
+        self.errors[str(exc)] += 1
+
+        if isinstance(exc, UndefinedNamespaceWarning):
+            self.undefined_namespaces.add(exc.namespace)
+        elif isinstance(exc, UndefinedAnnotationWarning):
+            self.undefined_annotations.add(exc.annotation)
+        elif isinstance(exc, (MissingNamespaceNameWarning, MissingNamespaceRegexWarning)):
+            self.namespaces_with_incorrect_names.add(exc.namespace)
+        elif isinstance(exc, NakedNameWarning):
+            self.naked_names.add(exc.name)
+
+        if isinstance(exc, BELSyntaxError):
+            self.syntax_errors.append((path, exc, context))
+
+    def get_most_common_errors(self, n: Optional[int] = 20):
+        """Get the (n) most common errors, like :func:`pybel_tools.summary.get_most_common_errors`."""
+        return self.errors.most_common(n)
+
+    def get_result(self) -> Counter:  # noqa: D102
+        return self.error_count
+
+
+def _get_label(node: BaseEntity) -> str:
+    return (
+        node.name or node.identifier
+        if NAME in node or IDENTIFIER in node else
+        str(node)
+    )
+
+
+class PairRelationAccumulator(Accumulator):
+    """Build a :data:`pybel_tools.summary.pair_relations.PairRelationIndex` for the pair and triple statistics.
+
+    The nodes are numbered in the order of the graph, so the pairs and the graphs used for finding triples are built
+    on integers instead of nodes, which are expensive to hash. The methods give the same results as the functions with
+    the same names in :mod:`pybel_tools.summary.stability`.
+    """
+
+    def __init__(self) -> None:
+        self.nodes: List[BaseEntity] = []
+        self.node_ids: Dict[BaseEntity, int] = {}
+        #: A dictionary of {(source id, target id): bitmask of relations}
+        self.pairs: Dict[Tuple[int, int], int] = {}
+        #: A dictionary of {(source id, target id): number of edges}
+        self.edge_counts: Dict[Tuple[int, int], int] = defaultdict(int)
+        self._labels: Dict[int, str] = {}
+        self._last_source = self._last_source_id = None
+
+    def on_node(self, node: BaseEntity) -> None:  # noqa: D102
+        self.node_ids[node] = len(self.nodes)
+        self.nodes.append(node)
+
+    def on_edge(self, u: BaseEntity, v: BaseEntity, key: str, data: EdgeData) -> None:  # noqa: D102
+        if u is not self._last_source:  # the edges come grouped by their sources
+            self._last_source, self._last_source_id = u, self.node_ids[u]
+        pair = self._last_source_id, self.node_ids[v]
+        self.pairs[pair] = self.pairs.get(pair, 0) | get_relation_bit(data[RELATION])
+        self.edge_counts[pair] += 1
+
+    def get_result(self) -> Mapping[NodePair, int]:  # noqa: D102
+        nodes = self.nodes
+        return {
+            (nodes[i], nodes[j]): mask
+            for (i, j), mask in self.pairs.items()
+        }
+
+    def _get_label(self, i: int) -> str:
+        label = self._labels.get(i)
+        if label is None:
+            label = self._labels[i] = str(self.nodes[i])
+        return label
+
+    def _sort_nodes(self, ids: Iterable[int]) -> Tuple[BaseEntity, ...]:
+        return tuple(self.nodes[i] for i in sorted(ids, key=self._get_label))
+
+    def _iterate_mutual_pairs(self, forward: int, backward: int) -> Iterable[Tuple[int, int]]:
+        pairs = self.pairs
+        for (i, j), mask in pairs.items():
+            if mask & forward and pairs.get((j, i), 0) & backward:
+                yield i, j
+
+    def get_regulatory_pairs(self) -> Set[NodePair]:
+        """Get pairs of nodes such that ``A -> B`` and ``B -| A``."""
+        return {
+            (self.nodes[i], self.nodes[j])
+            for i, j in self._iterate_mutual_pairs(CAUSAL_INCREASE_MASK, CAUSAL_DECREASE_MASK)
+        }
+
+    def get_chaotic_pairs(self) -> Set[NodePair]:
+        """Get pairs of nodes such that ``A -> B`` and ``B -> A``."""
+        return {
+            self._sort_nodes(pair)
+            for pair in self._iterate_mutual_pairs(CAUSAL_INCREASE_MASK, CAUSAL_INCREASE_MASK)
+        }
+
+    def get_dampened_pairs(self) -> Set[NodePair]:
+        """Get pairs of nodes such that ``A -| B`` and ``B -| A``."""
+        return {
+            self._sort_nodes(pair)
+            for pair in self._iterate_mutual_pairs(CAUSAL_DECREASE_MASK, CAUSAL_DECREASE_MASK)
+        }
+
+    def get_contradiction_summary(self):
+        """Get triples of source, target, and relations when there are contradictions."""
+        return {
+            (self.nodes[i], self.nodes[j], tuple(sorted(mask_to_relations(mask))))
+            for (i, j), mask in self.pairs.items()
+            if mask_has_contradiction(mask)
+        }
+
+    def _get_undirected_mask(self, i: int, j: int) -> int:
+        return self.pairs.get((i, j), 0) | self.pairs.get((j, i), 0)
+
+    def _get_correlation_triangles(self) -> Set[Tuple[int, int, int]]:
+        """Get the triangles in the graph of correlative relations, each sorted by the labels of the nodes."""
+        correlative_mask = relations_to_mask(CORRELATIVE_RELATIONS)
+        neighbors = defaultdict(set)
+        for (i, j), mask in self.pairs.items():
+            if mask & correlative_mask:
+                neighbors[i].add(j)
+                neighbors[j].add(i)
+
+        return {
+            tuple(sorted([i, j, k], key=self._get_label))
+            for i, i_neighbors in neighbors.items()
+            for j, k in itt.combinations(i_neighbors, 2)
+            if k in neighbors[j]
+        }
+
+    def get_separate_unstable_correlation_triples(self):
+        """Get triples of nodes A, B, C such that ``A pos B``, ``A pos C``, and ``B neg C``."""
+        positive, negative = get_relation_bit(POSITIVE_CORRELATION), get_relation_bit(NEGATIVE_CORRELATION)
+        rv = set()
+        for a, b, c in self._get_correlation_triangles():
+            ab = self._get_undirected_mask(a, b)
+            bc = self._get_undirected_mask(b, c)
+            ac = self._get_undirected_mask(a, c)
+            if ab & positive and bc & positive and ac & negative:
+                rv.add((b, a, c))
+            if ab & positive and bc & negative and ac & positive:
+                rv.add((a, b, c))
+            if ab & negative and bc & positive and ac & positive:
+                rv.add((c, a, b))
+        return {
+            (self.nodes[i], self.nodes[j], self.nodes[k])
+            for i, j, k in rv
+        }
+
+    def get_mutually_unstable_correlation_triples(self):
+        """Get triples of nodes A, B, C such that ``A neg B``, ``B neg C``, and ``C neg A``."""
+        negative = get_relation_bit(NEGATIVE_CORRELATION)
+        return {
+            (self.nodes[a], self.nodes[b], self.nodes[c])
+            for a, b, c in self._get_correlation_triangles()
+            if all(self._get_undirected_mask(i, j) & negative for i, j in ((a, b), (b, c), (a, c)))
+        }
+
+    def get_jens_unstable(self):
+        """Get triples of nodes A, B, C where ``A -> B``, ``A -| C``, and ``C positiveCorrelation A``."""
+        positive_correlation = get_relation_bit(POSITIVE_CORRELATION)
+        successors = defaultdict(set)
+        for (i, j), mask in self.pairs.items():
+            if mask & positive_correlation:
+                successors[i].add(j)
+                successors[j].add(i)
+            if mask & CAUSAL_INCREASE_MASK:
+                successors[i].add(j)
+            if mask & CAUSAL_DECREASE_MASK:
+                successors[j].add(i)
+
+        triangles = {
+            tuple(sorted([a, b, c]))
+            for a, a_successors in list(successors.items())
+            for b in a_successors
+            for c in successors.get(b, ())
+            if a in successors.get(c, ())
+        }
+        return {
+            self._sort_nodes(triangle)
+            for triangle in triangles
+        }
+
+    def _get_mismatch_triplets(self, relation_mask: int):
+        negative_correlation = get_relation_bit(NEGATIVE_CORRELATION)
+        children = defaultdict(list)
+        for (i, j), mask in self.pairs.items():
+            if mask & relation_mask:
+                children[i].append(self.nodes[j])
+
+        # the targets are put in a set in the same order as the out-edges so the pairs of them are checked in the
+        # same orientation as by :func:`pybel_tools.summary.get_increase_mismatch_triplets`
+        node_ids = self.node_ids
+        return {
+            (self.nodes[i], a, b)
+            for i, targets in children.items()
+            if 1 < len(targets)
+            for a, b in itt.combinations(set(targets), 2)
+            if self.pairs.get((node_ids[a], node_ids[b]), 0) & negative_correlation
+        }
+
+    def get_increase_mismatch_triplets(self):
+        """Get triples of nodes A, B, C where ``A -> B``, ``A -> C``, and ``C negativeCorrelation A``."""
+        return self._get_mismatch_triplets(CAUSAL_INCREASE_MASK)
+
+    def get_decrease_mismatch_triplets(self):
+        """Get triples of nodes A, B, C where ``A -| B``, ``A -| C``, and ``C negativeCorrelation A``."""
+        return self._get_mismatch_triplets(CAUSAL_DECREASE_MASK)
+
+    def get_degrees(self) -> List[int]:
+        """Get the degree of each node, in the same order as the nodes."""
+        rv = [0] * len(self.nodes)
+        for (i, j), count in self.edge_counts.items():
+            rv[i] += count
+            rv[j] += count
+        return rv
+
+    def get_top_hubs(self, n: Optional[int] = 15) -> List[Tuple[BaseEntity, int]]:
+        """Get the n nodes with the highest degree, like :func:`pybel.struct.summary.get_top_hubs`."""
+        return Counter(dict(zip(self.nodes, self.get_degrees()))).most_common(n)
+
+    def count_top_hubs(self, n: int = 15) -> Counter:
+        """Count the degree of the top hubs that are abundances, by their names."""
+        return Counter({
+            _get_label(node): degree
+            for node, degree in self.get_top_hubs(n=n)
+            if isinstance(node, BaseAbundance)
+        })
+
+    def count_pathologies(self) -> Counter:
+        """Count the number of pairs of nodes in which each pathology is incident.
+
+        Has the same semantics as :func:`pybel.struct.summary.count_pathologies`.
+        """
+        counts = Counter()
+        for i, j in self.pairs:
+            if i != j and (j, i) in self.pairs and j < i:
+                continue  # don't double count relationships
+            counts[i] += 1
+            counts[j] += 1
+        return Counter({
+            self.nodes[i]: count
+            for i, count in counts.items()
+            if isinstance(self.nodes[i], Pathology)
+        })
+
+    def get_top_pathologies(self, n: Optional[int] = 15) -> List[Tuple[BaseEntity, int]]:
+        """Get the n pathologies incident to the most pairs, like :func:`pybel.struct.summary.get_top_pathologies`.
+
+        Pathologies with the same count are ordered by their BEL. PyBEL orders them by iterating over a set of nodes,
+        which changes between processes with Python's hash randomization.
+        """
+        rv = sorted(self.count_pathologies().items(), key=lambda item: (-item[1], item[0].as_bel()))
+        return rv if n is None else rv[:n]
+
+    def count_top_pathologies(self, n: int = 15) -> Counter:
+        """Count the edges of the top pathologies, by their names."""
+        return Counter({
+            _get_label(node): count
+            for node, count in self.get_top_pathologies(n=n)
+            if isinstance(node, BaseAbundance)
+        })
+
+
+class CitationYearAccumulator(Accumulator):
+    """Count the citations from each year, like :func:`pybel_tools.summary.get_citation_years`."""
+
+    def __init__(self) -> None:
+        self.year_citations = defaultdict(set)
+
+    def on_edge(self, u: BaseEntity, v: BaseEntity, key: str, data: EdgeData) -> None:  # noqa: D102
+        citation = data.get(CITATION)
+        if citation is None or CITATION_DATE not in citation:
+            return
+        try:
+            year = _ensure_datetime(citation[CITATION_DATE]).year
+        except ValueError:
+            return
+        self.year_citations[year].add((citation[CITATION_DB], citation[CITATION_IDENTIFIER]))
+
+    def get_result(self):  # noqa: D102
+        return create_timeline(Counter({
+            year: len(citations)
+            for year, citations in self.year_citations.items()
+        }))
+
+
+class _DerivedAccumulator(Accumulator):
+    """An accumulator whose result is calculated from another accumulator after the pass."""
+
+    def __init__(self, accumulator: Accumulator, get_result: Callable[[], Any]) -> None:
+        self.dependencies = (accumulator,)
+        self._get_result = get_result
+
+    def get_result(self) -> Any:  # noqa: D102
+        return self._get_result()
+
+
+def get_summary_accumulators() -> Dict[str, Accumulator]:
+    """Get new accumulators for all of the fields of :class:`pybel_tools.summary.BELGraphSummary`."""
+    namespaces = NamespaceAccumulator()
+    annotations = AnnotationAccumulator()
+    warnings = WarningAccumulator()
+    pairs = PairRelationAccumulator()
+
+    return {
+        # Attribute counters
+        'function_count': FunctionAccumulator(),
+        'modifications_count': ModificationAccumulator(),
+        'relation_count': RelationAccumulator(),
+        'authors_count': AuthorAccumulator(),
+        'variants_count': VariantAccumulator(),
+        'namespaces_count': namespaces,
+        # Errors
+        'undefined_namespaces': _DerivedAccumulator(warnings, lambda: warnings.undefined_namespaces),
+        'undefined_annotations': _DerivedAccumulator(warnings, lambda: warnings.undefined_annotations),
+        'namespaces_with_incorrect_names': _DerivedAccumulator(
+            warnings, lambda: warnings.namespaces_with_incorrect_names,
+        ),
+        'unused_namespaces': _DerivedAccumulator(namespaces, namespaces.get_unused),
+        'unused_annotations': _DerivedAccumulator(annotations, annotations.get_unused),
+        'unused_list_annotation_values': annotations,
+        'naked_names': _DerivedAccumulator(warnings, lambda: warnings.naked_names),
+        'error_count': warnings,
+        'error_groups': _DerivedAccumulator(warnings, warnings.get_most_common_errors),
+        'syntax_errors': _DerivedAccumulator(warnings, lambda: warnings.syntax_errors),
+        # Node pairs
+        'regulatory_pairs': _DerivedAccumulator(pairs, pairs.get_regulatory_pairs),
+        'chaotic_pairs': _DerivedAccumulator(pairs, pairs.get_chaotic_pairs),
+        'dampened_pairs': _DerivedAccumulator(pairs, pairs.get_dampened_pairs),
+        'contradictory_pairs': _DerivedAccumulator(pairs, pairs.get_contradiction_summary),
+        # Node triplets
+        'separate_unstable_correlation_triples': _DerivedAccumulator(
+            pairs, pairs.get_separate_unstable_correlation_triples,
+        ),
+        'mutually_unstable_correlation_triples': _DerivedAccumulator(
+            pairs, pairs.get_mutually_unstable_correlation_triples,
+        ),
+        'jens_unstable': _DerivedAccumulator(pairs, pairs.get_jens_unstable),
+        'increase_mismatch_triplets': _DerivedAccumulator(pairs, pairs.get_increase_mismatch_triplets),
+        'decrease_mismatch_triplets': _DerivedAccumulator(pairs, pairs.get_decrease_mismatch_triplets),
+        # Bibliometrics
+        'citation_years': CitationYearAccumulator(),
+        'confidence_count': ConfidenceAccumulator(),
+        # Node counters
+        'hub_data': _DerivedAccumulator(pairs, pairs.count_top_hubs),
+        'disease_data': _DerivedAccumulator(pairs, pairs.count_top_pathologies),
+    }
@@ -0,0 +1,240 @@
+# -*- coding: utf-8 -*-
+
+"""Summarize many BEL graphs in parallel.
+
+Each graph is loaded and summarized with :class:`pybel_tools.summary.BELGraphSummary` in a pool of processes. Results
+are written as JSON lines as soon as they're finished. A graph is identified by the SHA-256 digest of its file, so
+running the batch again with the same output file skips the graphs that were already summarized, even if they moved.
+
+Run on the command line with ``python -m pybel_tools.summary [PATHS]``.
+"""
+
+import hashlib
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Mapping, Optional, Set
+
+import click
+import pandas as pd
+from dataclasses_json import dataclass_json
+
+import pybel
+from .composite_summary import BELGraphSummary
+
+__all__ = [
+    'BatchSummaryResult',
+    'get_file_digest',
+    'summarize_path',
+    'summarize_paths',
+    'read_batch_summary_results',
+    'get_batch_summary_table',
+]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass_json
+@dataclass
+class BatchSummaryResult:
+    """The result of summarizing one graph in a batch."""
+
+    #: The path to the graph
+    path: str
+    #: The SHA-256 digest of the graph's file
+    digest: str
+    #: The summary of the graph, encoded as JSON, or None if it failed
+    summary: Optional[Mapping[str, Any]] = None
+    #: The error message, if loading or summarizing the graph failed
+    error: Optional[str] = None
+    #: The number of seconds spent loading the graph
+    load_seconds: Optional[float] = None
+    #: The number of seconds spent summarizing the graph
+    summary_seconds: Optional[float] = None
+    #: The number of seconds spent writing the HTML report, if one was written
+    html_seconds: Optional[float] = None
+
+
+def get_file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """Get the SHA-256 digest of the contents of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def summarize_path(path: str, digest: Optional[str] = None, html_directory: Optional[str] = None) -> BatchSummaryResult:
+    """Load and summarize the graph at the given path.
+
+    Errors are caught and put in the result so one bad graph doesn't stop a batch.
+
+    :param path: The path to a BEL graph in any of the formats supported by :func:`pybel.load`
+    :param digest: The digest of the file, if it has already been calculated
+    :param html_directory: A directory in which to write an HTML report named by the digest of the file
+    """
+    if digest is None:
+        digest = get_file_digest(path)
+    result = BatchSummaryResult(path=path, digest=digest)
+
+    try:
+        start = time.time()
+        graph = pybel.load(path)
+        result.load_seconds = time.time() - start
+
+        start = time.time()
+        summary = BELGraphSummary.from_graph(graph)
+        result.summary = summary.to_dict(encode_json=True)
+        result.summary_seconds = time.time() - start
+
+        if html_directory is not None:
+            from ..assembler.html import to_html_path
+
+            start = time.time()
+            to_html_path(graph, os.path.join(html_directory, f'{digest}.html'), summary=summary)
+            result.html_seconds = time.time() - start
+
+    except Exception as e:
+        logger.warning('failed to summarize %s: %s', path, e)
+        result.error = f'{e.__class__.__name__}: {e}'
+
+    return result
+
+
+def read_batch_summary_results(path: str) -> List[BatchSummaryResult]:
+    """Read the results written by :func:`summarize_paths` as JSON lines."""
+    with open(path) as file:
+        return [
+            BatchSummaryResult.from_json(line)
+            for line in file
+            if line.strip()
+        ]
+
+
+def summarize_paths(
+    paths: Iterable[str],
+    output: Optional[str] = None,
+    html_directory: Optional[str] = None,
+    processes: Optional[int] = None,
+) -> Iterable[BatchSummaryResult]:
+    """Summarize the graphs at the given paths in a pool of processes, yielding the results as they are finished.
+
+    :param paths: Paths to BEL graphs in any of the formats supported by :func:`pybel.load`
+    :param output: A path to a file to which each result is appended as a line of JSON as soon as it is finished.
+     If the file already exists, graphs whose digests already have a successful result in it are skipped.
+    :param html_directory: A directory in which to write an HTML report for each graph
+    :param processes: The number of processes. Defaults to the number of CPUs. If 1, summarizes in this process.
+
+    >>> from pybel_tools.summary.batch import get_batch_summary_table, summarize_paths
+    >>> results = list(summarize_paths(['a.bel.nodelink.json', 'b.bel.nodelink.json'], output='results.jsonl'))
+    >>> get_batch_summary_table(results).to_csv('summary.tsv', sep='\\t')
+    """
+    done: Set[str] = set()
+    if output is not None and os.path.exists(output):
+        done.update(
+            result.digest
+            for result in read_batch_summary_results(output)
+            if result.error is None
+        )
+
+    if html_directory is not None:
+        os.makedirs(html_directory, exist_ok=True)
+
+    digests = {}
+    for path in paths:
+        digest = get_file_digest(path)
+        if digest in done:
+            logger.info('skipping %s since it has already been summarized', path)
+            continue
+        done.add(digest)
+        digests[path] = digest
+
+    file = open(output, 'a') if output is not None else None
+    try:
+        for result in _iterate_summaries(digests, html_directory, processes):
+            if file is not None:
+                print(result.to_json(), file=file, flush=True)
+            yield result
+    finally:
+        if file is not None:
+            file.close()
+
+
+def _iterate_summaries(
+    digests: Mapping[str, str],
+    html_directory: Optional[str],
+    processes: Optional[int],
+) -> Iterable[BatchSummaryResult]:
+    if processes == 1:
+        for path, digest in digests.items():
+            yield summarize_path(path, digest=digest, html_directory=html_directory)
+        return
+
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        futures = {
+            executor.submit(summarize_path, path, digest, html_directory): (path, digest)
+            for path, digest in digests.items()
+        }
+        for future in as_completed(futures):
+            try:
+                yield future.result()
+            except Exception as e:  # the worker process died
+                path, digest = futures[future]
+                yield BatchSummaryResult(path=path, digest=digest, error=f'{e.__class__.__name__}: {e}')
+
+
+def get_batch_summary_table(results: Iterable[BatchSummaryResult]) -> pd.DataFrame:
+    """Build a table with a row for each graph and columns for the timings and the sizes of the parts of its summary.
+
+    Counters are summed and the other parts of the summary are counted. The rows are indexed by the digests and only
+    the last result for each digest is kept, so the results of a batch that was resumed can be given.
+    """
+    rows = []
+    for result in results:
+        row = {
+            'path': result.path,
+            'digest': result.digest,
+            'error': result.error,
+            'load_seconds': result.load_seconds,
+            'summary_seconds': result.summary_seconds,
+            'html_seconds': result.html_seconds,
+        }
+        if result.summary is not None:
+            row['nodes'] = sum(result.summary['function_count'].values())
+            row['edges'] = sum(result.summary['relation_count'].values())
+            for key, value in result.summary.items():
+                if key.endswith('_count') or key == 'hub_data' or key == 'disease_data':
+                    row[key] = sum(value.values())
+                else:
+                    row[key] = len(value)
+        rows.append(row)
+
+    return pd.DataFrame(rows).drop_duplicates('digest', keep='last').set_index('digest')
+
+
+@click.command()
+@click.argument('paths', nargs=-1, type=click.Path(exists=True, dir_okay=False))
+@click.option('-o', '--output', type=click.Path(dir_okay=False), help='JSON lines file of results. Defaults to stdout')
+@click.option('-t', '--table', type=click.Path(dir_okay=False), help='TSV file for the table of all of the results')
+@click.option('--html', type=click.Path(file_okay=False), help='Directory in which to write HTML reports')
+@click.option('-p', '--processes', type=int, help='Number of processes. Defaults to the number of CPUs')
+def main(paths: List[str], output: Optional[str], table: Optional[str], html: Optional[str], processes: Optional[int]):
+    """Summarize BEL graphs in parallel."""
+    logging.basicConfig(level=logging.INFO)
+
+    results = []
+    for result in summarize_paths(paths, output=output, html_directory=html, processes=processes):
+        if output is None:
+            click.echo(result.to_json())
+        if result.error is None:
+            click.echo(f'{result.path}: {result.load_seconds + result.summary_seconds:.2f} seconds', err=True)
+        else:
+            click.secho(f'{result.path}: {result.error}', fg='red', err=True)
+        results.append(result)
+
+    if table is not None:
+        if output is not None:  # include the results from previous runs
+            results = read_batch_summary_results(output)
+        get_batch_summary_table(results).to_csv(table, sep='\t')
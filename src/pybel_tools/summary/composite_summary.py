@@ -4,31 +4,14 @@
 
 from __future__ import annotations
 
-import collections
-from dataclasses import dataclass
-from typing import Counter, List, Mapping, Set, Tuple
+from dataclasses import dataclass, field
+from typing import Any, Counter, List, Mapping, Set, Tuple
 
-from dataclasses_json import dataclass_json
+from dataclasses_json import config, dataclass_json
 
-from pybel import BELGraph, BaseAbundance, BaseEntity
-from pybel.constants import IDENTIFIER, NAME
+from pybel import BELGraph, BaseEntity
 from pybel.struct.graph import WarningTuple
-from pybel.struct.summary import (
-    count_error_types, count_functions, count_namespaces, count_relations, count_variants, get_naked_names,
-    get_syntax_errors, get_top_hubs, get_top_pathologies, get_unused_annotations, get_unused_list_annotation_values,
-    get_unused_namespaces,
-)
-from .error_summary import (
-    get_most_common_errors, get_namespaces_with_incorrect_names, get_undefined_annotations,
-    get_undefined_namespaces,
-)
-from .node_properties import count_modifications
-from .provenance import count_authors, count_confidences, get_citation_years
-from .stability import (
-    get_chaotic_pairs, get_contradiction_summary, get_dampened_pairs, get_decrease_mismatch_triplets,
-    get_increase_mismatch_triplets, get_jens_unstable, get_mutually_unstable_correlation_triples, get_regulatory_pairs,
-    get_separate_unstable_correlation_triples,
-)
+from .accumulators import accumulate, get_summary_accumulators
 from ..typing import SetOfNodePairs, SetOfNodeTriples
 from ..utils import prepare_c3, prepare_c3_time_series
 
@@ -37,6 +20,22 @@ __all__ = [
 ]
 
 
+def _encode_warnings(warnings: List[WarningTuple]) -> List[Tuple[str, Mapping[str, Any], Mapping[str, Any]]]:
+    """Encode the warnings as JSON, since the exceptions in them aren't serializable."""
+    return [
+        (
+            path,
+            {
+                'type': exc.__class__.__name__,
+                'line_number': getattr(exc, 'line_number', None),
+                'message': str(exc),
+            },
+            context,
+        )
+        for path, exc, context in warnings
+    ]
+
+
 @dataclass_json
 @dataclass
 class BELGraphSummary:
@@ -60,7 +59,7 @@ class BELGraphSummary:
     naked_names: Set[str]
     error_count: Counter[str]
     error_groups: List[Tuple[str, str]]
-    syntax_errors: List[WarningTuple]
+    syntax_errors: List[WarningTuple] = field(metadata=config(encoder=_encode_warnings))
 
     # Node counters
     hub_data: Counter[BaseEntity]
@@ -85,43 +84,15 @@ class BELGraphSummary:
 
     @staticmethod
     def from_graph(graph: BELGraph) -> BELGraphSummary:
-        """Create a summary of the graph."""
-        return BELGraphSummary(
-            # Attribute counters
-            function_count=count_functions(graph),
-            modifications_count=count_modifications(graph),
-            relation_count=count_relations(graph),
-            authors_count=count_authors(graph),
-            variants_count=count_variants(graph),
-            namespaces_count=count_namespaces(graph),
-            # Errors
-            undefined_namespaces=get_undefined_namespaces(graph),
-            undefined_annotations=get_undefined_annotations(graph),
-            namespaces_with_incorrect_names=get_namespaces_with_incorrect_names(graph),
-            unused_namespaces=get_unused_namespaces(graph),
-            unused_annotations=get_unused_annotations(graph),
-            unused_list_annotation_values=get_unused_list_annotation_values(graph),
-            naked_names=get_naked_names(graph),
-            error_count=count_error_types(graph),
-            error_groups=get_most_common_errors(graph),
-            syntax_errors=get_syntax_errors(graph),
-            # Node pairs
-            regulatory_pairs=get_regulatory_pairs(graph),
-            chaotic_pairs=get_chaotic_pairs(graph),
-            dampened_pairs=get_dampened_pairs(graph),
-            contradictory_pairs=get_contradiction_summary(graph),
-            separate_unstable_correlation_triples=get_separate_unstable_correlation_triples(graph),
-            mutually_unstable_correlation_triples=get_mutually_unstable_correlation_triples(graph),
-            jens_unstable=get_jens_unstable(graph),
-            increase_mismatch_triplets=get_increase_mismatch_triplets(graph),
-            decrease_mismatch_triplets=get_decrease_mismatch_triplets(graph),
-            # Bibliometrics
-            citation_years=get_citation_years(graph),
-            confidence_count=count_confidences(graph),
-            # Random
-            hub_data=_count_top_hubs(graph),
-            disease_data=_count_top_diseases(graph),
-        )
+        """Create a summary of the graph.
+
+        All of the fields are calculated in one pass over the nodes, edges, and warnings of the graph with the
+        accumulators from :func:`pybel_tools.summary.accumulators.get_summary_accumulators`. When pathologies are tied
+        at the cut of :data:`disease_data`, the ones first by BEL are kept, so the summary of a graph is the same in
+        every process. Before, ties were broken by :func:`pybel.struct.summary.get_top_pathologies`, whose order
+        changes with Python's hash randomization.
+        """
+        return BELGraphSummary(**accumulate(graph, get_summary_accumulators()))
 
     def prepare_c3_for_function_count(self):
         """Prepare C3 JSON for function counts."""
@@ -164,26 +135,3 @@ class BELGraphSummary:
         if self.disease_data is not None:
             return prepare_c3(self.disease_data, 'Pathologies')
 
-
-def _count_top_hubs(graph, n: int = 15):
-    return collections.Counter({
-        (
-            node.name or node.identifier
-            if NAME in node or IDENTIFIER in node else
-            str(node)
-        ): degree
-        for node, degree in get_top_hubs(graph, n=n)
-        if isinstance(node, BaseAbundance)
-    })
-
-
-def _count_top_diseases(graph, n=15):
-    return collections.Counter({
-        (
-            node.name or node.identifier
-            if NAME in node or IDENTIFIER in node else
-            str(node)
-        ): count
-        for node, count in get_top_pathologies(graph, n=n)
-        if isinstance(node, BaseAbundance)
-    })
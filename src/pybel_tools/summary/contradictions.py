@@ -2,11 +2,12 @@
 
 """Functions for identifying contradictions."""
 
-from typing import Collection
+from typing import Collection, Optional
 
 from pybel import BELGraph
 from pybel.constants import CAUSAL_DECREASE_RELATIONS, CAUSAL_INCREASE_RELATIONS, CAUSES_NO_CHANGE, RELATION
 from pybel.dsl import BaseEntity
+from .pair_relations import PairRelationIndex, mask_has_contradiction
 
 __all__ = [
     'pair_has_contradiction',
@@ -14,11 +15,24 @@ __all__ = [
 ]
 
 
-def pair_has_contradiction(graph: BELGraph, u: BaseEntity, v: BaseEntity) -> bool:
+def pair_has_contradiction(
+    graph: BELGraph,
+    u: BaseEntity,
+    v: BaseEntity,
+    pair_index: Optional[PairRelationIndex] = None,
+) -> bool:
     """Check if a pair of nodes has any contradictions in their causal relationships.
 
     Assumes both nodes are in the graph.
+
+    :param graph: A BEL graph
+    :param u: The source node
+    :param v: The target node
+    :param pair_index: A pre-computed index from :func:`pybel_tools.summary.build_pair_relation_index`
     """
+    if pair_index is not None:
+        return mask_has_contradiction(pair_index[u, v])
+
     relations = {data[RELATION] for data in graph[u][v].values()}
     return relation_set_has_contradictions(relations)
 
@@ -15,7 +15,9 @@ from pybel.struct.summary import (
     count_annotations, count_pathologies, count_relations, get_annotations, get_unused_annotations,
     get_unused_list_annotation_values, iter_annotation_value_pairs, iter_annotation_values,
 )
-from .contradictions import pair_has_contradiction
+from .pair_relations import (
+    PairRelationIndex, build_pair_relation_index, mask_has_contradiction, mask_is_consistent,
+)
 
 __all__ = [
     'count_relations',
@@ -130,11 +132,23 @@ def count_annotation_values_filtered(
         )
 
 
-def pair_is_consistent(graph: BELGraph, u: BaseEntity, v: BaseEntity) -> Optional[str]:
+def pair_is_consistent(
+    graph: BELGraph,
+    u: BaseEntity,
+    v: BaseEntity,
+    pair_index: Optional[PairRelationIndex] = None,
+) -> Optional[str]:
     """Return if the edges between the given nodes are consistent, meaning they all have the same relation.
 
+    :param graph: A BEL graph
+    :param u: The source node
+    :param v: The target node
+    :param pair_index: A pre-computed index from :func:`pybel_tools.summary.build_pair_relation_index`
     :return: If the edges aren't consistent, return false, otherwise return the relation type
     """
+    if pair_index is not None:
+        return mask_is_consistent(pair_index[u, v])
+
     relations = {data[RELATION] for data in graph[u][v].values()}
 
     if 1 != len(relations):
@@ -148,8 +162,8 @@ def get_contradictory_pairs(graph: BELGraph) -> Iterable[Tuple[BaseEntity, BaseE
 
     :return: An iterator over (source, target) node pairs that have contradictory causal edges
     """
-    for u, v in graph.edges():
-        if pair_has_contradiction(graph, u, v):
+    for (u, v), mask in build_pair_relation_index(graph).items():
+        if mask_has_contradiction(mask):
             yield u, v
 
 
@@ -158,6 +172,6 @@ def get_consistent_edges(graph: BELGraph) -> Iterable[Tuple[BaseEntity, BaseEnti
 
     :return: An iterator over (source, target) node pairs corresponding to edges with many inconsistent relations
     """
-    for u, v in graph.edges():
-        if pair_is_consistent(graph, u, v):
+    for (u, v), mask in build_pair_relation_index(graph).items():
+        if mask_is_consistent(mask):
             yield u, v
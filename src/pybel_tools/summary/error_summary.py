@@ -1,21 +1,31 @@
 # -*- coding: utf-8 -*-
 
-"""This module contains functions that provide summaries of the errors encountered while parsing a BEL script."""
+"""This module contains functions that provide summaries of the errors encountered while parsing a BEL script.
 
-from collections import Iterable, defaultdict
-from typing import Counter, List, Mapping, Optional, Set, Tuple
+Each function answers from a :class:`WarningIndex` of the graph's warnings, which is built in one pass on first use and
+kept beside the graph until more warnings are added, so summarizing a graph with many warnings doesn't rescan them for
+every namespace.
+"""
+
+import itertools as itt
+import typing
+import weakref
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple, Type
 
 from pybel import BELGraph
 from pybel.constants import ANNOTATIONS
 from pybel.parser.exc import (
-    MissingNamespaceNameWarning, MissingNamespaceRegexWarning, UndefinedAnnotationWarning, UndefinedNamespaceWarning,
+    MissingNamespaceNameWarning, MissingNamespaceRegexWarning, NakedNameWarning, UndefinedAnnotationWarning,
+    UndefinedNamespaceWarning,
 )
-from pybel.struct.filters.edge_predicates import edge_has_annotation
-from pybel.struct.summary.errors import count_error_types, count_naked_names, get_naked_names
-from pybel.struct.summary.node_summary import get_names_by_namespace, get_namespaces
+from pybel.struct.graph import WarningTuple
+from pybel.struct.summary.node_summary import get_names, get_namespaces
 from ..utils import count_dict_values
 
 __all__ = [
+    'WarningIndex',
+    'get_warning_index',
     'count_error_types',
     'count_naked_names',
     'get_naked_names',
@@ -33,133 +43,249 @@ __all__ = [
     'get_most_common_errors',
 ]
 
+_INCORRECT_NAME_WARNINGS = (MissingNamespaceNameWarning, MissingNamespaceRegexWarning)
+
+
+class WarningIndex:
+    """An index of the warnings from compiling a graph, grouped by exception type, namespace, annotation, and line.
+
+    Each warning is identified by its position in :data:`warnings`.
+
+    >>> index = get_warning_index(graph)
+    >>> index.get_warnings(index.line_number_warnings[5])
+    """
+
+    def __init__(self, warnings: List[WarningTuple]) -> None:
+        """Index the warnings in one pass.
+
+        :param warnings: The warnings of a graph, like from :data:`pybel.BELGraph.warnings`
+        """
+        self.warnings = warnings
+        #: The number of warnings when the index was built
+        self.number_of_warnings = len(warnings)
+
+        #: The identifiers of the warnings of each exception type
+        self.type_warnings: Dict[Type[Exception], List[int]] = defaultdict(list)
+        #: The identifiers of the warnings about names in each namespace
+        self.namespace_warnings: Dict[str, List[int]] = defaultdict(list)
+        #: The identifiers of the warnings in the context of each value of each annotation
+        self.annotation_warnings: Dict[str, Dict[str, List[int]]] = defaultdict(lambda: defaultdict(list))
+        #: The identifiers of the warnings on each line
+        self.line_number_warnings: Dict[int, List[int]] = defaultdict(list)
+
+        #: The incorrect names in each namespace, with repeats, in the order they were found
+        self.incorrect_names: Dict[str, List[str]] = defaultdict(list)
+        #: The names used with each undefined namespace
+        self.undefined_namespace_names: Dict[str, Set[str]] = defaultdict(set)
+        #: The annotations that were used without being defined
+        self.undefined_annotations: Set[str] = set()
+        #: The names used without a namespace, with repeats
+        self.naked_names: List[str] = []
+        self._error_groups: Optional[Dict[str, List[int]]] = None
+
+        for warning_id, (_, exc, context) in enumerate(warnings):
+            line_number = getattr(exc, 'line_number', None)
+            self.type_warnings[exc.__class__].append(warning_id)
+            self.line_number_warnings[line_number].append(warning_id)
+
+            namespace = getattr(exc, 'namespace', None)
+            if namespace is not None:
+                self.namespace_warnings[namespace].append(warning_id)
+
+            if isinstance(exc, _INCORRECT_NAME_WARNINGS):
+                self.incorrect_names[exc.namespace].append(exc.name)
+            elif isinstance(exc, UndefinedNamespaceWarning):
+                self.undefined_namespace_names[exc.namespace].add(exc.name)
+            elif isinstance(exc, UndefinedAnnotationWarning):
+                self.undefined_annotations.add(exc.annotation)
+            elif isinstance(exc, NakedNameWarning):
+                self.naked_names.append(exc.name)
+
+            for annotation, values in ((context or {}).get(ANNOTATIONS) or {}).items():
+                if not values:
+                    continue
+                if isinstance(values, str):
+                    values = [values]
+                for value in values:
+                    self.annotation_warnings[annotation][value].append(warning_id)
+
+    def __len__(self) -> int:  # noqa: D105
+        return self.number_of_warnings
+
+    @property
+    def error_groups(self) -> Mapping[str, List[int]]:
+        """The line numbers of each distinct error message, grouped on first use since formatting messages is slow."""
+        if self._error_groups is None:
+            self._error_groups = defaultdict(list)
+            for _, exc, _ in itt.islice(self.warnings, self.number_of_warnings):
+                self._error_groups[str(exc)].append(getattr(exc, 'line_number', None))
+        return self._error_groups
+
+    def get_warnings(self, warning_ids: Iterable[int]) -> List[WarningTuple]:
+        """Get the warnings with the given identifiers."""
+        return [self.warnings[warning_id] for warning_id in warning_ids]
+
+    def get_warning_ids_by_type(self, *exception_types: Type[Exception]) -> List[int]:
+        """Get the identifiers of the warnings that are instances of any of the given exception types, in order."""
+        return sorted(
+            warning_id
+            for cls, warning_ids in self.type_warnings.items()
+            if issubclass(cls, exception_types)
+            for warning_id in warning_ids
+        )
+
+
+_indexes: 'weakref.WeakKeyDictionary[BELGraph, WarningIndex]' = weakref.WeakKeyDictionary()
+
+
+def get_warning_index(graph: BELGraph, refresh: bool = False) -> WarningIndex:
+    """Get the index of the graph's warnings, reusing the last one if no warnings have been added since.
+
+    :param graph: A BEL graph
+    :param refresh: Should the index be rebuilt anyway? Use this after changing warnings in place.
+    """
+    index = _indexes.get(graph)
+    if refresh or index is None or index.warnings is not graph.warnings or len(graph.warnings) != len(index):
+        index = _indexes[graph] = WarningIndex(graph.warnings)
+    return index
+
+
+def _get_index(graph: BELGraph, index: Optional[WarningIndex]) -> WarningIndex:
+    return get_warning_index(graph) if index is None else index
+
+
+def count_error_types(graph: BELGraph, index: Optional[WarningIndex] = None) -> typing.Counter[str]:
+    """Count the occurrence of each type of error in a graph.
 
-def get_namespaces_with_incorrect_names(graph: BELGraph) -> Set[str]:
+    :return: A Counter of {error type: frequency}
+    """
+    index = _get_index(graph, index)
+    rv = Counter()
+    for cls, warning_ids in index.type_warnings.items():
+        rv[cls.__name__] += len(warning_ids)
+    return rv
+
+
+def count_naked_names(graph: BELGraph, index: Optional[WarningIndex] = None) -> typing.Counter[str]:
+    """Count the frequency of each naked name (names without namespaces).
+
+    :return: A Counter from {name: frequency}
+    """
+    return Counter(_get_index(graph, index).naked_names)
+
+
+def get_naked_names(graph: BELGraph, index: Optional[WarningIndex] = None) -> Set[str]:
+    """Get the set of naked names in the graph."""
+    return set(_get_index(graph, index).naked_names)
+
+
+def get_namespaces_with_incorrect_names(graph: BELGraph, index: Optional[WarningIndex] = None) -> Set[str]:
     """Return the set of all namespaces with incorrect names in the graph."""
-    return {
-        exc.namespace
-        for _, exc, _ in graph.warnings
-        if isinstance(exc, (MissingNamespaceNameWarning, MissingNamespaceRegexWarning))
-    }
+    return set(_get_index(graph, index).incorrect_names)
 
 
-def get_undefined_namespaces(graph: BELGraph) -> Set[str]:
+def get_undefined_namespaces(graph: BELGraph, index: Optional[WarningIndex] = None) -> Set[str]:
     """Get all namespaces that are used in the BEL graph aren't actually defined."""
-    return {
-        exc.namespace
-        for _, exc, _ in graph.warnings
-        if isinstance(exc, UndefinedNamespaceWarning)
-    }
+    return set(_get_index(graph, index).undefined_namespace_names)
 
 
-def get_incorrect_names_by_namespace(graph: BELGraph, namespace: str) -> Set[str]:
+def get_incorrect_names_by_namespace(
+    graph: BELGraph,
+    namespace: str,
+    index: Optional[WarningIndex] = None,
+) -> Set[str]:
     """Return the set of all incorrect names from the given namespace in the graph.
 
     :return: The set of all incorrect names from the given namespace in the graph
     """
-    return {
-        exc.name
-        for _, exc, _ in graph.warnings
-        if isinstance(exc, (MissingNamespaceNameWarning, MissingNamespaceRegexWarning)) and exc.namespace == namespace
-    }
+    return set(_get_index(graph, index).incorrect_names.get(namespace, ()))
 
 
-def get_undefined_namespace_names(graph: BELGraph, namespace: str) -> Set[str]:
+def get_undefined_namespace_names(graph: BELGraph, namespace: str, index: Optional[WarningIndex] = None) -> Set[str]:
     """Get the names from a namespace that wasn't actually defined.
 
     :return: The set of all names from the undefined namespace
     """
-    return {
-        exc.name
-        for _, exc, _ in graph.warnings
-        if isinstance(exc, UndefinedNamespaceWarning) and exc.namespace == namespace
-    }
+    return set(_get_index(graph, index).undefined_namespace_names.get(namespace, ()))
 
 
-def get_incorrect_names(graph: BELGraph) -> Mapping[str, Set[str]]:
+def get_incorrect_names(graph: BELGraph, index: Optional[WarningIndex] = None) -> Mapping[str, Set[str]]:
     """Return the dict of the sets of all incorrect names from the given namespace in the graph.
 
     :return: The set of all incorrect names from the given namespace in the graph
     """
+    index = _get_index(graph, index)
     return {
-        namespace: get_incorrect_names_by_namespace(graph, namespace)
+        namespace: get_incorrect_names_by_namespace(graph, namespace, index=index)
         for namespace in get_namespaces(graph)
     }
 
 
-def get_undefined_annotations(graph: BELGraph) -> Set[str]:
+def get_undefined_annotations(graph: BELGraph, index: Optional[WarningIndex] = None) -> Set[str]:
     """Get all annotations that aren't actually defined.
 
     :return: The set of all undefined annotations
     """
-    return {
-        exc.annotation
-        for _, exc, _ in graph.warnings
-        if isinstance(exc, UndefinedAnnotationWarning)
-    }
+    return set(_get_index(graph, index).undefined_annotations)
 
 
-def calculate_incorrect_name_dict(graph: BELGraph) -> Mapping[str, str]:
+def calculate_incorrect_name_dict(graph: BELGraph, index: Optional[WarningIndex] = None) -> Mapping[str, List[str]]:
     """Group all of the incorrect identifiers in a dict of {namespace: list of erroneous names}.
 
     :return: A dictionary of {namespace: list of erroneous names}
     """
-    missing = defaultdict(list)
-
-    for _, e, ctx in graph.warnings:
-        if not isinstance(e, (MissingNamespaceNameWarning, MissingNamespaceRegexWarning)):
-            continue
-        missing[e.namespace].append(e.name)
-
-    return dict(missing)
+    return {
+        namespace: list(names)
+        for namespace, names in _get_index(graph, index).incorrect_names.items()
+    }
 
 
-def calculate_error_by_annotation(graph: BELGraph, annotation: str) -> Mapping[str, List[str]]:
+def calculate_error_by_annotation(
+    graph: BELGraph,
+    annotation: str,
+    index: Optional[WarningIndex] = None,
+) -> Mapping[str, List[str]]:
     """Group the graph by a given annotation and builds lists of errors for each.
 
     :return: A dictionary of {annotation value: list of errors}
     """
-    results = defaultdict(list)
-
-    for _, exc, ctx in graph.warnings:
-        if not ctx or not edge_has_annotation(ctx, annotation):
-            continue
-
-        values = ctx[ANNOTATIONS][annotation]
-
-        if isinstance(values, str):
-            results[values].append(exc.__class__.__name__)
-        elif isinstance(values, Iterable):
-            for value in values:
-                results[value].append(exc.__class__.__name__)
-
-    return dict(results)
+    index = _get_index(graph, index)
+    return {
+        value: [exc.__class__.__name__ for _, exc, _ in index.get_warnings(warning_ids)]
+        for value, warning_ids in index.annotation_warnings.get(annotation, {}).items()
+    }
 
 
-def group_errors(graph: BELGraph) -> Mapping[str, List[int]]:
+def group_errors(graph: BELGraph, index: Optional[WarningIndex] = None) -> Mapping[str, List[int]]:
     """Group the errors together for analysis of the most frequent error.
 
     :return: A dictionary of {error string: list of line numbers}
     """
-    warning_summary = defaultdict(list)
-
-    for _, exc, _ in graph.warnings:
-        warning_summary[str(exc)].append(exc.line_number)
-
-    return dict(warning_summary)
+    return {
+        error: list(line_numbers)
+        for error, line_numbers in _get_index(graph, index).error_groups.items()
+    }
 
 
-def count_errors(graph: BELGraph) -> Counter[str]:
+def count_errors(graph: BELGraph, index: Optional[WarningIndex] = None) -> typing.Counter[str]:
     """Count the errors in the graph."""
-    return count_dict_values(group_errors(graph))
+    return count_dict_values(_get_index(graph, index).error_groups)
 
 
-def get_most_common_errors(graph: BELGraph, n: Optional[int] = 20) -> List[Tuple[str, int]]:
+def get_most_common_errors(
+    graph: BELGraph,
+    n: Optional[int] = 20,
+    index: Optional[WarningIndex] = None,
+) -> List[Tuple[str, int]]:
     """Get the (n) most common errors in a graph."""
-    return count_errors(graph).most_common(n)
+    return count_errors(graph, index=index).most_common(n)
 
 
-def get_names_including_errors_by_namespace(graph: BELGraph, namespace: str) -> Set[str]:
+def get_names_including_errors_by_namespace(
+    graph: BELGraph,
+    namespace: str,
+    index: Optional[WarningIndex] = None,
+) -> Set[str]:
     """Get all names appearing in the graph, including erroneous names, for the given namespace.
 
     Takes the names from the graph in a given namespace (:func:`pybel.struct.summary.get_names_by_namespace`) and
@@ -168,18 +294,33 @@ def get_names_including_errors_by_namespace(graph: BELGraph, namespace: str) ->
 
     :return: The set of all correct and incorrect names from the given namespace in the graph
     """
-    return get_names_by_namespace(graph, namespace) | get_incorrect_names_by_namespace(graph, namespace)
+    return get_names_including_errors(graph, index=index, namespaces=[namespace])[namespace]
 
 
-def get_names_including_errors(graph: BELGraph) -> Mapping[str, Set[str]]:
+def get_names_including_errors(
+    graph: BELGraph,
+    index: Optional[WarningIndex] = None,
+    namespaces: Optional[Iterable[str]] = None,
+) -> Mapping[str, Set[str]]:
     """Get all names appearing in the graph, including erroneous names, and group in a dictionary by namespace.
 
     Takes the names from the graph in a given namespace and the erroneous names from the same namespace and returns
-    them together as a unioned set
+    them together as a unioned set. The names in the graph are gathered in one pass for all namespaces.
 
+    :param namespaces: The namespaces to include. Defaults to all of the namespaces used in the graph.
     :return: The dict of the sets of all correct and incorrect names from the given namespace in the graph
+    :raises IndexError: if one of the namespaces is not defined in the graph
     """
-    return {
-        namespace: get_names_including_errors_by_namespace(graph, namespace)
-        for namespace in get_namespaces(graph)
-    }
+    if namespaces is None:
+        namespaces = get_namespaces(graph)
+    index = _get_index(graph, index)
+
+    names = None
+    rv = {}
+    for namespace in namespaces:
+        if namespace not in graph.defined_namespace_keywords:
+            raise IndexError(f'{namespace} is not defined in {graph}')
+        if names is None:
+            names = get_names(graph)
+        rv[namespace] = names.get(namespace, set()) | get_incorrect_names_by_namespace(graph, namespace, index=index)
+    return rv
@@ -15,6 +15,7 @@ from pybel.struct.filters.edge_predicates import is_causal_relation
 from pybel.struct.filters.node_predicates import (
     has_activity, is_causal_central, is_causal_sink, is_causal_source, is_degraded, is_translocated,
 )
+from ..cache import cached_on_graph
 
 __all__ = [
     'is_causal_relation',
@@ -125,6 +126,7 @@ def count_top_degrees(graph: BELGraph, number: Optional[int] = 30) -> Mapping[Ba
     return dict(dc.most_common(number))
 
 
+@cached_on_graph()
 def count_top_centrality(graph: BELGraph, number: Optional[int] = 30) -> Mapping[BaseEntity, int]:
     """Get top centrality dictionary."""
     dd = nx.betweenness_centrality(graph)
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+
+"""An index of the relations between each pair of nodes, encoded as integer bitmasks.
+
+Checking a pair of nodes for contradictions or consistency normally means building a set of the relations from all of
+their parallel edges. The index in this module does that once for every pair in the graph, so the checks become bit
+operations on a single integer.
+
+>>> from pybel_tools.summary.pair_relations import build_pair_relation_index, mask_has_contradiction
+>>> pair_index = build_pair_relation_index(graph)
+>>> contradictory_pairs = [pair for pair, mask in pair_index.items() if mask_has_contradiction(mask)]
+"""
+
+from typing import Dict, Iterable, List, Mapping, Optional, Set
+
+from pybel import BELGraph
+from pybel.constants import (
+    ANALOGOUS_TO, ASSOCIATION, BINDS, BIOMARKER_FOR, CAUSAL_DECREASE_RELATIONS, CAUSAL_INCREASE_RELATIONS,
+    CAUSES_NO_CHANGE, CORRELATION, DECREASES, DIRECTLY_DECREASES, DIRECTLY_INCREASES, EQUIVALENT_TO, HAS_PRODUCT,
+    HAS_REACTANT, HAS_VARIANT, INCREASES, IS_A, NEGATIVE_CORRELATION, NO_CORRELATION, ORTHOLOGOUS, PART_OF,
+    POSITIVE_CORRELATION, PROGONSTIC_BIOMARKER_FOR, RATE_LIMITING_STEP_OF, REGULATES, RELATION, SUBPROCESS_OF,
+    TRANSCRIBED_TO, TRANSLATED_TO,
+)
+from ..typing import NodePair
+
+__all__ = [
+    'PairRelationIndex',
+    'get_relation_bit',
+    'relations_to_mask',
+    'mask_to_relations',
+    'build_pair_relation_index',
+    'mask_has_contradiction',
+    'mask_is_consistent',
+]
+
+#: A dictionary of {(source, target): bitmask of the relations of the edges from source to target}
+PairRelationIndex = Mapping[NodePair, int]
+
+#: The BEL relations, in the order of the bits used to represent them. Relations not in this list are appended to it
+#: the first time they are encountered.
+RELATIONS: List[str] = [
+    INCREASES,
+    DIRECTLY_INCREASES,
+    DECREASES,
+    DIRECTLY_DECREASES,
+    CAUSES_NO_CHANGE,
+    REGULATES,
+    RATE_LIMITING_STEP_OF,
+    POSITIVE_CORRELATION,
+    NEGATIVE_CORRELATION,
+    CORRELATION,
+    NO_CORRELATION,
+    ASSOCIATION,
+    BINDS,
+    BIOMARKER_FOR,
+    PROGONSTIC_BIOMARKER_FOR,
+    ANALOGOUS_TO,
+    ORTHOLOGOUS,
+    EQUIVALENT_TO,
+    IS_A,
+    PART_OF,
+    SUBPROCESS_OF,
+    HAS_VARIANT,
+    HAS_REACTANT,
+    HAS_PRODUCT,
+    TRANSCRIBED_TO,
+    TRANSLATED_TO,
+]
+
+_RELATION_BITS: Dict[str, int] = {
+    relation: 1 << position
+    for position, relation in enumerate(RELATIONS)
+}
+
+
+def get_relation_bit(relation: str) -> int:
+    """Get the bit representing the given relation."""
+    bit = _RELATION_BITS.get(relation)
+    if bit is None:
+        bit = _RELATION_BITS[relation] = 1 << len(RELATIONS)
+        RELATIONS.append(relation)
+    return bit
+
+
+def relations_to_mask(relations: Iterable[str]) -> int:
+    """Encode the given relations as a bitmask."""
+    mask = 0
+    for relation in relations:
+        mask |= get_relation_bit(relation)
+    return mask
+
+
+def mask_to_relations(mask: int) -> Set[str]:
+    """Decode a bitmask to the set of relations it represents."""
+    return {
+        relation
+        for position, relation in enumerate(RELATIONS)
+        if mask >> position & 1
+    }
+
+
+#: The bitmask of all causal relations with an increasing effect
+CAUSAL_INCREASE_MASK = relations_to_mask(CAUSAL_INCREASE_RELATIONS)
+#: The bitmask of all causal relations with a decreasing effect
+CAUSAL_DECREASE_MASK = relations_to_mask(CAUSAL_DECREASE_RELATIONS)
+#: The bitmask of the causes no change relation
+CAUSES_NO_CHANGE_MASK = get_relation_bit(CAUSES_NO_CHANGE)
+
+
+def build_pair_relation_index(graph: BELGraph) -> Dict[NodePair, int]:
+    """Build a dictionary from each pair of connected nodes to the bitmask of the relations between them.
+
+    Each edge is visited once, so pairs with many parallel edges don't need to be revisited by the checks on them.
+    """
+    rv = {}
+    for u, v, data in graph.edges(data=True):
+        rv[u, v] = rv.get((u, v), 0) | get_relation_bit(data[RELATION])
+    return rv
+
+
+def mask_has_contradiction(mask: int) -> bool:
+    """Return if the relations in the bitmask contain a contradiction.
+
+    Has the same semantics as :func:`pybel_tools.summary.relation_set_has_contradictions`.
+    """
+    has_increases = bool(mask & CAUSAL_INCREASE_MASK)
+    has_decreases = bool(mask & CAUSAL_DECREASE_MASK)
+    has_cnc = bool(mask & CAUSES_NO_CHANGE_MASK)
+    return 1 < has_cnc + has_decreases + has_increases
+
+
+def mask_is_consistent(mask: int) -> Optional[str]:
+    """Return the relation if the bitmask has exactly one relation, otherwise return None."""
+    if not mask or mask & (mask - 1):
+        return
+
+    return RELATIONS[mask.bit_length() - 1]
@@ -2,26 +2,30 @@
 
 """This module contains functions to summarize the provenance (citations, evidences, and authors) in a BEL graph."""
 
+import bisect
 import itertools as itt
 import logging
 import typing
 from collections import Counter, defaultdict
 from datetime import datetime
-from typing import Iterable, List, Mapping, Optional, Set, Tuple, Union
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
 
 from pybel import BELGraph
 from pybel.constants import (
-    ANNOTATIONS, CITATION, CITATION_AUTHORS, CITATION_DATE, CITATION_DB, CITATION_IDENTIFIER, EVIDENCE,
+    ANNOTATIONS, CITATION, CITATION_AUTHORS, CITATION_DATE, CITATION_DB, CITATION_IDENTIFIER, CITATION_TYPE_PUBMED,
+    EVIDENCE,
 )
 from pybel.dsl import BaseEntity
 from pybel.struct.filters import filter_edges
 from pybel.struct.filters.edge_predicates import edge_has_annotation
 from pybel.struct.summary import iterate_pubmed_identifiers
-from pybel.typing import Strings
+from pybel.typing import EdgeData, Strings
 from ..filters import build_edge_data_filter, build_pmid_inclusion_filter
 from ..utils import count_defaultdict, count_dict_values, group_as_lists, group_as_sets
 
 __all__ = [
+    'KeywordIndex',
+    'ProvenanceIndex',
     'count_pmids',
     'get_pmid_by_keyword',
     'count_citations',
@@ -39,6 +43,183 @@ __all__ = [
 
 logger = logging.getLogger(__name__)
 
+Citation = Tuple[str, str]
+EdgeTuple = Tuple[BaseEntity, BaseEntity, str]
+
+
+class KeywordIndex:
+    """A search index over a growing set of strings.
+
+    Prefix search bisects a sorted list of the strings. Case-insensitive substring search intersects the postings of
+    the trigrams of the keyword, then checks the few remaining candidates. Keywords shorter than three characters are
+    answered directly from the postings of their unigrams and bigrams. Each structure is built on its first search and
+    kept up to date by :meth:`add` afterwards.
+    """
+
+    def __init__(self, values: Iterable[str] = ()) -> None:
+        """Initialize the index with the given strings."""
+        self.values: List[str] = []
+        self._ids: Dict[str, int] = {}
+        self._sorted: Optional[List[str]] = None
+        self._postings: Optional[Dict[str, Set[int]]] = None
+        for value in values:
+            self.add(value)
+
+    def __len__(self) -> int:  # noqa: D105
+        return len(self.values)
+
+    def __contains__(self, value: str) -> bool:  # noqa: D105
+        return value in self._ids
+
+    def add(self, value: str) -> None:
+        """Add a string to the index if it's not already in it."""
+        if value in self._ids:
+            return
+
+        value_id = self._ids[value] = len(self.values)
+        self.values.append(value)
+
+        if self._sorted is not None:
+            bisect.insort(self._sorted, value)
+        if self._postings is not None:
+            self._add_postings(value_id, value)
+
+    def search_prefix(self, prefix: str) -> Set[str]:
+        """Get the strings that start with the given prefix."""
+        if self._sorted is None:
+            self._sorted = sorted(self.values)
+
+        rv = set()
+        for i in range(bisect.bisect_left(self._sorted, prefix), len(self._sorted)):
+            value = self._sorted[i]
+            if not value.startswith(prefix):
+                break
+            rv.add(value)
+        return rv
+
+    def search_substring(self, keyword: str) -> Set[str]:
+        """Get the strings that contain the given keyword, ignoring case."""
+        if self._postings is None:
+            self._postings = defaultdict(set)
+            for value_id, value in enumerate(self.values):
+                self._add_postings(value_id, value)
+
+        keyword = keyword.lower()
+        if not keyword:
+            return set(self.values)
+        if len(keyword) < 3:
+            return {self.values[value_id] for value_id in self._postings.get(keyword, ())}
+
+        postings = sorted((self._postings.get(gram, set()) for gram in _iter_grams(keyword, 3)), key=len)
+        candidates = postings[0].intersection(*postings[1:])
+        return {
+            self.values[value_id]
+            for value_id in candidates
+            if keyword in self.values[value_id].lower()
+        }
+
+    def _add_postings(self, value_id: int, value: str) -> None:
+        value = value.lower()
+        for size in (1, 2, 3):
+            for gram in _iter_grams(value, size):
+                self._postings[gram].add(value_id)
+
+
+def _iter_grams(value: str, size: int) -> Iterable[str]:
+    return (value[i:i + size] for i in range(len(value) - size + 1))
+
+
+class ProvenanceIndex:
+    """An inverted index of the citations, authors, annotations, and dates of the edges in a graph.
+
+    The provenance functions in this module scan all edges on every call. Build an index once and pass it to them to
+    answer in time proportional to the size of the answer instead. Citations are keyed by their database and their
+    identifier with surrounding whitespace removed. Only edges with citations are indexed.
+
+    >>> index = ProvenanceIndex(graph)
+    >>> count_citations(graph, index=index)
+    >>> count_citation_years(graph, index=index)
+    """
+
+    def __init__(self, graph: BELGraph) -> None:
+        """Index the edges in the graph."""
+        self.graph = graph
+
+        #: The indexed edges. The identifier of each edge is its position.
+        self.edges: List[EdgeTuple] = []
+        #: The citation of each edge
+        self.edge_citations: List[Citation] = []
+        #: A dictionary from citations to the identifiers of their edges
+        self.citation_edges: Dict[Citation, List[int]] = defaultdict(list)
+        #: A dictionary from authors to the citations they wrote
+        self.author_citations: Dict[str, Set[Citation]] = defaultdict(set)
+        #: A counter of the edges in which each author appears
+        self.author_edge_counts: typing.Counter[str] = Counter()
+        #: A counter of the distinct (source, target) pairs citing each citation
+        self.citation_pair_counts: typing.Counter[Citation] = Counter()
+        #: A dictionary from annotations to dictionaries from their values to counters of the distinct
+        #: (source, target) pairs citing each citation
+        self.annotation_citation_counts: Dict[str, Dict[str, typing.Counter[Citation]]] = defaultdict(
+            lambda: defaultdict(Counter),
+        )
+        #: A dictionary from annotations to dictionaries from their values to counters of the edges in which each
+        #: author appears
+        self.annotation_author_counts: Dict[str, Dict[str, typing.Counter[str]]] = defaultdict(
+            lambda: defaultdict(Counter),
+        )
+        self._cited_pairs: Set[Tuple[Citation, BaseEntity, BaseEntity]] = set()
+        self._annotated_cited_pairs: Set[Tuple[str, str, Citation, BaseEntity, BaseEntity]] = set()
+        #: A dictionary from years to the citations published in them
+        self.year_citations: Dict[int, Set[Citation]] = defaultdict(set)
+        #: A search index of the PubMed identifiers
+        self.pmid_keywords = KeywordIndex()
+        #: A search index of the authors
+        self.author_keywords = KeywordIndex()
+
+        for u, v, k, data in graph.edges(keys=True, data=True):
+            self.add_edge(u, v, k, data)
+
+    def add_edge(self, u: BaseEntity, v: BaseEntity, key: str, data: EdgeData) -> None:
+        """Add an edge to the index. Call this after adding an edge to the graph to keep the index up to date."""
+        citation_data = data.get(CITATION)
+        if citation_data is None:
+            return
+
+        edge_id = len(self.edges)
+        citation = citation_data[CITATION_DB], citation_data[CITATION_IDENTIFIER].strip()
+        self.edges.append((u, v, key))
+        self.edge_citations.append(citation)
+        self.citation_edges[citation].append(edge_id)
+        if citation[0] == CITATION_TYPE_PUBMED:
+            self.pmid_keywords.add(citation[1])
+
+        if (citation, u, v) not in self._cited_pairs:
+            self._cited_pairs.add((citation, u, v))
+            self.citation_pair_counts[citation] += 1
+
+        authors = citation_data.get(CITATION_AUTHORS, [])
+        for author in authors:
+            self.author_keywords.add(author)
+            self.author_citations[author].add(citation)
+            self.author_edge_counts[author] += 1
+
+        for annotation, values in data.get(ANNOTATIONS, {}).items():
+            for value in values:
+                if (annotation, value, citation, u, v) not in self._annotated_cited_pairs:
+                    self._annotated_cited_pairs.add((annotation, value, citation, u, v))
+                    self.annotation_citation_counts[annotation][value][citation] += 1
+                for author in authors:
+                    self.annotation_author_counts[annotation][value][author] += 1
+
+        date = citation_data.get(CITATION_DATE)
+        if date is not None:
+            try:
+                year = _ensure_datetime(date).year
+            except ValueError:
+                pass
+            else:
+                self.year_citations[year].add(citation)
+
 
 def _generate_citation_dict(graph: BELGraph) -> Mapping[str, Mapping[Tuple[BaseEntity, BaseEntity], str]]:
     """Prepare a citation data dictionary from a graph.
@@ -59,14 +240,19 @@ def get_pmid_by_keyword(
     keyword: str,
     graph: Optional[BELGraph] = None,
     pubmed_identifiers: Optional[Set[str]] = None,
+    index: Optional[ProvenanceIndex] = None,
 ) -> Set[str]:
     """Get the set of PubMed identifiers beginning with the given keyword string.
 
     :param keyword: The beginning of a PubMed identifier
     :param graph: A BEL graph
     :param pubmed_identifiers: A set of pre-cached PubMed identifiers
+    :param index: An optional provenance index of the graph, whose search index is used instead of a scan
     :return: A set of PubMed identifiers starting with the given string
     """
+    if index is not None:
+        return index.pmid_keywords.search_prefix(keyword)
+
     if pubmed_identifiers is not None:
         return {
             pubmed_identifier
@@ -84,46 +270,70 @@ def get_pmid_by_keyword(
     }
 
 
-def count_pmids(graph: BELGraph) -> Counter:
+def count_pmids(graph: BELGraph, index: Optional[ProvenanceIndex] = None) -> Counter:
     """Count the frequency of PubMed documents in a graph.
 
+    :param graph: A BEL graph
+    :param index: An optional provenance index of the graph
     :return: A Counter from {(pmid, name): frequency}
     """
+    if index is not None:
+        return Counter({
+            identifier: len(edge_ids)
+            for (db, identifier), edge_ids in index.citation_edges.items()
+            if db == CITATION_TYPE_PUBMED
+        })
+
     return Counter(iterate_pubmed_identifiers(graph))
 
 
-def count_citations(graph: BELGraph, **annotations) -> Counter:
+def count_citations(graph: BELGraph, index: Optional[ProvenanceIndex] = None, **annotations) -> Counter:
     """Count the citations in a graph based on a given filter.
 
     :param graph: A BEL graph
+    :param index: An optional provenance index of the graph. It is only used if no annotation filters are given.
     :param dict annotations: The annotation filters to use
     :return: A counter from {(citation type, citation reference): frequency}
     """
+    if index is not None and not annotations:
+        return Counter(index.citation_pair_counts)
+
     annotation_dict_filter = build_edge_data_filter(annotations)
 
     citations = defaultdict(set)
-    for u, v, _, d in filter_edges(graph, annotation_dict_filter):
+    for u, v, k in filter_edges(graph, annotation_dict_filter):
+        d = graph[u][v][k]
         if CITATION in d:
             citations[u, v].add((d[CITATION][CITATION_DB], d[CITATION][CITATION_IDENTIFIER].strip()))
 
     return Counter(itt.chain.from_iterable(citations.values()))
 
 
-def count_citations_by_annotation(graph: BELGraph, annotation: str) -> Mapping[str, typing.Counter[str]]:
+def count_citations_by_annotation(
+    graph: BELGraph,
+    annotation: str,
+    index: Optional[ProvenanceIndex] = None,
+) -> Mapping[str, typing.Counter[str]]:
     """Group the citation counters by subgraphs induced by the annotation.
 
     :param graph: A BEL graph
     :param annotation: The annotation to use to group the graph
+    :param index: An optional provenance index of the graph
     :return: A dictionary of Counters {subgraph name: Counter from {citation: frequency}}
     """
+    if index is not None:
+        return {
+            value: Counter(counter)
+            for value, counter in index.annotation_citation_counts.get(annotation, {}).items()
+        }
+
     citations = defaultdict(lambda: defaultdict(set))
     for u, v, data in graph.edges(data=True):
         if not edge_has_annotation(data, annotation) or CITATION not in data:
             continue
 
-        k = data[ANNOTATIONS][annotation]
-
-        citations[k][u, v].add((data[CITATION][CITATION_DB], data[CITATION][CITATION_IDENTIFIER].strip()))
+        for k in data[ANNOTATIONS][annotation]:
+            citations[k][u, v].add((data[CITATION][CITATION_DB], data[CITATION][CITATION_IDENTIFIER].strip()))
 
     return {
         k: Counter(itt.chain.from_iterable(v.values()))
@@ -131,13 +341,19 @@ def count_citations_by_annotation(graph: BELGraph, annotation: str) -> Mapping[s
     }
 
 
-def count_authors(graph: BELGraph) -> typing.Counter[str]:
+def count_authors(graph: BELGraph, index: Optional[ProvenanceIndex] = None) -> typing.Counter[str]:
     """Count the number of edges in which each author appears."""
+    if index is not None:
+        return Counter(index.author_edge_counts)
+
     return Counter(graph._iterate_authors())
 
 
-def count_author_publications(graph: BELGraph) -> typing.Counter[str]:
+def count_author_publications(graph: BELGraph, index: Optional[ProvenanceIndex] = None) -> typing.Counter[str]:
     """Count the number of publications of each author to the given graph."""
+    if index is not None:
+        return count_dict_values(index.author_citations)
+
     authors = group_as_lists(_iter_author_publiations(graph))
     return Counter(count_dict_values(count_defaultdict(authors)))
 
@@ -158,14 +374,23 @@ def get_authors(graph: BELGraph) -> Set[str]:
     return set(graph._iterate_authors())
 
 
-def get_authors_by_keyword(keyword: str, graph=None, authors=None) -> Set[str]:
+def get_authors_by_keyword(
+    keyword: str,
+    graph=None,
+    authors=None,
+    index: Optional[ProvenanceIndex] = None,
+) -> Set[str]:
     """Get authors for whom the search term is a substring.
 
     :param pybel.BELGraph graph: A BEL graph
     :param keyword: The keyword to search the author strings for
     :param set[str] authors: An optional set of pre-cached authors calculated from the graph
+    :param index: An optional provenance index of the graph, whose search index is used instead of a scan
     :return: A set of authors with the keyword as a substring
     """
+    if index is not None:
+        return index.author_keywords.search_substring(keyword)
+
     keyword_lower = keyword.lower()
 
     if authors is not None:
@@ -185,13 +410,24 @@ def get_authors_by_keyword(keyword: str, graph=None, authors=None) -> Set[str]:
     }
 
 
-def count_authors_by_annotation(graph: BELGraph, annotation: str = 'Subgraph') -> Mapping[str, typing.Counter[str]]:
+def count_authors_by_annotation(
+    graph: BELGraph,
+    annotation: str = 'Subgraph',
+    index: Optional[ProvenanceIndex] = None,
+) -> Mapping[str, typing.Counter[str]]:
     """Group the author counters by sub-graphs induced by the annotation.
 
     :param graph: A BEL graph
     :param annotation: The annotation to use to group the graph
+    :param index: An optional provenance index of the graph
     :return: A dictionary of Counters {subgraph name: Counter from {author: frequency}}
     """
+    if index is not None:
+        return {
+            value: Counter(counter)
+            for value, counter in index.annotation_author_counts.get(annotation, {}).items()
+        }
+
     authors = group_as_lists(_iter_authors_by_annotation(graph, annotation=annotation))
     return count_defaultdict(authors)
 
@@ -200,26 +436,48 @@ def _iter_authors_by_annotation(graph: BELGraph, annotation: str = 'Subgraph') -
     for _, _, data in graph.edges(data=True):
         if not edge_has_annotation(data, annotation) or CITATION not in data or CITATION_AUTHORS not in data[CITATION]:
             continue
-        for author in data[CITATION][CITATION_AUTHORS]:
-            yield data[ANNOTATIONS][annotation], author
+        for value in data[ANNOTATIONS][annotation]:
+            for author in data[CITATION][CITATION_AUTHORS]:
+                yield value, author
 
 
-def get_evidences_by_pmid(graph: BELGraph, pmids: Strings) -> Mapping[str, Set[str]]:
+def get_evidences_by_pmid(
+    graph: BELGraph,
+    pmids: Strings,
+    index: Optional[ProvenanceIndex] = None,
+) -> Mapping[str, Set[str]]:
     """Map PubMed identifiers to their evidence strings appearing in the graph.
 
     :param graph: A BEL graph
     :param pmids: An iterable of PubMed identifiers, as strings. Is consumed and converted to a set.
+    :param index: An optional provenance index of the graph
     :return: A dictionary of {pmid: set of all evidence strings}
     """
+    if index is not None:
+        return group_as_sets(
+            (pmid, graph[u][v][k][EVIDENCE])
+            for pmid in ({pmids} if isinstance(pmids, str) else set(pmids))
+            for u, v, k in (
+                index.edges[edge_id]
+                for edge_id in index.citation_edges.get((CITATION_TYPE_PUBMED, pmid), [])
+            )
+        )
+
     return group_as_sets(
-        (data[CITATION][CITATION_IDENTIFIER], data[EVIDENCE])
-        for _, _, _, data in filter_edges(graph, build_pmid_inclusion_filter(pmids))
+        (graph[u][v][k][CITATION][CITATION_IDENTIFIER], graph[u][v][k][EVIDENCE])
+        for u, v, k in filter_edges(graph, build_pmid_inclusion_filter(pmids))
     )
 
 
-# TODO date parsing should be handled during either pybel parse-time or during graph loading.
-def count_citation_years(graph: BELGraph) -> typing.Counter[int]:
-    """Count the number of citations from each year."""
+def count_citation_years(graph: BELGraph, index: Optional[ProvenanceIndex] = None) -> typing.Counter[int]:
+    """Count the number of citations from each year.
+
+    :param graph: A BEL graph
+    :param index: An optional provenance index of the graph, in which the dates have already been parsed
+    """
+    if index is not None:
+        return count_dict_values(index.year_citations)
+
     result = defaultdict(set)
 
     for _, _, data in graph.edges(data=True):
@@ -249,9 +507,9 @@ def _ensure_datetime(s: Union[datetime, str]) -> datetime:
     raise TypeError
 
 
-def get_citation_years(graph: BELGraph) -> List[Tuple[int, int]]:
+def get_citation_years(graph: BELGraph, index: Optional[ProvenanceIndex] = None) -> List[Tuple[int, int]]:
     """Create a citation timeline counter from the graph."""
-    return create_timeline(count_citation_years(graph))
+    return create_timeline(count_citation_years(graph, index=index))
 
 
 def create_timeline(year_counter: typing.Counter[int]) -> List[Tuple[int, int]]:
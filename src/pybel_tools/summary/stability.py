@@ -4,9 +4,10 @@
 
 import itertools as itt
 import logging
-from typing import Iterable, Mapping, Set, Tuple
+from typing import Iterable, List, Mapping, Optional, Set, Tuple
 
 import networkx as nx
+import numpy as np
 
 from pybel import BELGraph
 from pybel.constants import (
@@ -15,7 +16,9 @@ from pybel.constants import (
 )
 from pybel.dsl import BaseEntity
 from pybel.struct import get_causal_subgraph
-from .contradictions import relation_set_has_contradictions
+from .pair_relations import build_pair_relation_index, mask_has_contradiction, mask_to_relations
+from ..cache import cached_on_graph
+from ..compiled import CompiledGraph
 from ..typing import NodeTriple, SetOfNodePairs, SetOfNodeTriples
 
 __all__ = [
@@ -47,17 +50,39 @@ def get_contradiction_summary(graph: BELGraph) -> Set[Tuple[BaseEntity, BaseEnti
 
 
 def _iterate_contradictions(graph) -> Iterable[Tuple[BaseEntity, BaseEntity, Tuple[str]]]:
-    for u, v in set(graph.edges()):
-        relations = tuple(sorted({data[RELATION] for data in graph[u][v].values()}))
-        if relation_set_has_contradictions(relations):
-            yield u, v, relations
+    for (u, v), mask in build_pair_relation_index(graph).items():
+        if mask_has_contradiction(mask):
+            yield u, v, tuple(sorted(mask_to_relations(mask)))
 
 
-def get_regulatory_pairs(graph: BELGraph) -> SetOfNodePairs:
+def _get_mutual_pairs(compiled: CompiledGraph, forward: int, backward: int) -> List[Tuple[BaseEntity, BaseEntity]]:
+    """Get pairs (u, v) with an edge of the forward polarity from u to v and the backward polarity from v to u."""
+    n = compiled.number_of_nodes()
+    sources = compiled.sources.astype(np.int64)
+    targets = compiled.targets.astype(np.int64)
+
+    forward_mask = compiled.polarity == forward
+    backward_mask = compiled.polarity == backward
+    forward_codes = np.unique(sources[forward_mask] * n + targets[forward_mask])
+    backward_codes = np.unique(sources[backward_mask] * n + targets[backward_mask])
+
+    reversed_codes = (forward_codes % n) * n + forward_codes // n
+    return [
+        (compiled.nodes[code // n], compiled.nodes[code % n])
+        for code in forward_codes[np.isin(reversed_codes, backward_codes)].tolist()
+    ]
+
+
+def get_regulatory_pairs(graph: BELGraph, compiled: Optional[CompiledGraph] = None) -> SetOfNodePairs:
     """Find pairs of nodes such that ``A -> B`` and ``B -| A``.
 
+    :param graph: A BEL graph
+    :param compiled: An optional compiled snapshot of the graph, from :func:`pybel_tools.compiled.compile_graph`
     :return: A set of pairs of nodes with mutual causal edges
     """
+    if compiled is not None:
+        return set(_get_mutual_pairs(compiled, 1, -1))
+
     cg = get_causal_subgraph(graph)
 
     results = set()
@@ -72,11 +97,16 @@ def get_regulatory_pairs(graph: BELGraph) -> SetOfNodePairs:
     return results
 
 
-def get_chaotic_pairs(graph: BELGraph) -> SetOfNodePairs:
+def get_chaotic_pairs(graph: BELGraph, compiled: Optional[CompiledGraph] = None) -> SetOfNodePairs:
     """Find pairs of nodes of nodes such that ``A -> B`` and ``B -> A``.
 
+    :param graph: A BEL graph
+    :param compiled: An optional compiled snapshot of the graph, from :func:`pybel_tools.compiled.compile_graph`
     :return: A set of pairs of nodes with mutual causal edges
     """
+    if compiled is not None:
+        return {tuple(sorted(pair, key=str)) for pair in _get_mutual_pairs(compiled, 1, 1)}
+
     cg = get_causal_subgraph(graph)
 
     results = set()
@@ -91,11 +121,16 @@ def get_chaotic_pairs(graph: BELGraph) -> SetOfNodePairs:
     return results
 
 
-def get_dampened_pairs(graph: BELGraph) -> SetOfNodePairs:
+def get_dampened_pairs(graph: BELGraph, compiled: Optional[CompiledGraph] = None) -> SetOfNodePairs:
     """Find pairs of nodes such that ``A -| B`` and ``B -| A``.
 
+    :param graph: A BEL graph
+    :param compiled: An optional compiled snapshot of the graph, from :func:`pybel_tools.compiled.compile_graph`
     :return: A set of pairs of nodes with mutual causal edges
     """
+    if compiled is not None:
+        return {tuple(sorted(pair, key=str)) for pair in _get_mutual_pairs(compiled, -1, -1)}
+
     cg = get_causal_subgraph(graph)
 
     results = set()
@@ -316,11 +351,16 @@ def _iterate_disregulated_triplets(graph: BELGraph, relation_set: Set[str]) -> I
         yield a, b, c
 
 
-def summarize_stability(graph: BELGraph) -> Mapping[str, int]:
-    """Summarize the stability of the graph."""
-    regulatory_pairs = get_regulatory_pairs(graph)
-    chaotic_pairs = get_chaotic_pairs(graph)
-    dampened_pairs = get_dampened_pairs(graph)
+@cached_on_graph(ignore=['compiled'])
+def summarize_stability(graph: BELGraph, compiled: Optional[CompiledGraph] = None) -> Mapping[str, int]:
+    """Summarize the stability of the graph.
+
+    :param graph: A BEL graph
+    :param compiled: An optional compiled snapshot of the graph, from :func:`pybel_tools.compiled.compile_graph`
+    """
+    regulatory_pairs = get_regulatory_pairs(graph, compiled=compiled)
+    chaotic_pairs = get_chaotic_pairs(graph, compiled=compiled)
+    dampened_pairs = get_dampened_pairs(graph, compiled=compiled)
     contradictory_pairs = get_contradiction_summary(graph)
     separately_unstable_triples = get_separate_unstable_correlation_triples(graph)
     mutually_unstable_triples = get_mutually_unstable_correlation_triples(graph)
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+
+"""An incrementally updated view of the stability motifs counted by :func:`summarize_stability`.
+
+Rather than rescanning the whole graph after a small batch of curation edits, a :class:`StabilityMonitor` consumes
+explicit lists of added and removed edges and only re-examines the node pairs that changed along with the triangles
+that can be closed through them.
+
+>>> from pybel_tools.summary import StabilityMonitor
+>>> monitor = StabilityMonitor.from_graph(graph)
+>>> monitor.update(added=[(a, b, INCREASES)], removed=[(b, c, DECREASES)])
+>>> monitor.count('Chaotic Pairs')
+"""
+
+import itertools as itt
+import typing
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, Mapping, Set, Tuple
+
+from pybel import BELGraph
+from pybel.constants import (
+    CAUSAL_DECREASE_RELATIONS, CAUSAL_INCREASE_RELATIONS, NEGATIVE_CORRELATION, POSITIVE_CORRELATION, RELATION,
+)
+from pybel.dsl import BaseEntity
+from .contradictions import relation_set_has_contradictions
+from ..typing import NodePair
+
+__all__ = [
+    'STABILITY_LABELS',
+    'StabilityMonitor',
+]
+
+#: The labels of the motifs reported by :func:`pybel_tools.summary.summarize_stability`, in order
+STABILITY_LABELS = (
+    'Regulatory Pairs',
+    'Chaotic Pairs',
+    'Dampened Pairs',
+    'Contradictory Pairs',
+    'Separately Unstable Triples',
+    'Mutually Unstable Triples',
+    'Jens Unstable Triples',
+    'Increase Mismatch Triples',
+    'Decrease Mismatch Triples',
+    'Chaotic Triples',
+    'Dampened Triples',
+)
+
+#: An edit is a (source, target, relation) triple
+Edit = Tuple[BaseEntity, BaseEntity, str]
+
+Motifs = Dict[str, Set[Tuple[Any, ...]]]
+
+
+def _sort_by_str(*nodes: BaseEntity) -> Tuple[BaseEntity, ...]:
+    return tuple(sorted(nodes, key=str))
+
+
+class StabilityMonitor:
+    """Keep the stability motifs of a graph up to date as edges are added and removed.
+
+    The monitor keeps its own multiset of relations for each ordered pair of nodes, so it does not need to look at the
+    graph after it has been constructed. Each motif set only ever changes for the pairs whose relations were edited and
+    for the triangles passing through them, which keeps the cost of an update proportional to the size of their
+    neighbourhoods. The counts are available in constant time with :meth:`count` and :meth:`summarize`.
+
+    .. note:: Increase and decrease mismatch triples are reported when the negative correlation between the two targets
+              is present in either direction, whereas :func:`get_increase_mismatch_triplets` depends on the iteration
+              order of the targets. They agree on graphs where correlations have been made two-way, e.g., with
+              :func:`pybel_tools.mutation.infer_missing_two_way_edges`.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty monitor."""
+        self._relations: Dict[NodePair, typing.Counter[str]] = {}
+        self._neighbors: Dict[BaseEntity, Set[BaseEntity]] = defaultdict(set)
+        self._motifs: Motifs = {label: set() for label in STABILITY_LABELS}
+
+    @classmethod
+    def from_graph(cls, graph: BELGraph) -> 'StabilityMonitor':
+        """Build a monitor from all of the edges in the given graph."""
+        monitor = cls()
+        monitor.update(added=(
+            (u, v, data[RELATION])
+            for u, v, data in graph.edges(data=True)
+        ))
+        return monitor
+
+    def add_edge(self, u: BaseEntity, v: BaseEntity, relation: str) -> None:
+        """Register the addition of an edge with the given relation."""
+        self.update(added=[(u, v, relation)])
+
+    def remove_edge(self, u: BaseEntity, v: BaseEntity, relation: str) -> None:
+        """Register the removal of an edge with the given relation."""
+        self.update(removed=[(u, v, relation)])
+
+    def update(self, added: Iterable[Edit] = (), removed: Iterable[Edit] = ()) -> None:
+        """Apply a batch of edits and refresh the motifs around the pairs that changed.
+
+        :param added: An iterable of (source, target, relation) triples for edges that were added
+        :param removed: An iterable of (source, target, relation) triples for edges that were removed
+        :raises ValueError: If an edge is removed that was never added
+        """
+        added = list(added)
+        removed = list(removed)
+
+        pairs = {
+            _sort_by_str(u, v)
+            for u, v, _ in itt.chain(added, removed)
+        }
+        triples = self._get_closing_triples(pairs)
+
+        self._discard(pairs, triples)
+
+        for u, v, relation in removed:
+            self._remove_relation(u, v, relation)
+        for u, v, relation in added:
+            self._add_relation(u, v, relation)
+
+        triples.update(self._get_closing_triples(pairs))
+        self._collect(pairs, triples)
+
+    def count(self, label: str) -> int:
+        """Count the motifs with the given label."""
+        return len(self._motifs[label])
+
+    def get(self, label: str) -> Set[Tuple[Any, ...]]:
+        """Get a copy of the motifs with the given label."""
+        return set(self._motifs[label])
+
+    def summarize(self) -> Mapping[str, int]:
+        """Summarize the stability of the graph in the same format as :func:`summarize_stability`."""
+        return {
+            label: len(motifs)
+            for label, motifs in self._motifs.items()
+        }
+
+    def _add_relation(self, u: BaseEntity, v: BaseEntity, relation: str) -> None:
+        relations = self._relations.get((u, v))
+        if relations is None:
+            relations = self._relations[u, v] = Counter()
+            self._neighbors[u].add(v)
+            self._neighbors[v].add(u)
+        relations[relation] += 1
+
+    def _remove_relation(self, u: BaseEntity, v: BaseEntity, relation: str) -> None:
+        relations = self._relations.get((u, v))
+        if not relations or not relations[relation]:
+            raise ValueError(f'no {relation} edge from {u} to {v}')
+
+        relations[relation] -= 1
+        if relations[relation]:
+            return
+
+        del relations[relation]
+        if relations:
+            return
+
+        del self._relations[u, v]
+        if (v, u) not in self._relations:
+            self._neighbors[u].discard(v)
+            self._neighbors[v].discard(u)
+
+    def _get_closing_triples(self, pairs: Iterable[NodePair]) -> Set[Tuple[BaseEntity, BaseEntity, BaseEntity]]:
+        """Get the triples of nodes that could form a triangle with any of the given pairs."""
+        return {
+            _sort_by_str(u, v, w)
+            for u, v in pairs
+            if u != v
+            for w in self._neighbors.get(u, set()) & self._neighbors.get(v, set())
+            if w != u and w != v
+        }
+
+    def _discard(self, pairs, triples) -> None:
+        for label, motifs in self._evaluate(pairs, triples).items():
+            self._motifs[label].difference_update(motifs)
+
+    def _collect(self, pairs, triples) -> None:
+        for label, motifs in self._evaluate(pairs, triples).items():
+            self._motifs[label].update(motifs)
+
+    def _evaluate(self, pairs, triples) -> Motifs:
+        rv = defaultdict(set)
+        for u, v in pairs:
+            self._evaluate_pair(rv, u, v)
+        for a, b, c in triples:
+            self._evaluate_triple(rv, a, b, c)
+        return rv
+
+    def _has(self, u: BaseEntity, v: BaseEntity, relations: Set[str]) -> bool:
+        return any(relation in relations for relation in self._relations.get((u, v), ()))
+
+    def _increases(self, u: BaseEntity, v: BaseEntity) -> bool:
+        return self._has(u, v, CAUSAL_INCREASE_RELATIONS)
+
+    def _decreases(self, u: BaseEntity, v: BaseEntity) -> bool:
+        return self._has(u, v, CAUSAL_DECREASE_RELATIONS)
+
+    def _correlates(self, u: BaseEntity, v: BaseEntity, relation: str) -> bool:
+        """Check for a correlation between two nodes, regardless of its direction."""
+        return relation in self._relations.get((u, v), ()) or relation in self._relations.get((v, u), ())
+
+    def _jens_arc(self, u: BaseEntity, v: BaseEntity) -> bool:
+        """Check for an arc in :func:`pybel_tools.summary.jens_transformation_alpha`."""
+        return (
+            self._correlates(u, v, POSITIVE_CORRELATION)
+            or self._increases(u, v)
+            or self._decreases(v, u)
+        )
+
+    def _evaluate_pair(self, rv: Motifs, u: BaseEntity, v: BaseEntity) -> None:
+        for source, target in {(u, v), (v, u)}:
+            relations = self._relations.get((source, target))
+            if not relations:
+                continue
+
+            relations = tuple(sorted(relations))
+            if relation_set_has_contradictions(relations):
+                rv['Contradictory Pairs'].add((source, target, relations))
+
+            if self._increases(source, target) and self._decreases(target, source):
+                rv['Regulatory Pairs'].add((source, target))
+
+        if self._increases(u, v) and self._increases(v, u):
+            rv['Chaotic Pairs'].add(_sort_by_str(u, v))
+
+        if self._decreases(u, v) and self._decreases(v, u):
+            rv['Dampened Pairs'].add(_sort_by_str(u, v))
+
+    def _evaluate_triple(self, rv: Motifs, a: BaseEntity, b: BaseEntity, c: BaseEntity) -> None:
+        """Evaluate the triangle motifs of three nodes, already sorted by their string representations."""
+        ab_pos, bc_pos, ac_pos = (
+            self._correlates(x, y, POSITIVE_CORRELATION)
+            for x, y in ((a, b), (b, c), (a, c))
+        )
+        ab_neg, bc_neg, ac_neg = (
+            self._correlates(x, y, NEGATIVE_CORRELATION)
+            for x, y in ((a, b), (b, c), (a, c))
+        )
+
+        if (ab_pos or ab_neg) and (bc_pos or bc_neg) and (ac_pos or ac_neg):
+            if ab_pos and bc_pos and ac_neg:
+                rv['Separately Unstable Triples'].add((b, a, c))
+            if ab_pos and bc_neg and ac_pos:
+                rv['Separately Unstable Triples'].add((a, b, c))
+            if ab_neg and bc_pos and ac_pos:
+                rv['Separately Unstable Triples'].add((c, a, b))
+            if ab_neg and bc_neg and ac_neg:
+                rv['Mutually Unstable Triples'].add((a, b, c))
+
+        for label, arc in (
+            ('Jens Unstable Triples', self._jens_arc),
+            ('Chaotic Triples', self._increases),
+            ('Dampened Triples', self._decreases),
+        ):
+            if (arc(a, b) and arc(b, c) and arc(c, a)) or (arc(a, c) and arc(c, b) and arc(b, a)):
+                rv[label].add((a, b, c))
+
+        for node, x, y in ((a, b, c), (b, a, c), (c, a, b)):
+            if not self._correlates(x, y, NEGATIVE_CORRELATION):
+                continue
+            if self._increases(node, x) and self._increases(node, y):
+                rv['Increase Mismatch Triples'].add((node, x, y))
+            if self._decreases(node, x) and self._decreases(node, y):
+                rv['Decrease Mismatch Triples'].add((node, x, y))
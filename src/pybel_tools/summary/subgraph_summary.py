@@ -2,20 +2,24 @@
 
 """This module contains functions that handle and summarize sub-graphs of graphs."""
 
-import itertools as itt
-from collections import defaultdict
-from typing import Counter, Dict, Iterable, List, Mapping, Optional, Set, Tuple, Union
+from typing import Counter, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+from scipy import sparse
 
 from pybel import BELGraph
 from pybel.constants import ANNOTATIONS
 from pybel.struct.filters.edge_predicates import edge_has_annotation
 from pybel.struct.filters.typing import NodePredicate, NodePredicates
+from ..cache import cached_on_graph
 from ..selection.group_nodes import group_nodes_by_annotation, group_nodes_by_annotation_filtered
-from ..typing import EdgeSet
+from ..typing import EdgeSet, NodePair
 from ..utils import calculate_tanimoto_set_distances, count_dict_values
 
 __all__ = [
     'count_subgraph_sizes',
+    'SubgraphEdgeOverlap',
+    'get_subgraph_edge_overlap',
     'calculate_subgraph_edge_overlap',
     'summarize_subgraph_edge_overlap',
     'rank_subgraph_by_node_filter',
@@ -33,6 +37,142 @@ def count_subgraph_sizes(graph: BELGraph, annotation: str = 'Subgraph') -> Count
     return count_dict_values(group_nodes_by_annotation(graph, annotation))
 
 
+class SubgraphEdgeOverlap:
+    """The overlap between the edges of the sub-graphs induced by an annotation.
+
+    The edges are put in a sparse sub-graph by edge incidence matrix, so the numbers of edges shared by each pair of
+    sub-graphs come from one sparse matrix product and the sizes of their unions from its row sums. The sets of
+    edges themselves are only built when they're asked for.
+    """
+
+    def __init__(self, subgraphs: List[str], edges: List[NodePair], incidence: sparse.csr_matrix) -> None:
+        """Build an overlap from an incidence matrix.
+
+        :param subgraphs: The annotation values, in the order of the rows
+        :param edges: The (source, target) pairs, in the order of the columns
+        :param incidence: A sparse matrix with a one where a sub-graph contains an edge
+        """
+        self.subgraphs = subgraphs
+        self.edges = edges
+        self.incidence = incidence
+        self.subgraph_to_index = {subgraph: i for i, subgraph in enumerate(subgraphs)}
+
+        #: The number of edges in each sub-graph
+        self.sizes: np.ndarray = np.asarray(incidence.sum(axis=1)).ravel()
+        #: A sparse matrix of the number of edges shared by each pair of sub-graphs
+        self.intersection_sizes: sparse.csr_matrix = (incidence @ incidence.T).tocsr()
+
+    @classmethod
+    def from_graph(cls, graph: BELGraph, annotation: str = 'Subgraph') -> 'SubgraphEdgeOverlap':
+        """Build the incidence matrix of the sub-graphs induced by the annotation in one pass over the edges.
+
+        Multiple edges between the same nodes count once, and an edge with several values for the annotation is in
+        each of their sub-graphs.
+        """
+        subgraph_to_index: Dict[str, int] = {}
+        edges: List[NodePair] = []
+        rows, columns = [], []
+        last_u = last_v = None
+
+        for u, v, data in graph.edges(data=True):
+            if not edge_has_annotation(data, annotation):
+                continue
+            # edges between the same nodes come one after another, so they can be grouped without hashing the nodes
+            if u is not last_u or v is not last_v:
+                last_u, last_v = u, v
+                edges.append((u, v))
+            for value in data[ANNOTATIONS][annotation]:
+                index = subgraph_to_index.setdefault(value, len(subgraph_to_index))
+                rows.append(index)
+                columns.append(len(edges) - 1)
+
+        incidence = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, columns)),
+            shape=(len(subgraph_to_index), len(edges)),
+        )
+        incidence.data[:] = 1  # an edge is counted once even if parallel edges are in the same sub-graph
+        return cls(list(subgraph_to_index), edges, incidence)
+
+    def _get_columns(self, subgraph: str) -> np.ndarray:
+        i = self.subgraph_to_index[subgraph]
+        return self.incidence.indices[self.incidence.indptr[i]:self.incidence.indptr[i + 1]]
+
+    def _get_edge_set(self, columns: np.ndarray) -> EdgeSet:
+        return {self.edges[column] for column in columns}
+
+    def get_intersection_size(self, subgraph_1: str, subgraph_2: str) -> int:
+        """Get the number of edges the two sub-graphs share."""
+        return int(self.intersection_sizes[self.subgraph_to_index[subgraph_1], self.subgraph_to_index[subgraph_2]])
+
+    def get_union_size(self, subgraph_1: str, subgraph_2: str) -> int:
+        """Get the number of edges in either of the two sub-graphs."""
+        i, j = self.subgraph_to_index[subgraph_1], self.subgraph_to_index[subgraph_2]
+        return int(self.sizes[i] + self.sizes[j] - self.intersection_sizes[i, j])
+
+    def get_edges(self, subgraph: str) -> EdgeSet:
+        """Get the set of edges in the sub-graph."""
+        return self._get_edge_set(self._get_columns(subgraph))
+
+    def get_intersection(self, subgraph_1: str, subgraph_2: str) -> EdgeSet:
+        """Get the set of edges the two sub-graphs share."""
+        return self._get_edge_set(np.intersect1d(self._get_columns(subgraph_1), self._get_columns(subgraph_2)))
+
+    def get_union(self, subgraph_1: str, subgraph_2: str) -> EdgeSet:
+        """Get the set of edges in either of the two sub-graphs."""
+        return self._get_edge_set(np.union1d(self._get_columns(subgraph_1), self._get_columns(subgraph_2)))
+
+    def get_similarity_matrix(self) -> sparse.csr_matrix:
+        """Get a sparse matrix of the tanimoto similarities of the pairs of sub-graphs that share edges."""
+        similarities = self.intersection_sizes.tocoo()
+        union_sizes = self.sizes[similarities.row] + self.sizes[similarities.col] - similarities.data
+        return sparse.csr_matrix(
+            (similarities.data / union_sizes, (similarities.row, similarities.col)),
+            shape=similarities.shape,
+        )
+
+    def get_similarities(self) -> Mapping[str, Mapping[str, float]]:
+        """Get the tanimoto similarities of all pairs of sub-graphs as a dict of dicts."""
+        similarities = self.get_similarity_matrix().toarray()
+        return {
+            subgraph_1: dict(zip(self.subgraphs, row.tolist()))
+            for subgraph_1, row in zip(self.subgraphs, similarities)
+        }
+
+
+class _LazyPairEdgeSets(Mapping[str, EdgeSet]):
+    """A mapping from sub-graphs to the edge sets they make with one sub-graph, built when they're first looked up."""
+
+    def __init__(self, overlap: SubgraphEdgeOverlap, subgraph: str, get_edge_set) -> None:
+        self.overlap = overlap
+        self.subgraph = subgraph
+        self.get_edge_set = get_edge_set
+        self._edge_sets: Dict[str, EdgeSet] = {}
+
+    def __getitem__(self, other: str) -> EdgeSet:
+        rv = self._edge_sets.get(other)
+        if rv is None:
+            if other not in self.overlap.subgraph_to_index:
+                raise KeyError(other)
+            rv = self._edge_sets[other] = self.get_edge_set(self.subgraph, other)
+        return rv
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.overlap.subgraphs)
+
+    def __len__(self) -> int:
+        return len(self.overlap.subgraphs)
+
+
+@cached_on_graph()
+def get_subgraph_edge_overlap(graph: BELGraph, annotation: str = 'Subgraph') -> SubgraphEdgeOverlap:
+    """Calculate the overlap between the edges of the sub-graphs induced by the annotation with sparse matrices.
+
+    :param graph: A BEL graph
+    :param annotation: The annotation to group by and compare. Defaults to 'Subgraph'
+    """
+    return SubgraphEdgeOverlap.from_graph(graph, annotation)
+
+
 def calculate_subgraph_edge_overlap(
     graph: BELGraph,
     annotation: str = 'Subgraph',
@@ -48,27 +188,28 @@ def calculate_subgraph_edge_overlap(
     1. Total number of edges overlap (intersection)
     2. Percentage overlap (tanimoto similarity)
 
+    The intersections and unions of each pair of sub-graphs are only built when they're looked up. Use
+    :func:`get_subgraph_edge_overlap` to get the sizes without building any sets.
+
     :param graph: A BEL graph
     :param annotation: The annotation to group by and compare. Defaults to 'Subgraph'
     :return: {subgraph: set of edges}, {(subgraph 1, subgraph2): set of intersecting edges},
             {(subgraph 1, subgraph2): set of unioned edges}, {(subgraph 1, subgraph2): tanimoto similarity},
     """
-    sg2edge = defaultdict(set)
-
-    for u, v, d in graph.edges(data=True):
-        if edge_has_annotation(d, annotation):
-            sg2edge[d[ANNOTATIONS][annotation]].add((u, v))
-
-    subgraph_intersection: Dict[str, Dict[str, Set[EdgeSet]]] = defaultdict(dict)
-    subgraph_union: Dict[str, Dict[str, Set[EdgeSet]]] = defaultdict(dict)
-    result: Dict[str, Dict[str, float]] = defaultdict(dict)
-
-    for sg1, sg2 in itt.product(sg2edge, repeat=2):
-        subgraph_intersection[sg1][sg2] = sg2edge[sg1] & sg2edge[sg2]
-        subgraph_union[sg1][sg2] = sg2edge[sg1] | sg2edge[sg2]
-        result[sg1][sg2] = len(subgraph_intersection[sg1][sg2]) / len(subgraph_union[sg1][sg2])
-
-    return sg2edge, subgraph_intersection, subgraph_union, result
+    overlap = get_subgraph_edge_overlap(graph, annotation)
+    sg2edge = {
+        subgraph: overlap.get_edges(subgraph)
+        for subgraph in overlap.subgraphs
+    }
+    subgraph_intersection = {
+        subgraph: _LazyPairEdgeSets(overlap, subgraph, overlap.get_intersection)
+        for subgraph in overlap.subgraphs
+    }
+    subgraph_union = {
+        subgraph: _LazyPairEdgeSets(overlap, subgraph, overlap.get_union)
+        for subgraph in overlap.subgraphs
+    }
+    return sg2edge, subgraph_intersection, subgraph_union, overlap.get_similarities()
 
 
 def summarize_subgraph_edge_overlap(
@@ -81,8 +222,7 @@ def summarize_subgraph_edge_overlap(
     :param annotation: The annotation to group by and compare. Defaults to :code:`"Subgraph"`
     :return: A similarity matrix in a dict of dicts
     """
-    _, _, _, subgraph_overlap = calculate_subgraph_edge_overlap(graph, annotation)
-    return subgraph_overlap
+    return get_subgraph_edge_overlap(graph, annotation).get_similarities()
 
 
 def summarize_subgraph_node_overlap(
@@ -3,6 +3,7 @@
 """This module contains functions useful throughout PyBEL Tools."""
 
 import datetime
+import hashlib
 import itertools as itt
 import json
 import logging
@@ -12,8 +13,11 @@ from operator import itemgetter
 from typing import Callable, Dict, Iterable, List, Mapping, Optional, Set, Sized, Tuple, TypeVar, Union
 
 import networkx as nx
+import numpy as np
+from scipy import sparse
 
 from pybel import BELGraph
+from pybel.dsl import BaseEntity
 
 logger = logging.getLogger(__name__)
 
@@ -130,6 +134,124 @@ def calculate_single_tanimoto_set_distances(
     }
 
 
+def get_incidence_matrix(dict_of_sets: Mapping[X, Iterable[Y]]) -> Tuple[List[X], List[Y], sparse.csr_matrix]:
+    """Encode the sets as a sparse matrix with a row for each key and a column for each element.
+
+    The matrix has a one where a set contains an element.
+
+    :param dict_of_sets: A dict of {x: set of y}
+    :return: The keys in the order of the rows, the elements in the order of the columns, and the matrix
+    """
+    labels = list(dict_of_sets)
+    element_to_index: Dict[Y, int] = {}
+    rows, columns = [], []
+    for row, elements in enumerate(dict_of_sets.values()):
+        for element in elements:
+            rows.append(row)
+            columns.append(element_to_index.setdefault(element, len(element_to_index)))
+
+    incidence = sparse.csr_matrix(
+        (np.ones(len(rows), dtype=np.int32), (rows, columns)),
+        shape=(len(labels), len(element_to_index)),
+    )
+    incidence.data[:] = 1  # in case an element was given twice
+    return labels, list(element_to_index), incidence
+
+
+def _get_row_sizes(incidence: sparse.spmatrix) -> np.ndarray:
+    return np.asarray(incidence.sum(axis=1)).ravel()
+
+
+def calculate_incidence_tanimoto_similarities(
+    incidence: sparse.csr_matrix,
+    other: Optional[sparse.csr_matrix] = None,
+) -> sparse.coo_matrix:
+    """Calculate the tanimoto similarities between the rows of incidence matrices from one sparse matrix product.
+
+    :param incidence: A sparse matrix with a row for each set and a column for each element
+    :param other: Another incidence matrix with the same columns. Defaults to the first one.
+    :return: A sparse matrix with a row for each set in the first matrix and a column for each set in the other.
+     Only the pairs of sets that share elements are stored.
+    """
+    if other is None:
+        other = incidence
+    sizes, other_sizes = _get_row_sizes(incidence), _get_row_sizes(other)
+    intersections = (incidence @ other.T).tocoo()
+    unions = sizes[intersections.row] + other_sizes[intersections.col] - intersections.data
+    return sparse.coo_matrix(
+        (intersections.data / unions, (intersections.row, intersections.col)),
+        shape=intersections.shape,
+    )
+
+
+def calculate_tanimoto_similarity_matrix(
+    dict_of_sets: Mapping[X, Iterable],
+    dense: bool = True,
+) -> Tuple[Union[np.ndarray, sparse.csr_matrix], List[X]]:
+    """Calculate the pairwise tanimoto similarities of the sets from a sparse matrix product.
+
+    Each set has a similarity of 1.0 with itself, even if it's empty.
+
+    :param dict_of_sets: A dict of {x: set of y}
+    :param dense: Should a dense array be returned? If false, returns a sparse matrix that leaves out the pairs of sets
+     that don't overlap, which is much smaller when there are thousands of sets.
+    :return: A square similarity matrix and the keys in the order of its rows and columns
+
+    >>> matrix, labels = calculate_tanimoto_similarity_matrix({'a': {1, 2}, 'b': {2, 3}})
+    >>> similarity_matrix_to_dict(matrix, labels)
+    {'a': {'a': 1.0, 'b': 0.3333333333333333}, 'b': {'a': 0.3333333333333333, 'b': 1.0}}
+    """
+    labels, _, incidence = get_incidence_matrix(dict_of_sets)
+    similarities = calculate_incidence_tanimoto_similarities(incidence)
+
+    diagonal = np.arange(len(labels))
+    if dense:
+        rv = similarities.toarray()
+        rv[diagonal, diagonal] = 1.0
+        return rv, labels
+
+    off_diagonal = similarities.row != similarities.col
+    rv = sparse.csr_matrix(
+        (
+            np.concatenate([similarities.data[off_diagonal], np.ones(len(labels))]),
+            (
+                np.concatenate([similarities.row[off_diagonal], diagonal]),
+                np.concatenate([similarities.col[off_diagonal], diagonal]),
+            ),
+        ),
+        shape=(len(labels), len(labels)),
+    )
+    return rv, labels
+
+
+def calculate_global_tanimoto_similarity_matrix(dict_of_sets: Mapping[X, Iterable]) -> Tuple[np.ndarray, List[X]]:
+    r"""Calculate the matrix of the alternative distance from :func:`calculate_global_tanimoto_set_distances`.
+
+    :param dict_of_sets: A dict of {x: set of y}
+    :return: A square similarity matrix and the keys in the order of its rows and columns
+    """
+    labels, universe, incidence = get_incidence_matrix(dict_of_sets)
+    if not universe:
+        return np.ones((len(labels), len(labels))), labels
+
+    sizes = _get_row_sizes(incidence)
+    unions = sizes[:, np.newaxis] + sizes[np.newaxis, :] - (incidence @ incidence.T).toarray()
+    return 1.0 - unions / len(universe), labels
+
+
+def similarity_matrix_to_dict(
+    matrix: Union[np.ndarray, sparse.spmatrix],
+    labels: List[X],
+) -> Mapping[X, Mapping[X, float]]:
+    """Convert a dense or sparse square similarity matrix to a dict of dicts keyed by the labels of its rows."""
+    if sparse.issparse(matrix):
+        matrix = matrix.toarray()
+    return {
+        x: dict(zip(labels, row.tolist()))
+        for x, row in zip(labels, matrix)
+    }
+
+
 def calculate_tanimoto_set_distances(
     dict_of_sets: Mapping[X, Set],
 ) -> Mapping[X, Mapping[X, float]]:
@@ -140,15 +262,7 @@ def calculate_tanimoto_set_distances(
     :param dict_of_sets: A dict of {x: set of y}
     :return: A similarity matrix based on the set overlap (tanimoto) score between each x as a dict of dicts
     """
-    result: Dict[X, Dict[X, float]] = defaultdict(dict)
-
-    for x, y in itt.combinations(dict_of_sets, 2):
-        result[x][y] = result[y][x] = tanimoto_set_similarity(dict_of_sets[x], dict_of_sets[y])
-
-    for x in dict_of_sets:
-        result[x][x] = 1.0
-
-    return dict(result)
+    return similarity_matrix_to_dict(*calculate_tanimoto_similarity_matrix(dict_of_sets))
 
 
 def calculate_global_tanimoto_set_distances(dict_of_sets: Mapping[X, Set]) -> Mapping[X, Mapping[X, float]]:
@@ -159,18 +273,180 @@ def calculate_global_tanimoto_set_distances(dict_of_sets: Mapping[X, Set]) -> Ma
     :param dict_of_sets: A dict of {x: set of y}
     :return: A similarity matrix based on the alternative tanimoto distance as a dict of dicts
     """
-    universe = set(itt.chain.from_iterable(dict_of_sets.values()))
-    universe_size = len(universe)
+    return similarity_matrix_to_dict(*calculate_global_tanimoto_similarity_matrix(dict_of_sets))
+
 
-    result: Dict[X, Dict[X, float]] = defaultdict(dict)
+#: A prime larger than the number of distinct elements the MinHash functions can be used on
+_MINHASH_PRIME = (1 << 31) - 1
 
-    for x, y in itt.combinations(dict_of_sets, 2):
-        result[x][y] = result[y][x] = 1.0 - len(dict_of_sets[x] | dict_of_sets[y]) / universe_size
 
-    for x in dict_of_sets:
-        result[x][x] = 1.0 - len(x) / universe_size
+def get_stable_element_hashes(elements: Iterable) -> np.ndarray:
+    """Hash elements to integers below a large prime, the same way in every process.
+
+    Python's hashes of strings, and so of nodes, change between processes, so MinHash signatures built on them or on
+    the order of the elements in sets couldn't be compared or reproduced.
+    """
+    rv = []
+    for element in elements:
+        if isinstance(element, int):
+            rv.append(element % _MINHASH_PRIME)
+            continue
+        if isinstance(element, BaseEntity):
+            digest = element.md5
+        else:
+            digest = hashlib.md5(str(element).encode('utf-8')).hexdigest()  # noqa: S303
+        rv.append(int(digest[:16], 16) % _MINHASH_PRIME)
+    return np.array(rv, dtype=np.int64)
+
+
+def calculate_minhash_signatures(
+    incidence: sparse.csr_matrix,
+    num_perm: int = 128,
+    seed: Optional[int] = None,
+    element_hashes: Optional[np.ndarray] = None,
+    chunk_size: int = 16,
+) -> np.ndarray:
+    r"""Calculate a MinHash signature for each row of an incidence matrix, like from :func:`get_incidence_matrix`.
+
+    The fraction of positions in which the signatures of two sets agree is an unbiased estimate of their tanimoto
+    similarity, with a standard error of at most :math:`1 / (2 \sqrt{num\_perm})`.
+
+    :param incidence: A sparse matrix with a row for each set and a column for each element
+    :param num_perm: The number of hash functions. More give better estimates, but take longer.
+    :param seed: The seed for choosing the hash functions. Signatures can only be compared if they have the same seed.
+    :param element_hashes: An integer for each column, like from :func:`get_stable_element_hashes`, so signatures from
+     different incidence matrices can be compared. Defaults to the indexes of the columns.
+    :param chunk_size: The number of hash functions to apply at once, which limits the memory used
+    :return: An array with a row for each set and a column for each hash function. Rows of empty sets are filled with
+     a value no hash reaches.
+    """
+    if element_hashes is None:
+        if _MINHASH_PRIME <= incidence.shape[1]:
+            raise ValueError(f'can not hash more than {_MINHASH_PRIME} elements')
+        element_hashes = np.arange(incidence.shape[1], dtype=np.int64)
+
+    rng = np.random.RandomState(seed)
+    a = rng.randint(1, _MINHASH_PRIME, size=num_perm).astype(np.int64)
+    b = rng.randint(0, _MINHASH_PRIME, size=num_perm).astype(np.int64)
+
+    signatures = np.full((incidence.shape[0], num_perm), _MINHASH_PRIME, dtype=np.int64)
+    nonempty = np.diff(incidence.indptr) > 0
+    if not nonempty.any():
+        return signatures
+
+    starts = incidence.indptr[:-1][nonempty]
+    columns = element_hashes[incidence.indices]
+    for start in range(0, num_perm, chunk_size):
+        stop = min(start + chunk_size, num_perm)
+        hashes = (a[start:stop, np.newaxis] * columns[np.newaxis, :] + b[start:stop, np.newaxis]) % _MINHASH_PRIME
+        signatures[nonempty, start:stop] = np.minimum.reduceat(hashes, starts, axis=1).T
+    return signatures
+
+
+def get_lsh_bands(threshold: float, num_perm: int, false_negative_weight: float = 0.5) -> Tuple[int, int]:
+    """Choose how to split MinHash signatures into bands for locality sensitive hashing.
+
+    Two sets are candidates if their signatures agree in all rows of any band, which happens with probability
+    :math:`1 - (1 - s^{rows})^{bands}` for sets with a tanimoto similarity of :math:`s`. This picks the split that
+    minimizes the weighted area of false positives below the threshold and false negatives above it.
+
+    :param threshold: The tanimoto similarity above which pairs of sets should be found
+    :param num_perm: The number of hash functions in a signature
+    :param false_negative_weight: How much missing a similar pair counts compared to checking a dissimilar one
+    :return: The number of bands and the number of rows in each band
+    """
+    below = np.linspace(0.0, threshold, 101)
+    above = np.linspace(threshold, 1.0, 101)
+    best, best_error = (1, num_perm), float('inf')
+    for bands in range(1, num_perm + 1):
+        rows = num_perm // bands
+        false_positives = _trapezoid(1.0 - (1.0 - below ** rows) ** bands, below)
+        false_negatives = _trapezoid((1.0 - above ** rows) ** bands, above)
+        error = (1.0 - false_negative_weight) * false_positives + false_negative_weight * false_negatives
+        if error < best_error:
+            best, best_error = (bands, rows), error
+    return best
+
+
+def _trapezoid(y: np.ndarray, x: np.ndarray) -> float:
+    """Integrate with the trapezoidal rule, since :func:`numpy.trapz` was deprecated in NumPy 2.0 and later removed."""
+    return float(np.sum((y[1:] + y[:-1]) * np.diff(x)) / 2.0)
+
+
+def find_similar_set_pairs(
+    dict_of_sets: Mapping[X, Iterable],
+    other: Optional[Mapping[Y, Iterable]] = None,
+    threshold: float = 0.5,
+    num_perm: int = 128,
+    bands: Optional[int] = None,
+    seed: Optional[int] = None,
+) -> Mapping[Tuple[X, Union[X, Y]], float]:
+    """Find the pairs of sets whose tanimoto similarity is probably at least the threshold, with MinHash and LSH.
+
+    This avoids comparing all pairs of sets, so it scales to collections too big for
+    :func:`calculate_tanimoto_similarity_matrix`. Pairs are found by locality sensitive hashing on bands of the
+    MinHash signatures of the sets, then kept if the similarity estimated from their whole signatures is at least the
+    threshold. Both steps can miss pairs or let through pairs just below the threshold, less so with larger
+    ``num_perm``. Empty sets aren't similar to anything.
+
+    :param dict_of_sets: A dict of {x: set of elements}
+    :param other: A dict of {y: set of elements}. If given, only pairs with one set from each are compared.
+    :param threshold: The minimum tanimoto similarity
+    :param num_perm: The number of hash functions in a signature. More are more accurate, but slower.
+    :param bands: The number of bands for locality sensitive hashing. Defaults to the number from
+     :func:`get_lsh_bands`. More bands find more pairs, but check more dissimilar ones too.
+    :param seed: The seed for choosing the hash functions, so the results can be reproduced
+    :return: A dict from pairs of keys to their estimated tanimoto similarities. If ``other`` is given, the first key
+     is from ``dict_of_sets`` and the second from ``other``.
+    """
+    labels = list(dict_of_sets)
+    other_labels = [] if other is None else list(other)
+    sets = itt.chain(dict_of_sets.values(), () if other is None else other.values())
+    _, elements, incidence = get_incidence_matrix(dict(enumerate(sets)))
+    signatures = calculate_minhash_signatures(
+        incidence,
+        num_perm=num_perm,
+        seed=seed,
+        element_hashes=get_stable_element_hashes(elements),
+    )
+
+    if bands is None:
+        bands, rows = get_lsh_bands(threshold, num_perm)
+    else:
+        rows = num_perm // bands
+
+    nonempty = np.flatnonzero(np.diff(incidence.indptr) > 0)
+    candidates = set()
+    for band in range(bands):
+        buckets = defaultdict(list)
+        band_signatures = signatures[:, band * rows:(band + 1) * rows]
+        for i in nonempty:
+            buckets[band_signatures[i].tobytes()].append(i)
+        for bucket in buckets.values():
+            if 1 < len(bucket):
+                candidates.update(_iterate_bucket_pairs(bucket, len(labels), other is not None))
+
+    if not candidates:
+        return {}
+
+    left, right = np.array(sorted(candidates)).T
+    similarities = (signatures[left] == signatures[right]).mean(axis=1)
+    n = len(labels)
+    return {
+        (labels[i], labels[j] if other is None else other_labels[j - n]): similarity
+        for i, j, similarity in zip(left.tolist(), right.tolist(), similarities.tolist())
+        if threshold <= similarity
+    }
+
 
-    return dict(result)
+def _iterate_bucket_pairs(bucket: List[int], n: int, bipartite: bool) -> Iterable[Tuple[int, int]]:
+    """Iterate over the pairs of sets in a bucket, only with one set from each side if bipartite."""
+    if not bipartite:
+        return itt.combinations(bucket, 2)
+    return itt.product(
+        [i for i in bucket if i < n],
+        [j for j in bucket if n <= j],
+    )
 
 
 def barh(d, plt, title=None):
@@ -1,12 +1,15 @@
 import unittest
 
 from pybel import BELGraph
-from pybel.constants import DECREASES, INCREASES, NEGATIVE_CORRELATION, POSITIVE_CORRELATION, RELATION
+from pybel.constants import (
+    CAUSES_NO_CHANGE, DECREASES, DIRECTLY_INCREASES, INCREASES, NEGATIVE_CORRELATION, POSITIVE_CORRELATION, RELATION,
+)
 from pybel.dsl import Protein
 from pybel_tools.mutation.inference import infer_missing_two_way_edges
 from pybel_tools.summary import (
-    get_correlation_graph, get_correlation_triangles, get_mutually_unstable_correlation_triples,
-    get_separate_unstable_correlation_triples,
+    StabilityMonitor, build_pair_relation_index, get_correlation_graph, get_correlation_triangles,
+    get_mutually_unstable_correlation_triples, get_separate_unstable_correlation_triples, mask_has_contradiction,
+    mask_is_consistent, mask_to_relations, relation_set_has_contradictions, relations_to_mask, summarize_stability,
 )
 
 
@@ -96,3 +99,77 @@ class TestUnstableTriplets(unittest.TestCase):
         graph.add_edge(c, b, **{RELATION: NEGATIVE_CORRELATION})
         graph.add_edge(e, c, **{RELATION: POSITIVE_CORRELATION})
         graph.add_edge(e, b, **{RELATION: POSITIVE_CORRELATION})
+
+
+class TestStabilityMonitor(unittest.TestCase):
+    def setUp(self):
+        self.a, self.b, self.c, self.d = (Protein('HGNC', name) for name in 'ABCD')
+
+        self.graph = BELGraph()
+        self.graph.add_edge(self.a, self.b, **{RELATION: INCREASES})
+        self.graph.add_edge(self.b, self.a, **{RELATION: INCREASES})
+        self.graph.add_edge(self.b, self.c, **{RELATION: INCREASES})
+        self.graph.add_edge(self.c, self.a, **{RELATION: DIRECTLY_INCREASES})
+        self.graph.add_edge(self.a, self.c, **{RELATION: DECREASES})
+        self.graph.add_edge(self.b, self.d, **{RELATION: POSITIVE_CORRELATION})
+        self.graph.add_edge(self.c, self.d, **{RELATION: NEGATIVE_CORRELATION})
+        infer_missing_two_way_edges(self.graph)
+
+    def test_from_graph(self):
+        monitor = StabilityMonitor.from_graph(self.graph)
+        self.assertEqual(summarize_stability(self.graph), monitor.summarize())
+        self.assertEqual(1, monitor.count('Chaotic Triples'))
+
+    def test_update(self):
+        monitor = StabilityMonitor.from_graph(self.graph)
+
+        added = [
+            (self.b, self.c, POSITIVE_CORRELATION),
+            (self.c, self.b, POSITIVE_CORRELATION),
+            (self.c, self.b, DECREASES),
+        ]
+        for u, v, relation in added:
+            self.graph.add_edge(u, v, **{RELATION: relation})
+
+        removed = [(self.b, self.a, INCREASES)]
+        for u, v, key in list(self.graph.edges(keys=True)):
+            if (u, v) == (self.b, self.a):
+                self.graph.remove_edge(u, v, key)
+
+        monitor.update(added=added, removed=removed)
+        self.assertEqual(summarize_stability(self.graph), monitor.summarize())
+        self.assertEqual(0, monitor.count('Chaotic Pairs'))
+
+    def test_remove_missing(self):
+        monitor = StabilityMonitor.from_graph(self.graph)
+        with self.assertRaises(ValueError):
+            monitor.remove_edge(self.d, self.a, INCREASES)
+
+
+class TestPairRelationIndex(unittest.TestCase):
+    def test_masks(self):
+        for relations in [
+            {INCREASES},
+            {INCREASES, DIRECTLY_INCREASES},
+            {INCREASES, DECREASES},
+            {INCREASES, CAUSES_NO_CHANGE},
+            {POSITIVE_CORRELATION, NEGATIVE_CORRELATION},
+        ]:
+            mask = relations_to_mask(relations)
+            self.assertEqual(relations, mask_to_relations(mask))
+            self.assertEqual(relation_set_has_contradictions(relations), mask_has_contradiction(mask))
+            self.assertEqual(next(iter(relations)) if 1 == len(relations) else None, mask_is_consistent(mask))
+
+    def test_index(self):
+        a, b, c = (Protein('HGNC', name) for name in 'ABC')
+        graph = BELGraph()
+        graph.add_increases(a, b, citation='1', evidence='1')
+        graph.add_decreases(a, b, citation='2', evidence='2')
+        graph.add_increases(b, c, citation='3', evidence='3')
+        graph.add_increases(b, c, citation='4', evidence='4')
+
+        pair_index = build_pair_relation_index(graph)
+        self.assertEqual({(a, b), (b, c)}, set(pair_index))
+        self.assertTrue(mask_has_contradiction(pair_index[a, b]))
+        self.assertIsNone(mask_is_consistent(pair_index[a, b]))
+        self.assertEqual(INCREASES, mask_is_consistent(pair_index[b, c]))
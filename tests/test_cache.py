@@ -0,0 +1,175 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the content-hash keyed result cache."""
+
+import os
+import pickle
+import tempfile
+import unittest
+
+from pybel import BELGraph
+from pybel.dsl import Protein
+from pybel.examples import sialic_acid_graph
+from pybel.testing.utils import n
+from pybel_tools.cache import (
+    GraphFingerprint, MemoryCacheBackend, ResultCache, SQLiteCacheBackend, cached_on_graph, get_graph_digest,
+    get_graph_fingerprint, get_result_cache, track_graph_fingerprint, untrack_graph_fingerprint, use_result_cache,
+)
+from pybel_tools.summary import summarize_stability
+
+calls = []
+
+
+@cached_on_graph(ignore=['use_tqdm'])
+def count_function(graph: BELGraph, function: str = 'Protein', namespaces=None, use_tqdm: bool = False) -> int:
+    """Count the nodes with the given function."""
+    calls.append(function)
+    return sum(
+        node.function == function and (namespaces is None or node.namespace in namespaces)
+        for node in graph
+    )
+
+
+def make_graph(order) -> BELGraph:
+    """Make a graph, adding the edges in the given order."""
+    graph = BELGraph()
+    edges = [
+        (Protein('HGNC', 'A'), Protein('HGNC', 'B'), '1'),
+        (Protein('HGNC', 'B'), Protein('HGNC', 'C'), '2'),
+        (Protein('HGNC', 'C'), Protein('HGNC', 'A'), '3'),
+    ]
+    for i in order:
+        u, v, citation = edges[i]
+        graph.add_increases(u, v, citation=citation, evidence='e')
+    return graph
+
+
+class TestDigest(unittest.TestCase):
+    def test_digest(self):
+        """Test the digest depends on the contents of the graph, but not on their order."""
+        digest = get_graph_digest(make_graph([0, 1, 2]))
+        self.assertEqual(digest, get_graph_digest(make_graph([2, 0, 1])))
+        self.assertNotEqual(digest, get_graph_digest(make_graph([0, 1])))
+
+        graph = make_graph([0, 1, 2])
+        graph.nodes[Protein('HGNC', 'A')]['weight'] = 1.0
+        self.assertNotEqual(digest, get_graph_digest(graph))
+
+    def test_incremental(self):
+        """Test updating a tracked fingerprint as edges and nodes are added and removed."""
+        graph = make_graph([0, 1])
+        fingerprint = track_graph_fingerprint(graph)
+        self.assertIs(fingerprint, get_graph_fingerprint(graph))
+        self.assertEqual(get_graph_digest(make_graph([1, 0])), get_graph_digest(graph))
+
+        u, v = Protein('HGNC', 'C'), Protein('HGNC', 'A')
+        key = graph.add_increases(u, v, citation='3', evidence='e')
+        fingerprint.add_edge(u, v, graph[u][v][key])
+        self.assertIs(fingerprint, get_graph_fingerprint(graph))
+        self.assertEqual(GraphFingerprint.from_graph(make_graph([2, 1, 0])), fingerprint)
+
+        d = Protein('HGNC', 'D')
+        key = graph.add_increases(u, d, citation='4', evidence='e')
+        fingerprint.add_node(d)
+        fingerprint.add_edge(u, d, graph[u][d][key])
+        self.assertEqual(GraphFingerprint.from_graph(graph), fingerprint)
+
+        for edge_u, edge_v, edge_key, data in list(graph.in_edges(d, keys=True, data=True)):
+            graph.remove_edge(edge_u, edge_v, edge_key)
+            fingerprint.remove_edge(edge_u, edge_v, data)
+        fingerprint.remove_node(d, graph.nodes[d])
+        graph.remove_node(d)
+        self.assertEqual(get_graph_digest(make_graph([0, 1, 2])), get_graph_digest(graph))
+
+        graph.nodes[v]['weight'] = 1.0
+        fingerprint.update_node(v, {}, graph.nodes[v])
+        self.assertEqual(GraphFingerprint.from_graph(graph), fingerprint)
+
+        graph.add_increases(d, u, citation='5', evidence='e')  # not applied to the fingerprint
+        self.assertEqual(GraphFingerprint.from_graph(graph), get_graph_fingerprint(graph))
+
+        graph.nodes[u]['weight'] = 1.0  # not applied to the fingerprint, and keeps the size
+        self.assertNotEqual(GraphFingerprint.from_graph(graph), get_graph_fingerprint(graph))
+        self.assertEqual(GraphFingerprint.from_graph(graph), track_graph_fingerprint(graph, refresh=True))
+
+        untrack_graph_fingerprint(graph)
+        graph.nodes[v]['weight'] = 2.0
+        self.assertEqual(GraphFingerprint.from_graph(graph).hexdigest(), get_graph_digest(graph))
+
+    def test_duplicate_edges(self):
+        """Test two copies of the same edge don't cancel each other out."""
+        u, v = Protein('HGNC', 'A'), Protein('HGNC', 'B')
+        graph = BELGraph()
+        graph.add_edge(u, v, key=1, relation='association')
+        fingerprint = GraphFingerprint.from_graph(graph)
+        graph.add_edge(u, v, key=2, relation='association')
+        self.assertNotEqual(fingerprint, GraphFingerprint.from_graph(graph))
+        self.assertNotEqual(GraphFingerprint.from_graph(BELGraph()), GraphFingerprint.from_graph(graph))
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_decorator(self):
+        """Test decorated functions store and load results, keyed by the graph and the other arguments."""
+        self.assertIsNone(get_result_cache())
+        expected = summarize_stability(sialic_acid_graph)
+
+        for backend in (MemoryCacheBackend(), SQLiteCacheBackend(os.path.join(self.directory.name, 'cache.db'))):
+            with self.subTest(backend=backend.__class__.__name__), use_result_cache(ResultCache(backend)) as cache:
+                self.assertEqual(expected, summarize_stability(sialic_acid_graph))
+                self.assertEqual(expected, summarize_stability(sialic_acid_graph.copy()))
+                self.assertEqual(expected, summarize_stability(sialic_acid_graph, compiled=None))
+                self.assertEqual((2, 1), (cache.statistics.hits, cache.statistics.misses))
+
+                del calls[:]
+                self.assertEqual(7, count_function(sialic_acid_graph))
+                self.assertEqual(7, count_function(sialic_acid_graph, 'Protein', use_tqdm=True))
+                self.assertEqual(1, count_function(sialic_acid_graph, function='Complex'))
+                self.assertEqual(7, count_function(sialic_acid_graph, namespaces={'hgnc', 'chebi'}))
+                self.assertEqual(7, count_function(sialic_acid_graph, namespaces={'chebi', 'hgnc'}))
+                self.assertEqual(['Protein', 'Complex', 'Protein'], calls)
+                self.assertEqual((4, 4), (cache.statistics.hits, cache.statistics.misses))
+                self.assertEqual(4, len(backend))
+
+                count_function(sialic_acid_graph, namespaces={'hgnc': 1}.keys())
+                self.assertEqual(1, cache.statistics.skips)
+
+        self.assertIsNone(get_result_cache())
+
+    def test_eviction(self):
+        """Test the least recently used results are evicted."""
+        backends = [
+            MemoryCacheBackend(max_entries=2),
+            SQLiteCacheBackend(os.path.join(self.directory.name, 'cache.db'), max_entries=2),
+        ]
+        for backend in backends:
+            with self.subTest(backend=backend.__class__.__name__):
+                cache = ResultCache(backend)
+                for key in ('a', 'b', 'a', 'c', 'a', 'd'):
+                    cache.get_or_calculate(key, n)
+                self.assertEqual(2, len(backend))
+                self.assertIsNotNone(backend.get('a'))
+                self.assertIsNone(backend.get('b'))
+                self.assertEqual(2, cache.statistics.evictions)
+                self.assertEqual(2 / 6, cache.statistics.hit_rate)
+
+        backend = MemoryCacheBackend(max_bytes=2 * len(pickle.dumps(n())))
+        for key in 'abc':
+            backend.set(key, pickle.dumps(n()))
+        self.assertEqual(2, len(backend))
+
+    def test_shared(self):
+        """Test results in a SQLite database are shared with a new cache, like in another process."""
+        path = os.path.join(self.directory.name, 'cache.db')
+        with use_result_cache(ResultCache(SQLiteCacheBackend(path))):
+            expected = summarize_stability(sialic_acid_graph)
+
+        backend = pickle.loads(pickle.dumps(SQLiteCacheBackend(path)))
+        with use_result_cache(ResultCache(backend)) as cache:
+            self.assertEqual(expected, summarize_stability(sialic_acid_graph))
+            self.assertEqual(1, cache.statistics.hits)
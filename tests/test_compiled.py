@@ -0,0 +1,277 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for compiled graph snapshots."""
+
+import itertools as itt
+import os
+import pickle
+import random
+import tempfile
+import unittest
+
+import numpy as np
+from networkx import NetworkXNotImplemented
+
+from pybel import BELGraph
+from pybel.constants import (
+    ANNOTATIONS, CAUSES_NO_CHANGE, DECREASES, DIRECTLY_DECREASES, DIRECTLY_INCREASES, INCREASES, POSITIVE_CORRELATION,
+    REGULATES, RELATION,
+)
+from pybel.dsl import BiologicalProcess, Gene, Protein
+from pybel_tools.analysis.concordance import (
+    calculate_concordance, calculate_concordance_helper, calculate_concordance_probability_on_snapshot,
+)
+from pybel_tools.analysis.heat import calculate_average_scores_on_graph, calculate_average_scores_on_snapshot
+from pybel_tools.analysis.neurommsig.algorithm import (
+    get_neurommsig_scores, get_neurommsig_scores_on_snapshot, neurommsig_hubs, save_neurommsig_snapshot,
+)
+from pybel_tools.cache import track_graph_fingerprint
+from pybel_tools.compiled import (
+    CompiledGraph, compile_graph, get_worker_snapshot, load_snapshot, map_on_snapshot, save_snapshot,
+)
+from pybel_tools.summary import get_chaotic_pairs, get_dampened_pairs, get_regulatory_pairs
+
+RELATIONS = [INCREASES, DIRECTLY_INCREASES, DECREASES, DIRECTLY_DECREASES, CAUSES_NO_CHANGE, POSITIVE_CORRELATION]
+
+
+def make_heat_graph(seed: int, acyclic: bool) -> BELGraph:
+    """Make a random graph with biological processes and partially weighted nodes."""
+    rng = random.Random(seed)
+    nodes = [Protein('HGNC', str(i)) for i in range(14)] + [BiologicalProcess('GO', str(i)) for i in range(3)]
+    graph = BELGraph()
+    for _ in range(60):
+        i, j = rng.sample(range(len(nodes)), 2)
+        if acyclic and j < i:
+            i, j = j, i
+        relation = rng.choice([INCREASES, DIRECTLY_INCREASES, DECREASES, CAUSES_NO_CHANGE, REGULATES])
+        graph.add_edge(nodes[i], nodes[j], key=str(rng.random()), **{RELATION: relation})
+    for node in nodes[:10]:
+        if rng.random() < 0.7:
+            graph.nodes[node]['weight'] = rng.choice([-1.0, 0.5, 2.0])
+    return graph
+
+
+def make_neurommsig_graph(seed: int = 5) -> BELGraph:
+    """Make a random graph of genes and proteins stratified by the subgraph annotation."""
+    rng = random.Random(seed)
+    nodes = [Gene('HGNC', str(i)) for i in range(40)] + [Protein('HGNC', str(i)) for i in range(5)]
+    graph = BELGraph()
+    for _ in range(150):
+        u, v = rng.sample(nodes, 2)
+        graph.add_edge(u, v, key=str(rng.random()), **{
+            RELATION: rng.choice(RELATIONS),
+            ANNOTATIONS: {'Subgraph': {value: True for value in rng.sample(['S1', 'S2', 'S3'], rng.randint(0, 2))}},
+        })
+    return graph
+
+
+def make_graph(seed: int = 5) -> BELGraph:
+    """Make a random graph."""
+    random.seed(seed)
+    nodes = [Protein('HGNC', str(i)) for i in range(12)]
+    graph = BELGraph()
+    graph.add_node_from_data(Protein('HGNC', 'isolated'))
+    for _ in range(80):
+        u, v = random.sample(nodes, 2)
+        graph.add_edge(u, v, key=str(random.random()), **{RELATION: random.choice(RELATIONS)})
+    for node in nodes[1:]:
+        graph.nodes[node]['weight'] = random.choice([-1.0, 0.0, 0.3, 2.0])
+    return graph
+
+
+class TestCompiledGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = make_graph()
+        self.compiled = CompiledGraph.from_graph(self.graph)
+
+    def test_adjacency(self):
+        """Test the CSR adjacency matches the graph."""
+        compiled = self.compiled
+        self.assertEqual(self.graph.number_of_nodes(), compiled.number_of_nodes())
+        self.assertEqual(self.graph.number_of_edges(), compiled.number_of_edges())
+
+        for node in self.graph:
+            i = compiled.get_node_id(node)
+            self.assertEqual(
+                sorted(str(v) for _, v in self.graph.out_edges(node)),
+                sorted(str(compiled.nodes[j]) for j in compiled.successors(i)),
+            )
+            self.assertEqual(
+                sorted(str(u) for u, _ in self.graph.in_edges(node)),
+                sorted(str(compiled.nodes[j]) for j in compiled.predecessors(i)),
+            )
+            for edge_id in compiled.in_edge_ids(i):
+                self.assertEqual(i, compiled.targets[edge_id])
+
+        for edge_id in range(compiled.number_of_edges()):
+            u, v, key = compiled.get_edge(edge_id)
+            data = self.graph[u][v][key]
+            self.assertEqual(data[RELATION], compiled.relation_names[compiled.relations[edge_id]])
+            expected_polarity = {INCREASES: 1, DIRECTLY_INCREASES: 1, DECREASES: -1, DIRECTLY_DECREASES: -1}
+            self.assertEqual(expected_polarity.get(data[RELATION], 0), compiled.polarity[edge_id])
+
+    def test_pickle(self):
+        """Test a snapshot survives pickling."""
+        compiled = pickle.loads(pickle.dumps(self.compiled))
+        self.assertEqual(self.compiled.targets.tolist(), compiled.targets.tolist())
+        self.assertEqual(self.compiled.keys, compiled.keys)
+        node = next(iter(self.graph))
+        self.assertEqual(self.compiled.get_node_id(node), compiled.get_node_id(node))
+
+    def test_cache(self):
+        """Test snapshots of graphs with tracked fingerprints are cached until the fingerprint changes."""
+        compiled = compile_graph(self.graph)
+        self.assertIsNot(compiled, compile_graph(self.graph))
+
+        fingerprint = track_graph_fingerprint(self.graph)
+        compiled = compile_graph(self.graph)
+        self.assertIs(compiled, compile_graph(self.graph))
+
+        u, v, key, data = next(iter(self.graph.edges(keys=True, data=True)))
+        relation = DECREASES if data[RELATION] != DECREASES else INCREASES
+        self.graph.remove_edge(u, v, key)
+        fingerprint.remove_edge(u, v, data)
+        new_data = {RELATION: relation}
+        self.graph.add_edge(u, v, key=key, **new_data)
+        fingerprint.add_edge(u, v, new_data)
+        recompiled = compile_graph(self.graph)
+        self.assertIsNot(compiled, recompiled)
+        self.assertIs(recompiled, compile_graph(self.graph))
+        self.assertIn(recompiled.get_relation_code(relation), {
+            recompiled.relations[edge_id]
+            for edge_id in range(recompiled.number_of_edges())
+            if recompiled.get_edge(edge_id) == (u, v, key)
+        })
+
+    def test_stability(self):
+        """Test the fast paths for stability give the same results."""
+        for func in (get_regulatory_pairs, get_chaotic_pairs, get_dampened_pairs):
+            with self.subTest(func=func.__name__):
+                self.assertEqual(func(self.graph), func(self.graph, compiled=self.compiled))
+
+    def test_concordance(self):
+        """Test the fast path for concordance gives the same results."""
+        for cutoff in (None, 0.5):
+            self.assertEqual(
+                calculate_concordance_helper(self.graph, 'weight', cutoff=cutoff),
+                calculate_concordance_helper(self.graph, 'weight', cutoff=cutoff, compiled=self.compiled),
+            )
+
+
+def _count_worker_edges(node_id: int) -> int:
+    return len(get_worker_snapshot().successors(node_id))
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'snapshot')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_roundtrip(self):
+        """Test a snapshot is memory-mapped when loaded and rebuilds the same graph."""
+        graph = make_graph()
+        compiled = CompiledGraph.from_graph(graph, node_keys=['weight'])
+        compiled.save(self.path)
+
+        loaded = load_snapshot(self.path)
+        self.assertIsInstance(loaded.targets, np.memmap)
+        self.assertFalse(loaded.targets.flags.writeable)
+        self.assertEqual(compiled.nodes, loaded.nodes)
+        self.assertEqual(compiled.keys, loaded.keys)
+        self.assertEqual(compiled.relations.tolist(), loaded.relations.tolist())
+        np.testing.assert_array_equal(compiled.node_columns['weight'], loaded.get_node_column('weight'))
+
+        rebuilt = loaded.to_graph()
+        self.assertEqual(set(graph.edges(keys=True)), set(rebuilt.edges(keys=True)))
+        for node, data in graph.nodes(data=True):
+            self.assertEqual(data.get('weight'), rebuilt.nodes[node].get('weight'))
+
+        self.assertNotIsInstance(load_snapshot(self.path, mmap=False).targets, np.memmap)
+
+    def test_map(self):
+        """Test mapping in a pool of processes gives the same results as in this process."""
+        compiled = CompiledGraph.from_graph(make_graph())
+        save_snapshot(compiled, self.path)
+        expected = [len(compiled.successors(i)) for i in range(compiled.number_of_nodes())]
+        for processes in (1, 2):
+            with self.subTest(processes=processes):
+                self.assertEqual(expected, map_on_snapshot(
+                    self.path, _count_worker_edges, range(compiled.number_of_nodes()), processes=processes,
+                ))
+
+    def test_concordance(self):
+        """Test the parallel concordance permutation test."""
+        graph = make_graph()
+        save_snapshot(CompiledGraph.from_graph(graph, node_keys=['weight']), self.path)
+
+        score, distribution, p = calculate_concordance_probability_on_snapshot(
+            self.path, 'weight', permutations=10, seed=5, processes=1,
+        )
+        self.assertEqual(calculate_concordance(graph, 'weight'), score)
+        self.assertEqual(10, len(distribution))
+        self.assertEqual((score, distribution, p), calculate_concordance_probability_on_snapshot(
+            self.path, 'weight', permutations=10, seed=5, processes=2,
+        ))
+
+    def test_heat(self):
+        """Test the parallel heat diffusion workflow gives the same scores as on the graph."""
+        for seed, acyclic in itt.product(range(3), (True, False)):
+            graph = make_heat_graph(seed, acyclic)
+            path = os.path.join(self.directory.name, f'heat_{seed}_{acyclic}')
+            save_snapshot(CompiledGraph.from_graph(graph, node_keys=['weight']), path)
+            # the scores are only the same without cycles, since those are broken by removing random edges
+            columns = (0, 3, 4, 5) if acyclic else (4, 5)
+            for key in (None, 'weight'):
+                with self.subTest(seed=seed, acyclic=acyclic, key=key):
+                    expected = calculate_average_scores_on_graph(graph, key=key, runs=10)
+                    scores = calculate_average_scores_on_snapshot(path, key=key, runs=10, processes=1)
+                    self.assertEqual(set(expected), set(scores))
+                    for node, result in expected.items():
+                        self.assertEqual([result[i] for i in columns], [scores[node][i] for i in columns])
+
+                    if acyclic:
+                        parallel_scores = calculate_average_scores_on_snapshot(path, key=key, runs=10, processes=2)
+                        for node, result in scores.items():
+                            self.assertEqual([result[i] for i in columns], [parallel_scores[node][i] for i in columns])
+
+    def test_heat_cycle(self):
+        """Test the heat diffusion workflow removes random edges to break cycles."""
+        a, b, c, d = (Protein('HGNC', name) for name in 'abcd')
+        process = BiologicalProcess('GO', 'process')
+        graph = BELGraph()
+        for u, v in ((a, c), (b, d), (c, d), (d, c), (c, process), (d, process)):
+            graph.add_edge(u, v, **{RELATION: INCREASES})
+        graph.nodes[a]['weight'] = 1.0
+        graph.nodes[b]['weight'] = 2.0
+        save_snapshot(CompiledGraph.from_graph(graph, node_keys=['weight']), self.path)
+
+        for scores in (
+            calculate_average_scores_on_graph(graph, runs=20),
+            calculate_average_scores_on_snapshot(self.path, runs=20, processes=1),
+        ):
+            self.assertIsNotNone(scores[process][0])
+
+    def test_neurommsig(self):
+        """Test the parallel NeuroMMSig scores are the same as on the graph."""
+        graph = make_neurommsig_graph()
+        save_neurommsig_snapshot(graph, self.path)
+        genes = [Gene('HGNC', str(i)) for i in range(0, 40, 3)] + [Gene('HGNC', 'missing')]
+
+        try:
+            expected = get_neurommsig_scores(graph, genes)
+        except NetworkXNotImplemented:
+            self.skipTest('this version of networkx does not calculate the betweenness centrality of multigraphs')
+
+        self.assertEqual({'S1', 'S2', 'S3'}, set(expected))
+        self.assertLess(0, neurommsig_hubs(graph, genes, top_percent=0.2))
+        for processes in (1, 2):
+            with self.subTest(processes=processes):
+                self.assertEqual(expected, get_neurommsig_scores_on_snapshot(self.path, genes, processes=processes))
+
+        self.assertEqual(
+            get_neurommsig_scores(graph, genes, top_percent=0.2, hub_weight=2.0),
+            get_neurommsig_scores_on_snapshot(self.path, genes, top_percent=0.2, hub_weight=2.0, processes=1),
+        )
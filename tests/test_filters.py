@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for evaluating edge filters on edge tables."""
+
+import random
+import unittest
+
+from pybel import BELGraph
+from pybel.constants import (
+    ASSOCIATION, CITATION_AUTHORS, CITATION_DB, CITATION_IDENTIFIER, CITATION_TYPE_PUBMED, DECREASES, INCREASES,
+)
+from pybel.dsl import Abundance, ComplexAbundance, Protein
+from pybel.struct.filters import filter_edges
+from pybel.struct.filters.edge_predicates import has_polarity
+from pybel.testing.utils import n
+from pybel_tools.filters import (
+    EdgeTable, build_all_filter, build_annotation_dict_all_filter, build_annotation_dict_any_filter,
+    build_any_filter, build_author_inclusion_filter, build_not_filter, build_pmid_exclusion_filter,
+    build_pmid_inclusion_filter, build_relation_filter, build_source_namespace_filter, build_target_namespace_filter,
+)
+
+
+def make_graph() -> BELGraph:
+    """Make a random graph with a variety of provenance."""
+    rng = random.Random(5)
+    nodes = [Protein('HGNC', str(i)) for i in range(5)] + [Abundance('CHEBI', str(i)) for i in range(5)]
+    nodes.append(ComplexAbundance([Protein('HGNC', '0'), Protein('HGNC', '1')]))
+    graph = BELGraph()
+    for _ in range(200):
+        u, v = rng.sample(nodes, 2)
+        graph.add_qualified_edge(
+            u, v,
+            relation=rng.choice([INCREASES, DECREASES, ASSOCIATION]),
+            citation={
+                CITATION_DB: CITATION_TYPE_PUBMED if rng.random() < 0.8 else 'DOI',
+                CITATION_IDENTIFIER: rng.choice([str(i) for i in range(8)]),
+                CITATION_AUTHORS: rng.sample(['A', 'B', 'C', 'D'], rng.randint(0, 2)),
+            },
+            evidence=n(),
+            annotations={
+                'Species': set(rng.sample(['9606', '10090'], rng.randint(1, 2))),
+                **({'Cell': rng.choice(['x', 'y'])} if rng.random() < 0.5 else {}),
+            },
+        )
+    return graph
+
+
+class TestEdgeTable(unittest.TestCase):
+    def setUp(self):
+        self.graph = make_graph()
+        self.table = EdgeTable(self.graph)
+
+    def assert_same(self, edge_predicates):
+        """Assert the table gives the same edges as calling the predicates on each edge."""
+        expected = list(filter_edges(self.graph, edge_predicates))
+        self.assertLess(0, len(expected))
+        self.assertEqual(expected, self.table.filter(edge_predicates))
+
+    def test_predicates(self):
+        """Test each predicate with an edge mask gives the same results as calling it."""
+        for edge_predicate in [
+            build_relation_filter(INCREASES),
+            build_relation_filter([INCREASES, DECREASES]),
+            build_pmid_inclusion_filter('3'),
+            build_pmid_inclusion_filter(['1', '2']),
+            build_pmid_exclusion_filter(['1', '2']),
+            build_author_inclusion_filter('A'),
+            build_author_inclusion_filter(['B', 'C']),
+            build_source_namespace_filter('HGNC'),
+            build_target_namespace_filter(['CHEBI', 'HGNC']),
+            build_annotation_dict_all_filter({'Species': ['9606', '10090']}),
+            build_annotation_dict_all_filter({'Cell': []}),
+            build_annotation_dict_any_filter({'Species': ['10090'], 'Cell': ['x']}),
+        ]:
+            with self.subTest(name=edge_predicate.__name__):
+                self.assertTrue(hasattr(edge_predicate, 'edge_mask'))
+                self.assert_same(edge_predicate)
+
+    def test_annotation_without_values(self):
+        """Test an annotation with no values in the query still has to be on the edge."""
+        self.graph.add_increases(Protein('HGNC', '0'), Protein('HGNC', '1'), citation=n(), evidence=n())
+        table = EdgeTable(self.graph)
+        edge_predicate = build_annotation_dict_all_filter({'Cell': [], 'Species': ['9606']})
+        expected = list(filter_edges(self.graph, edge_predicate))
+        self.assertLess(0, len(expected))
+        self.assertEqual(expected, table.filter(edge_predicate))
+        self.assertTrue(all('Cell' in self.graph[u][v][k]['annotations'] for u, v, k in expected))
+
+    def test_composition(self):
+        """Test composing predicates with and without edge masks."""
+        self.assert_same([build_pmid_inclusion_filter(['1', '2']), has_polarity])
+        self.assert_same(build_any_filter([build_author_inclusion_filter('A'), has_polarity]))
+        self.assert_same(build_all_filter([
+            build_source_namespace_filter('HGNC'),
+            build_not_filter(build_any_filter([build_relation_filter(ASSOCIATION), build_pmid_inclusion_filter('3')])),
+        ]))
+
+    def test_subgraph(self):
+        """Test inducing a sub-graph over the passing edges."""
+        subgraph = self.table.get_subgraph(build_pmid_inclusion_filter('3'))
+        self.assertEqual(self.table.count(build_pmid_inclusion_filter('3')), subgraph.number_of_edges())
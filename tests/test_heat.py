@@ -5,6 +5,7 @@ import unittest
 import pybel
 from pybel.dsl import bioprocess, protein
 from pybel.testing.utils import n
+from pybel_tools.analysis.heat import calculate_average_scores_on_graph
 from pybel_tools.generation import generate_bioprocess_mechanisms
 
 
@@ -42,5 +43,20 @@ class TestGenerate(unittest.TestCase):
         # self.assertEqual(3, score)
 
 
+class TestHeat(unittest.TestCase):
+    def test_acyclic(self):
+        """Test the heat diffusion score of a biological process in an acyclic graph."""
+        a, b, c, d = protein('HGNC', 'A'), protein('HGNC', 'B'), protein('HGNC', 'C'), bioprocess('GO', 'D')
+        graph = pybel.BELGraph()
+        graph.add_increases(a, b, citation=n(), evidence=n())
+        graph.add_increases(b, d, citation=n(), evidence=n())
+        graph.add_increases(c, d, citation=n(), evidence=n())
+        for node, value in ((a, 2), (c, 1)):
+            graph.nodes[node]['weight'] = value
+
+        scores = calculate_average_scores_on_graph(graph, runs=10)
+        self.assertEqual(3, scores[d][0])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -2,12 +2,19 @@
 
 """Tests for data integration tools."""
 
+import random
 import unittest
 
 from pybel import BELGraph
-from pybel.constants import GENE
+from pybel.constants import CAUSES_NO_CHANGE, DECREASES, GENE, INCREASES, POSITIVE_CORRELATION, RELATION
 from pybel.dsl import Gene, Protein, Rna
-from pybel_tools.integration import overlay_type_data
+from pybel.testing.utils import n
+from pybel_tools.analysis.concordance import calculate_concordance_helper
+from pybel_tools.integration import AttributeStore, overlay_data, overlay_type_data
+from pybel_tools.mutation.highlight import (
+    EDGE_HIGHLIGHT, NODE_HIGHLIGHT, highlight_subgraph, is_edge_highlighted, is_node_highlighted,
+    remove_highlight_nodes,
+)
 
 HGNC = 'hgnc'
 
@@ -49,3 +56,68 @@ class TestIntegrate(unittest.TestCase):
         self.assertEqual(2, g.nodes[g2][label])
         self.assertEqual(-1, g.nodes[g3][label])
         self.assertEqual(0, g.nodes[g4][label])
+
+
+class TestAttributeStore(unittest.TestCase):
+    """Tests for the columnar attribute store."""
+
+    def setUp(self):
+        self.nodes = [Protein(HGNC, str(i)) for i in range(10)]
+        self.graph = BELGraph()
+        for u, v in zip(self.nodes, self.nodes[1:]):
+            self.graph.add_increases(u, v, citation=n(), evidence=n())
+
+    def test_overlay(self):
+        """Test overlaying data in the store and syncing it to the graph."""
+        store = AttributeStore(self.graph)
+        overlay_data(self.graph, {self.nodes[0]: 1.5, self.nodes[1]: -2.0}, label='weight', store=store)
+        overlay_data(self.graph, {self.nodes[0]: 3.0}, label='weight', store=store)
+
+        self.assertNotIn('weight', self.graph.nodes[self.nodes[0]])
+        vector = store.nodes.vector('weight')
+        self.assertEqual([1.5, -2.0], vector[:2].tolist())
+        self.assertTrue(all(value != value for value in vector[2:]))  # NaN
+
+        store.sync_to_graph()
+        self.assertEqual(1.5, self.graph.nodes[self.nodes[0]]['weight'])
+        self.assertNotIn('weight', self.graph.nodes[self.nodes[2]])
+
+        reloaded = AttributeStore.from_graph(self.graph, node_labels=['weight'])
+        self.assertEqual(-2.0, reloaded.nodes.get('weight', self.nodes[1]))
+
+    def test_highlight(self):
+        """Test highlighting nodes and edges in the store."""
+        store = AttributeStore(self.graph)
+        subgraph = self.graph.subgraph(self.nodes[:3])
+
+        highlight_subgraph(self.graph, subgraph, store=store)
+        self.assertTrue(is_node_highlighted(self.graph, self.nodes[0], store=store))
+        self.assertFalse(is_node_highlighted(self.graph, self.nodes[5], store=store))
+        for u, v, k in subgraph.edges(keys=True):
+            self.assertTrue(is_edge_highlighted(self.graph, u, v, k, store=store))
+        self.assertEqual(2, store.edges.mask(EDGE_HIGHLIGHT).sum())
+
+        remove_highlight_nodes(self.graph, [self.nodes[0]], store=store)
+        self.assertFalse(is_node_highlighted(self.graph, self.nodes[0], store=store))
+
+        store.sync_to_graph()
+        self.assertNotIn(NODE_HIGHLIGHT, self.graph.nodes[self.nodes[0]])
+        self.assertIn(NODE_HIGHLIGHT, self.graph.nodes[self.nodes[1]])
+
+    def test_concordance(self):
+        """Test the vectorized concordance gives the same result as the per-edge one."""
+        random.seed(5)
+        graph = BELGraph()
+        for _ in range(200):
+            u, v = random.sample(self.nodes, 2)
+            relation = random.choice([INCREASES, DECREASES, CAUSES_NO_CHANGE, POSITIVE_CORRELATION, 'association'])
+            graph.add_edge(u, v, **{RELATION: relation})
+        for node in self.nodes[1:]:
+            graph.nodes[node]['weight'] = random.choice([-1.0, -0.2, 0.0, 0.3, 2.0])
+
+        store = AttributeStore.from_graph(graph, node_labels=['weight'])
+        for cutoff in (None, 0.5):
+            self.assertEqual(
+                calculate_concordance_helper(graph, 'weight', cutoff=cutoff),
+                calculate_concordance_helper(graph, 'weight', cutoff=cutoff, store=store),
+            )
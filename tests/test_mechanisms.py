@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for comparing generated mechanisms to canonical sub-graphs."""
+
+import random
+import unittest
+
+from pybel import BELGraph
+from pybel.dsl import BiologicalProcess, Protein
+from pybel.struct import get_subgraphs_by_annotation
+from pybel.testing.utils import n
+from pybel_tools.analysis.mechanisms import compare, compare_approximate, get_top_matches, iterate_top_matches
+from pybel_tools.generation import generate_bioprocess_mechanisms
+from pybel_tools.utils import tanimoto_set_similarity
+
+
+def make_graph(seed: int = 1) -> BELGraph:
+    """Make a graph where the proteins upstream of each biological process are mostly in one sub-graph."""
+    rng = random.Random(seed)
+    proteins = [Protein('HGNC', str(i)) for i in range(60)]
+    graph = BELGraph()
+    for i in range(10):
+        process = BiologicalProcess('GO', f'process {i}')
+        members = rng.sample(proteins, 8)
+        for j, protein in enumerate(members):
+            graph.add_increases(
+                protein, process, citation=n(), evidence=n(),
+                annotations={'Subgraph': {f'S{i}' if j < 6 else f'S{rng.randrange(10)}'}},
+            )
+        graph.add_increases(members[0], members[1], citation=n(), evidence=n(), annotations={'Subgraph': {f'S{i}'}})
+    graph.add_association(proteins[0], BiologicalProcess('GO', 'unaffected'), citation=n(), evidence=n())
+    return graph
+
+
+class TestCompare(unittest.TestCase):
+    def setUp(self):
+        self.graph = make_graph()
+        canonical = get_subgraphs_by_annotation(self.graph, 'Subgraph')
+        candidates = generate_bioprocess_mechanisms(self.graph)
+        self.expected = {
+            name: {
+                process: tanimoto_set_similarity(canonical_graph, candidate_graph)
+                for process, candidate_graph in candidates.items()
+            }
+            for name, canonical_graph in canonical.items()
+        }
+
+    def test_compare(self):
+        """Test the similarities from sparse matrices are the same as from generating each mechanism."""
+        result = compare(self.graph)
+        self.assertEqual(set(self.expected), set(result))
+        for name, similarities in self.expected.items():
+            self.assertEqual(set(similarities), set(result[name]))
+            for process, similarity in similarities.items():
+                self.assertAlmostEqual(similarity, result[name][process], msg=f'{name}, {process}')
+
+    def test_top_matches(self):
+        """Test getting the most similar canonical sub-graphs for each process, in chunks."""
+        k = 3
+        result = get_top_matches(self.graph, k=k)
+        self.assertEqual(11, len(result))
+        self.assertEqual([], result[BiologicalProcess('GO', 'unaffected')])
+        for process, matches in result.items():
+            expected = sorted(
+                (
+                    (name, similarities[process])
+                    for name, similarities in self.expected.items()
+                    if similarities[process]
+                ),
+                key=lambda pair: -pair[1],
+            )[:k]
+            self.assertEqual([name for name, _ in expected], [name for name, _ in matches])
+            for (_, expected_similarity), (_, similarity) in zip(expected, matches):
+                self.assertAlmostEqual(expected_similarity, similarity)
+
+        self.assertEqual(result, dict(iterate_top_matches(self.graph, k=k, chunk_size=4)))
+
+    def test_approximate(self):
+        """Test the pairs found with MinHash against the exact similarities."""
+        threshold = 0.3
+        result = compare_approximate(self.graph, threshold=threshold, num_perm=256, seed=2)
+        expected = {
+            (name, process)
+            for name, similarities in self.expected.items()
+            for process, similarity in similarities.items()
+            if threshold + 0.1 <= similarity
+        }
+        self.assertLess(0, len(expected))
+        found = {
+            (name, process)
+            for name, similarities in result.items()
+            for process in similarities
+        }
+        self.assertLessEqual(expected, found)
+        for name, similarities in result.items():
+            for process, similarity in similarities.items():
+                self.assertAlmostEqual(self.expected[name][process], similarity, delta=0.15)
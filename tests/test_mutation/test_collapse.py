@@ -6,11 +6,17 @@ import unittest
 
 from pybel import BELGraph
 from pybel.constants import (
-    ASSOCIATION, DECREASES, DIRECTLY_INCREASES, INCREASES, POSITIVE_CORRELATION,
+    ASSOCIATION, DECREASES, DIRECTLY_INCREASES, EQUIVALENT_TO, HAS_VARIANT, INCREASES, ORTHOLOGOUS,
+    POSITIVE_CORRELATION, RELATION,
 )
-from pybel.dsl import Abundance, Gene, MicroRna, Pathology, Protein, Rna
+from pybel.dsl import Abundance, Gene, MicroRna, Pathology, Protein, ProteinModification, Rna
 from pybel.testing.utils import n
-from pybel_tools.mutation.collapse import collapse_to_protein_interactions
+from pybel_tools.mutation import remove_inconsistent_edges
+from pybel_tools.mutation.collapse import (
+    collapse_consistent_edges, collapse_equivalencies_by_namespace, collapse_nodes_with_same_names,
+    collapse_orthologies_by_namespace, collapse_protein_variants, collapse_to_protein_interactions,
+    get_survivor_mapping, remove_inconsistent_and_collapse_consistent_edges,
+)
 
 HGNC = 'HGNC'
 GO = 'GO'
@@ -76,3 +82,107 @@ class TestCollapseProteinInteractions(unittest.TestCase):
         self.assertEqual(1, collapsed_graph.number_of_edges())
         self.assertIn(g1, collapsed_graph)
         self.assertIn(g2, collapsed_graph)
+
+
+class TestCollapseSameNames(unittest.TestCase):
+    def test_collapse_same_names(self):
+        graph = BELGraph()
+
+        hgnc = Protein(HGNC, name='MAPT')
+        up = Protein('UP', name='mapt')
+        other = Protein('OTHER', name='Mapt')
+        gene = Gene(HGNC, name='MAPT')
+
+        graph.add_increases(up, p1, citation=n(), evidence=n())
+        graph.add_increases(other, p2, citation=n(), evidence=n())
+        graph.add_increases(hgnc, p3, citation=n(), evidence=n())
+        graph.add_increases(gene, p1, citation=n(), evidence=n())
+
+        collapse_nodes_with_same_names(graph, priority=[HGNC, 'UP'])
+
+        self.assertIn(hgnc, graph)
+        self.assertIn(gene, graph)
+        self.assertNotIn(up, graph)
+        self.assertNotIn(other, graph)
+        self.assertEqual({p1, p2, p3}, set(graph[hgnc]))
+
+
+class TestCollapsePairs(unittest.TestCase):
+    def test_survivor_mapping(self):
+        """Test chains resolve to their final survivor and cycles are broken."""
+        self.assertEqual({1: 3, 2: 3}, get_survivor_mapping([(1, 2), (2, 3)]))
+        self.assertEqual({1: 3, 2: 3}, get_survivor_mapping([(2, 3), (1, 2)]))
+        self.assertEqual({1: 2}, get_survivor_mapping([(1, 2), (2, 1)]))
+        self.assertEqual({1: 3, 4: 3}, get_survivor_mapping([(4, 1), (1, 3)]))
+        self.assertEqual({1: 2}, get_survivor_mapping([(1, 2), (1, 3)]))
+
+    def test_collapse_one_to_many_orthology(self):
+        """Test a victim orthologous to two survivors doesn't merge the survivors into each other."""
+        mgi = Protein('MGI', name='1')
+
+        graph = BELGraph()
+        graph.add_edge(mgi, p1, **{RELATION: ORTHOLOGOUS})
+        graph.add_edge(mgi, p2, **{RELATION: ORTHOLOGOUS})
+        graph.add_increases(mgi, p3, citation=n(), evidence=n())
+
+        collapse_orthologies_by_namespace(graph, 'MGI', HGNC)
+
+        self.assertEqual({p1, p2, p3}, set(graph))
+        self.assertTrue(graph.has_edge(p1, p3))
+        self.assertFalse(graph.has_edge(p2, p3))
+
+    def test_collapse_equivalencies(self):
+        """Test a chain of equivalences is collapsed to the survivor namespace."""
+        eg = Protein('EG', name='1')
+        up = Protein('UP', name='1')
+
+        graph = BELGraph()
+        graph.add_edge(eg, up, **{RELATION: EQUIVALENT_TO})
+        graph.add_edge(up, p1, **{RELATION: EQUIVALENT_TO})
+        graph.add_increases(eg, p2, citation=n(), evidence=n())
+        graph.add_decreases(p3, up, citation=n(), evidence=n())
+
+        collapse_equivalencies_by_namespace(graph, ['EG', 'UP'], ['UP', HGNC])
+
+        self.assertEqual({p1, p2, p3}, set(graph))
+        self.assertTrue(graph.has_edge(p1, p2))
+        self.assertTrue(graph.has_edge(p3, p1))
+        self.assertEqual(2, graph.number_of_edges())
+
+    def test_collapse_protein_variants(self):
+        p1_ph = p1.with_variants(ProteinModification('Ph'))
+
+        graph = BELGraph()
+        graph.add_edge(p1, p1_ph, **{RELATION: HAS_VARIANT})
+        graph.add_increases(p1_ph, p2, citation=n(), evidence=n())
+
+        collapse_protein_variants(graph)
+
+        self.assertEqual({p1, p2}, set(graph))
+        self.assertTrue(graph.has_edge(p1, p2))
+
+
+class TestCollapseConsistentEdges(unittest.TestCase):
+    def setUp(self):
+        self.graph = BELGraph()
+        self.graph.add_increases(p1, p2, citation=n(), evidence=n())
+        self.graph.add_increases(p1, p2, citation=n(), evidence=n())
+        self.graph.add_increases(p2, p3, citation=n(), evidence=n())
+        self.graph.add_decreases(p2, p3, citation=n(), evidence=n())
+        self.graph.add_association(p1, p3, citation=n(), evidence=n())
+
+    def test_fused(self):
+        """Test the fused transformation gives the same result as removing then collapsing."""
+        expected = self.graph.copy()
+        remove_inconsistent_edges(expected)
+        collapse_consistent_edges(expected)
+
+        remove_inconsistent_and_collapse_consistent_edges(self.graph)
+
+        self.assertEqual(set(expected), set(self.graph))
+        self.assertEqual(
+            sorted((str(u), str(v), d[RELATION]) for u, v, d in expected.edges(data=True)),
+            sorted((str(u), str(v), d[RELATION]) for u, v, d in self.graph.edges(data=True)),
+        )
+        self.assertEqual({(p1, p2), (p1, p3), (p3, p1)}, set(self.graph.edges()))
+        self.assertEqual(INCREASES, self.graph[p1][p2][0][RELATION])
@@ -2,12 +2,16 @@
 
 import unittest
 
+from pybel import BELGraph
+from pybel.dsl import Protein
 from pybel.examples.sialic_acid_example import cd33, cd33_phosphorylated, sialic_acid_graph
 from pybel.examples.various_example import (
     complex_example, composite_example, glycolisis_step_1, hk1, single_complex_graph, single_composite_graph,
     single_reaction_graph,
 )
-from pybel_tools.mutation import enrich_complexes, enrich_composites, enrich_reactions, enrich_variants
+from pybel_tools.mutation import (
+    enrich_complexes, enrich_composites, enrich_reactions, enrich_variants, expand_internal, expand_internal_causal,
+)
 
 
 class TestEnrich(unittest.TestCase):
@@ -75,3 +79,33 @@ class TestEnrich(unittest.TestCase):
 
         self.assertIn(cd33_phosphorylated, self.sialic_acid_graph)
         self.assertIn(cd33, self.sialic_acid_graph, msg='Enrich variants did not work')
+
+
+class TestExpandInternal(unittest.TestCase):
+    def setUp(self):
+        self.a, self.b, self.c, self.d = (Protein('HGNC', name) for name in 'ABCD')
+        self.universe = BELGraph()
+        self.universe.add_increases(self.a, self.b, citation='1', evidence='1')
+        self.universe.add_increases(self.b, self.a, citation='2', evidence='2')
+        self.universe.add_association(self.b, self.c, citation='3', evidence='3')
+        self.universe.add_increases(self.c, self.d, citation='4', evidence='4')
+
+        self.graph = BELGraph()
+        self.graph.add_node_from_data(self.a)
+        self.graph.add_node_from_data(self.b)
+        self.graph.add_node_from_data(self.c)
+
+    def test_expand_internal(self):
+        """Test edges between nodes of the sub-graph are added in both directions."""
+        expand_internal(self.universe, self.graph)
+        self.assertEqual(4, self.graph.number_of_edges())
+        self.assertTrue(self.graph.has_edge(self.a, self.b))
+        self.assertTrue(self.graph.has_edge(self.b, self.a))
+        self.assertTrue(self.graph.has_edge(self.b, self.c))
+        self.assertNotIn(self.d, self.graph)
+
+    def test_expand_internal_causal(self):
+        """Test only causal edges between nodes of the sub-graph are added."""
+        expand_internal_causal(self.universe, self.graph)
+        self.assertEqual(2, self.graph.number_of_edges())
+        self.assertFalse(self.graph.has_edge(self.b, self.c))
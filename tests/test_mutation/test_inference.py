@@ -7,7 +7,7 @@ import unittest
 from pybel import BELGraph
 from pybel.constants import *
 from pybel.dsl import protein
-from pybel_tools.mutation.inference import infer_missing_two_way_edges
+from pybel_tools.mutation.inference import enrich_internal_unqualified_edges, infer_missing_two_way_edges
 
 
 class TestMutationInference(unittest.TestCase):
@@ -35,3 +35,23 @@ class TestMutationInference(unittest.TestCase):
         self.assertTrue(graph.has_edge(c, a))
         self.assertTrue(graph.has_edge(c, b))
         self.assertFalse(graph.has_edge(d, a))
+
+    def test_enrich_internal_unqualified_edges(self):
+        graph = BELGraph()
+
+        a = protein('HGNC', 'A')
+        b = protein('HGNC', 'B')
+        c = protein('HGNC', 'C')
+
+        graph.add_edge(a, b, key=-1, **{RELATION: ASSOCIATION})
+        graph.add_edge(b, a, key=-2, **{RELATION: ASSOCIATION})
+        graph.add_edge(a, b, key=3, **{RELATION: INCREASES})
+        graph.add_edge(b, c, key=-3, **{RELATION: ASSOCIATION})
+
+        subgraph = BELGraph()
+        subgraph.add_node_from_data(a)
+        subgraph.add_node_from_data(b)
+
+        enrich_internal_unqualified_edges(graph, subgraph)
+
+        self.assertEqual({(a, b, -1), (b, a, -2)}, set(subgraph.edges(keys=True)))
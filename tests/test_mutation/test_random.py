@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for random permutation functions."""
+
+import unittest
+from collections import Counter
+
+from pybel import BELGraph
+from pybel.constants import RELATION
+from pybel.dsl import Protein
+from pybel.testing.utils import n
+from pybel_tools.mutation.random import (
+    get_random_edge_view, get_random_node_view, iter_random_edge_views, iter_shuffled_node_data,
+    iter_shuffled_relations, random_by_edges, random_by_nodes, shuffle_node_data, shuffle_relations,
+)
+
+nodes = [Protein('HGNC', str(i)) for i in range(20)]
+
+
+class TestShuffle(unittest.TestCase):
+    def setUp(self):
+        self.graph = BELGraph()
+        for i, (u, v) in enumerate(zip(nodes, nodes[1:])):
+            if i % 2:
+                self.graph.add_increases(u, v, citation=n(), evidence=n())
+            else:
+                self.graph.add_decreases(u, v, citation=n(), evidence=n())
+        for i, node in enumerate(nodes):
+            self.graph.nodes[node]['weight'] = i
+
+    @staticmethod
+    def _relations(graph):
+        return [data[RELATION] for _, _, data in graph.edges(data=True)]
+
+    def test_shuffle_relations(self):
+        """Test relations are permuted without changing the original graph."""
+        original = self._relations(self.graph)
+        rv = shuffle_relations(self.graph, percentage=1.0, seed=5)
+
+        self.assertEqual(original, self._relations(self.graph))
+        self.assertEqual(Counter(original), Counter(self._relations(rv)))
+        self.assertEqual(self._relations(rv), self._relations(shuffle_relations(self.graph, percentage=1.0, seed=5)))
+
+    def test_iter_shuffled_relations(self):
+        """Test that a fixed number of permuted graphs are generated."""
+        original = Counter(self._relations(self.graph))
+        permutations = [
+            self._relations(graph)
+            for graph in iter_shuffled_relations(self.graph, 5, percentage=0.5, seed=5)
+        ]
+        self.assertEqual(5, len(permutations))
+        for relations in permutations:
+            self.assertEqual(original, Counter(relations))
+
+    def test_shuffle_node_data(self):
+        """Test node data is permuted without changing the original graph."""
+        rv = shuffle_node_data(self.graph, 'weight', percentage=1.0, seed=5)
+
+        self.assertEqual(list(range(20)), [self.graph.nodes[node]['weight'] for node in nodes])
+        self.assertEqual(set(range(20)), {rv.nodes[node]['weight'] for node in nodes})
+        self.assertNotEqual(list(range(20)), [rv.nodes[node]['weight'] for node in nodes])
+
+    def test_iter_shuffled_node_data(self):
+        """Test only the given percentage of nodes are permuted."""
+        for graph in iter_shuffled_node_data(self.graph, 'weight', 3, percentage=0.25, seed=5):
+            moved = sum(i != graph.nodes[node]['weight'] for i, node in enumerate(nodes))
+            self.assertLessEqual(moved, 5)
+
+
+class TestRandomViews(unittest.TestCase):
+    def setUp(self):
+        self.graph = BELGraph()
+        for i, u in enumerate(nodes):
+            for v in nodes[i + 1:i + 4]:
+                self.graph.add_increases(u, v, citation=n(), evidence=n())
+        self.graph.nodes[nodes[0]]['weight'] = 1
+
+    def test_node_view(self):
+        """Test a node view is induced over the sampled nodes."""
+        view = get_random_node_view(self.graph, percentage=0.5, seed=5)
+        self.assertEqual(10, view.number_of_nodes())
+
+        sampled = set(view.nodes())
+        expected = {(u, v, k) for u, v, k in self.graph.edges(keys=True) if u in sampled and v in sampled}
+        self.assertEqual(expected, {(u, v, k) for u, v, k, _ in view.edges()})
+        self.assertEqual(len(expected), view.number_of_edges())
+
+        graph_view = view.as_graph()
+        self.assertEqual(sampled, set(graph_view))
+        self.assertEqual(expected, set(graph_view.edges(keys=True)))
+
+    def test_edge_view(self):
+        """Test an edge view shares data with the original graph until it's materialized."""
+        view = get_random_edge_view(self.graph, percentage=0.5, seed=5)
+        self.assertEqual(int(0.5 * self.graph.number_of_edges()), view.number_of_edges())
+
+        for u, v, k, data in view.edges():
+            self.assertIs(self.graph[u][v][k], data)
+            self.assertIn(u, view.nodes())
+            self.assertIn(v, view.nodes())
+
+        graph = view.materialize()
+        self.assertEqual(view.number_of_edges(), graph.number_of_edges())
+        self.assertEqual(set(view.nodes()), set(graph))
+
+    def test_random_by(self):
+        """Test the transformations give new graphs."""
+        graph = random_by_nodes(self.graph, seed=5)
+        self.assertEqual(18, graph.number_of_nodes())
+        self.assertIsInstance(graph, BELGraph)
+
+        graph = random_by_edges(self.graph, seed=5)
+        self.assertEqual(int(0.9 * self.graph.number_of_edges()), graph.number_of_edges())
+        if nodes[0] in graph:
+            self.assertEqual(1, graph.nodes[nodes[0]]['weight'])
+
+    def test_iter_views(self):
+        views = list(iter_random_edge_views(self.graph, 3, percentage=0.5, seed=5))
+        self.assertEqual(3, len(views))
+        self.assertIs(views[0].index, views[1].index)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for degree-preserving null models."""
+
+import unittest
+from collections import Counter
+
+from pybel import BELGraph
+from pybel.dsl import Protein
+from pybel.testing.utils import n
+from pybel_tools.selection import get_edge_arrays, iter_null_edge_arrays, iter_null_graphs, rewire_targets
+
+nodes = [Protein('HGNC', str(i)) for i in range(30)]
+
+
+def _degrees(edge_arrays):
+    """Count the out-degree and in-degree of each node for each sign."""
+    return (
+        Counter(zip(edge_arrays.sources.tolist(), edge_arrays.signs.tolist())),
+        Counter(zip(edge_arrays.targets.tolist(), edge_arrays.signs.tolist())),
+    )
+
+
+class TestNullModels(unittest.TestCase):
+    def setUp(self):
+        self.graph = BELGraph()
+        for i, u in enumerate(nodes):
+            for j in (1, 3, 7):
+                v = nodes[(i + j) % len(nodes)]
+                if (i + j) % 2:
+                    self.graph.add_increases(u, v, citation=n(), evidence=n())
+                else:
+                    self.graph.add_decreases(u, v, citation=n(), evidence=n())
+
+    def test_preserves_degrees(self):
+        """Test the degrees are preserved for each sign and no self-edges or duplicates are made."""
+        original = get_edge_arrays(self.graph)
+        results = list(iter_null_edge_arrays(self.graph, 3, swaps_per_edge=5, seed=5))
+        self.assertEqual(3, len(results))
+
+        for edge_arrays in results:
+            self.assertEqual(_degrees(original), _degrees(edge_arrays))
+            self.assertFalse((edge_arrays.sources == edge_arrays.targets).any())
+            pairs = list(zip(edge_arrays.sources.tolist(), edge_arrays.targets.tolist()))
+            self.assertEqual(len(pairs), len(set(pairs)))
+
+        self.assertFalse((original.targets == results[0].targets).all())
+        self.assertFalse((results[0].targets == results[1].targets).all())
+
+    def test_seed(self):
+        """Test the same seed gives the same graphs."""
+        a = next(iter_null_edge_arrays(self.graph, 1, seed=5))
+        b = next(iter_null_edge_arrays(self.graph, 1, seed=5))
+        self.assertEqual(a.targets.tolist(), b.targets.tolist())
+
+    def test_graphs(self):
+        null_graph = next(iter_null_graphs(self.graph, 1, seed=5))
+        self.assertEqual(self.graph.number_of_nodes(), null_graph.number_of_nodes())
+        self.assertEqual(self.graph.number_of_edges(), null_graph.number_of_edges())
+        for node in nodes:
+            self.assertEqual(self.graph.in_degree(node), null_graph.in_degree(node))
+            self.assertEqual(self.graph.out_degree(node), null_graph.out_degree(node))
+
+    def test_rewire_targets(self):
+        rewired = rewire_targets(self.graph, 0.5)
+        self.assertEqual(self.graph.number_of_edges(), rewired.number_of_edges())
+        for node in nodes:
+            self.assertEqual(self.graph.out_degree(node), rewired.out_degree(node))
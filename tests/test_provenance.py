@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for provenance summary functions."""
+
+import random
+import unittest
+
+from pybel import BELGraph
+from pybel.constants import CITATION_AUTHORS, CITATION_DATE, CITATION_DB, CITATION_IDENTIFIER, CITATION_TYPE_PUBMED
+from pybel.dsl import Protein
+from pybel.testing.utils import n
+from pybel_tools.summary.provenance import (
+    KeywordIndex, ProvenanceIndex, count_author_publications, count_authors, count_authors_by_annotation,
+    count_citation_years, count_citations, count_citations_by_annotation, count_pmids, get_authors_by_keyword,
+    get_evidences_by_pmid, get_pmid_by_keyword,
+)
+
+
+def make_graph(seed: int = 5) -> BELGraph:
+    """Make a random graph with a variety of provenance."""
+    rng = random.Random(seed)
+    nodes = [Protein('HGNC', str(i)) for i in range(8)]
+    graph = BELGraph()
+    for _ in range(120):
+        u, v = rng.sample(nodes, 2)
+        identifier = str(rng.randrange(10, 40))
+        graph.add_increases(
+            u, v,
+            citation={
+                CITATION_DB: CITATION_TYPE_PUBMED if rng.random() < 0.8 else 'DOI',
+                CITATION_IDENTIFIER: identifier,
+                CITATION_AUTHORS: rng.sample(['Smith J', 'Smithers K', 'Jones A', 'Li X'], rng.randint(0, 2)),
+                **({CITATION_DATE: f'19{identifier}-01-01'} if rng.random() < 0.9 else {}),
+            },
+            evidence=rng.choice(['x', 'y', 'z']),
+            annotations={'Subgraph': set(rng.sample(['S1', 'S2', 'S3'], rng.randint(1, 2)))},
+        )
+    graph.add_part_of(nodes[0], nodes[1])
+    return graph
+
+
+class TestProvenanceIndex(unittest.TestCase):
+    def setUp(self):
+        self.graph = make_graph()
+        self.index = ProvenanceIndex(self.graph)
+
+    def test_counts(self):
+        """Test the functions give the same results with and without the index."""
+        for func in (count_pmids, count_citations, count_authors, count_author_publications, count_citation_years):
+            with self.subTest(func=func.__name__):
+                expected = func(self.graph)
+                self.assertLess(0, len(expected))
+                self.assertEqual(expected, func(self.graph, index=self.index))
+
+    def test_by_annotation(self):
+        """Test grouping by annotation values with and without the index."""
+        for func in (count_citations_by_annotation, count_authors_by_annotation):
+            with self.subTest(func=func.__name__):
+                expected = func(self.graph, 'Subgraph')
+                self.assertEqual({'S1', 'S2', 'S3'}, set(expected))
+                self.assertEqual(expected, func(self.graph, 'Subgraph', index=self.index))
+
+    def test_evidences(self):
+        """Test looking up evidences by PubMed identifier."""
+        for pmids in ('13', ['11', '12', '99']):
+            with self.subTest(pmids=pmids):
+                expected = get_evidences_by_pmid(self.graph, pmids)
+                self.assertLess(0, len(expected))
+                self.assertEqual(expected, get_evidences_by_pmid(self.graph, pmids, index=self.index))
+
+    def test_add_edge(self):
+        """Test updating the index after adding edges."""
+        index = ProvenanceIndex(BELGraph())
+        for u, v, k, data in self.graph.edges(keys=True, data=True):
+            index.add_edge(u, v, k, data)
+        index.graph = self.graph
+        self.assertEqual(count_citations(self.graph), count_citations(self.graph, index=index))
+        for func in (count_citations_by_annotation, count_authors_by_annotation):
+            with self.subTest(func=func.__name__):
+                self.assertEqual(func(self.graph, 'Subgraph'), func(self.graph, 'Subgraph', index=index))
+
+    def test_keywords(self):
+        """Test searching PubMed identifiers and authors with the index, including after adding edges."""
+        graph = make_graph(seed=6)
+        index = ProvenanceIndex(BELGraph())
+        edges = list(graph.edges(keys=True, data=True))
+        for i, (u, v, k, data) in enumerate(edges):
+            index.add_edge(u, v, k, data)
+            if i in (0, len(edges) // 2, len(edges) - 1):
+                for keyword in ('1', '2', '3', '', '99'):
+                    pmids = {pmid for pmid in index.citation_edges if pmid[0] == CITATION_TYPE_PUBMED}
+                    self.assertEqual(
+                        get_pmid_by_keyword(keyword, pubmed_identifiers={pmid for _, pmid in pmids}),
+                        get_pmid_by_keyword(keyword, index=index),
+                    )
+                for keyword in ('smith', 'SMITH', 'th', 'i', 'ers k', 'zz', ''):
+                    self.assertEqual(
+                        get_authors_by_keyword(keyword, authors=set(index.author_citations)),
+                        get_authors_by_keyword(keyword, index=index),
+                    )
+
+        self.assertEqual(get_pmid_by_keyword('1', graph=graph), get_pmid_by_keyword('1', index=index))
+        self.assertEqual(get_authors_by_keyword('smith', graph=graph), get_authors_by_keyword('smith', index=index))
+
+
+class TestKeywordIndex(unittest.TestCase):
+    def test_search(self):
+        """Test prefix and substring search."""
+        index = KeywordIndex(['abc', 'abd', 'Xabcx', 'b'])
+        self.assertEqual({'abc', 'abd'}, index.search_prefix('ab'))
+        self.assertEqual({'abc', 'Xabcx'}, index.search_substring('ABC'))
+        index.add('zabc')
+        index.add('abe')
+        self.assertEqual({'abc', 'abd', 'abe'}, index.search_prefix('ab'))
+        self.assertEqual({'abc', 'Xabcx', 'zabc'}, index.search_substring('abc'))
+        self.assertEqual({'abc', 'abd', 'Xabcx', 'b', 'zabc', 'abe'}, index.search_substring('b'))
+        self.assertEqual(6, len(index))
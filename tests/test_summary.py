@@ -0,0 +1,350 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for calculating summaries of graphs."""
+
+import itertools as itt
+import json
+import os
+import random
+import tempfile
+import unittest
+from collections import Counter
+
+from click.testing import CliRunner
+
+import pybel
+from pybel import BELGraph
+from pybel.constants import (
+    ANNOTATIONS, CAUSES_NO_CHANGE, CITATION_AUTHORS, CITATION_DATE, CITATION_DB, CITATION_IDENTIFIER,
+    CITATION_TYPE_PUBMED, DECREASES, DIRECTLY_INCREASES, INCREASES, NEGATIVE_CORRELATION, POSITIVE_CORRELATION,
+)
+from pybel.dsl import Pathology, Protein
+from pybel.examples import braf_graph, ras_tloc_graph, sialic_acid_graph
+from pybel.parser.exc import (
+    BELSyntaxError, MissingNamespaceNameWarning, MissingNamespaceRegexWarning, NakedNameWarning,
+    UndefinedAnnotationWarning, UndefinedNamespaceWarning,
+)
+from pybel.struct.summary import (
+    calculate_error_by_annotation, calculate_incorrect_name_dict, count_error_types, count_functions,
+    count_naked_names, count_namespaces, count_relations, count_variants, get_naked_names,
+    get_syntax_errors, get_top_hubs, get_top_pathologies, get_unused_annotations, get_unused_list_annotation_values,
+    get_unused_namespaces,
+)
+from pybel.testing.utils import n
+from pybel_tools.summary import (
+    BELGraphSummary, count_authors, count_confidences, count_modifications, get_chaotic_pairs, get_citation_years,
+    get_contradiction_summary, get_dampened_pairs, get_decrease_mismatch_triplets, get_increase_mismatch_triplets,
+    get_jens_unstable, get_most_common_errors, get_mutually_unstable_correlation_triples,
+    get_namespaces_with_incorrect_names, get_regulatory_pairs, get_separate_unstable_correlation_triples,
+    get_undefined_annotations, get_undefined_namespaces, summarize_subgraph_edge_overlap,
+)
+from pybel_tools.summary.accumulators import Accumulator, FunctionAccumulator, accumulate, get_summary_accumulators
+from pybel_tools.summary import error_summary
+from pybel_tools.summary.batch import (
+    get_batch_summary_table, get_file_digest, main, read_batch_summary_results, summarize_paths,
+)
+from pybel_tools.summary.subgraph_summary import calculate_subgraph_edge_overlap, get_subgraph_edge_overlap
+
+RELATIONS = [INCREASES, DIRECTLY_INCREASES, DECREASES, CAUSES_NO_CHANGE, POSITIVE_CORRELATION, NEGATIVE_CORRELATION]
+
+
+def make_graph() -> BELGraph:
+    """Make a graph with a variety of nodes, edges, and warnings."""
+    rng = random.Random(1)
+    graph = pybel.union([sialic_acid_graph, ras_tloc_graph, braf_graph])
+    nodes = [Protein('HGNC', str(i)) for i in range(10)] + [Pathology('MESH', str(i)) for i in range(3)]
+    for _ in range(120):
+        u, v = rng.sample(nodes, 2)
+        relation = rng.choice(RELATIONS)
+        graph.add_qualified_edge(
+            u, v, relation=relation, evidence=n(),
+            citation={
+                CITATION_DB: CITATION_TYPE_PUBMED,
+                CITATION_IDENTIFIER: str(rng.randrange(5)),
+                CITATION_AUTHORS: rng.sample(['A', 'B', 'C'], rng.randint(0, 2)),
+                CITATION_DATE: rng.choice(['2001-01-01', '2005-01-01']),
+            },
+            annotations={'Confidence': rng.choice(['High', 'Low'])},
+        )
+        if relation == NEGATIVE_CORRELATION:
+            graph.add_qualified_edge(v, u, relation=relation, citation=n(), evidence=n())
+
+    graph.namespace_url['UNUSED'] = 'https://example.com/unused.belns'
+    graph.annotation_list['Confidence'] = {'High', 'Low', 'Medium'}
+    graph.annotation_pattern['Unused'] = '.*'
+    graph.warnings.extend([
+        (None, UndefinedNamespaceWarning(1, 'a', 0, 'X', 'y'), {}),
+        (None, UndefinedNamespaceWarning(2, 'b', 0, 'X', 'z'), {}),
+        (None, UndefinedAnnotationWarning(3, 'c', 0, 'Y'), {}),
+        (None, MissingNamespaceNameWarning(4, 'd', 0, 'HGNC', 'nope'), {}),
+        (None, NakedNameWarning(5, 'e', 0, 'naked'), {}),
+        (None, BELSyntaxError(6, 'f', 0), {}),
+    ])
+    return graph
+
+
+class TestAccumulators(unittest.TestCase):
+    def test_summary(self):
+        """Test the summary calculated in one pass is the same as calling each function."""
+        graph = make_graph()
+        summary = BELGraphSummary.from_graph(graph)
+
+        for name, func in [
+            ('function_count', count_functions),
+            ('modifications_count', count_modifications),
+            ('relation_count', count_relations),
+            ('authors_count', count_authors),
+            ('variants_count', count_variants),
+            ('namespaces_count', count_namespaces),
+            ('undefined_namespaces', get_undefined_namespaces),
+            ('undefined_annotations', get_undefined_annotations),
+            ('namespaces_with_incorrect_names', get_namespaces_with_incorrect_names),
+            ('unused_namespaces', get_unused_namespaces),
+            ('unused_annotations', get_unused_annotations),
+            ('unused_list_annotation_values', get_unused_list_annotation_values),
+            ('naked_names', get_naked_names),
+            ('error_count', count_error_types),
+            ('error_groups', get_most_common_errors),
+            ('syntax_errors', get_syntax_errors),
+            ('regulatory_pairs', get_regulatory_pairs),
+            ('chaotic_pairs', get_chaotic_pairs),
+            ('dampened_pairs', get_dampened_pairs),
+            ('contradictory_pairs', get_contradiction_summary),
+            ('separate_unstable_correlation_triples', get_separate_unstable_correlation_triples),
+            ('mutually_unstable_correlation_triples', get_mutually_unstable_correlation_triples),
+            ('jens_unstable', get_jens_unstable),
+            ('increase_mismatch_triplets', get_increase_mismatch_triplets),
+            ('decrease_mismatch_triplets', get_decrease_mismatch_triplets),
+            ('citation_years', get_citation_years),
+            ('confidence_count', count_confidences),
+        ]:
+            with self.subTest(name=name):
+                expected = func(graph)
+                self.assertLess(0, len(expected))
+                self.assertEqual(expected, getattr(summary, name))
+
+        self.assertEqual(
+            Counter({str(node): count for node, count in get_top_pathologies(graph)}),
+            summary.disease_data,
+        )
+        self.assertEqual(15, len(get_top_hubs(graph)))
+        self.assertEqual(sum(degree for _, degree in get_top_hubs(graph)), sum(summary.hub_data.values()))
+
+    def test_pathology_ties(self):
+        """Test pathologies tied at the cut of the top pathologies are kept by their BEL."""
+        graph = BELGraph()
+        pathologies = [Pathology('MESH', f'disease {i:02}') for i in range(20)]
+        for pathology in pathologies:
+            graph.add_association(Protein('HGNC', 'A'), pathology, citation=n(), evidence=n())
+        graph.add_association(Protein('HGNC', 'B'), pathologies[-1], citation=n(), evidence=n())
+
+        summary = BELGraphSummary.from_graph(graph)
+        self.assertEqual(
+            Counter({str(pathologies[-1]): 2, **{str(pathology): 1 for pathology in pathologies[:14]}}),
+            summary.disease_data,
+        )
+
+    def test_extend(self):
+        """Test adding a new statistic to the same pass as the summary."""
+
+        class EdgeCounter(Accumulator):
+            def __init__(self):
+                self.count = 0
+
+            def on_edge(self, u, v, key, data):
+                self.count += 1
+
+            def get_result(self):
+                return self.count
+
+        graph = make_graph()
+        results = accumulate(graph, {
+            **get_summary_accumulators(),
+            'edges': EdgeCounter(),
+            'functions': FunctionAccumulator(),
+        })
+        self.assertEqual(graph.number_of_edges(), results['edges'])
+        self.assertEqual(count_functions(graph), results['functions'])
+        self.assertEqual(BELGraphSummary.from_graph(graph), BELGraphSummary(**{
+            key: value
+            for key, value in results.items()
+            if key not in {'edges', 'functions'}
+        }))
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.paths = []
+        for name, graph in [('sialic', sialic_acid_graph), ('braf', braf_graph), ('copy', sialic_acid_graph)]:
+            path = os.path.join(self.directory.name, f'{name}.bel.nodelink.json')
+            pybel.dump(graph, path)
+            self.paths.append(path)
+        self.broken_path = os.path.join(self.directory.name, 'broken.bel.nodelink.json')
+        with open(self.broken_path, 'w') as file:
+            print('{', file=file)
+        self.output = os.path.join(self.directory.name, 'results.jsonl')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_summarize(self):
+        """Test summarizing in parallel, tolerating failures, and resuming."""
+        paths = [self.paths[0], self.broken_path, self.paths[2]]
+        results = list(summarize_paths(paths, output=self.output, processes=2))
+        self.assertEqual(2, len(results), msg='duplicate graph should be skipped')
+        results = {result.path: result for result in results}
+        self.assertIsNotNone(results[self.broken_path].error)
+        self.assertIsNone(results[self.paths[0]].error)
+        self.assertLessEqual(0, results[self.paths[0]].summary_seconds)
+        self.assertEqual(
+            json.loads(BELGraphSummary.from_graph(sialic_acid_graph).to_json()),
+            results[self.paths[0]].summary,
+        )
+
+        results = list(summarize_paths(self.paths + [self.broken_path], output=self.output, processes=1))
+        self.assertEqual({self.paths[1], self.broken_path}, {result.path for result in results})
+
+        table = get_batch_summary_table(read_batch_summary_results(self.output))
+        self.assertEqual(3, len(table.index))
+        self.assertEqual(sialic_acid_graph.number_of_edges(), table.loc[get_file_digest(self.paths[0]), 'edges'])
+
+    def test_cli(self):
+        """Test the command line interface."""
+        table = os.path.join(self.directory.name, 'table.tsv')
+        result = CliRunner().invoke(main, [*self.paths, '-o', self.output, '-t', table, '-p', '1'])
+        self.assertEqual(0, result.exit_code, msg=result.output)
+        self.assertEqual(2, len(read_batch_summary_results(self.output)))
+        self.assertTrue(os.path.exists(table))
+
+
+class TestSubgraphEdgeOverlap(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(3)
+        nodes = [Protein('HGNC', str(i)) for i in range(12)]
+        self.graph = BELGraph()
+        for _ in range(150):
+            u, v = rng.sample(nodes, 2)
+            self.graph.add_increases(
+                u, v, citation=str(rng.randrange(3)), evidence=n(),
+                annotations={'Subgraph': set(rng.sample(['S1', 'S2', 'S3', 'S4'], rng.randint(1, 2)))},
+            )
+        self.graph.add_increases(nodes[0], nodes[1], citation=n(), evidence=n())
+
+        self.expected = {}
+        for u, v, data in self.graph.edges(data=True):
+            for value in data.get(ANNOTATIONS, {}).get('Subgraph', {}):
+                self.expected.setdefault(value, set()).add((u, v))
+
+    def test_overlap(self):
+        """Test the overlap from sparse matrices is the same as from sets of edges."""
+        sg2edge, intersections, unions, similarities = calculate_subgraph_edge_overlap(self.graph)
+        self.assertEqual(self.expected, sg2edge)
+        self.assertEqual(similarities, summarize_subgraph_edge_overlap(self.graph))
+
+        overlap = get_subgraph_edge_overlap(self.graph)
+        for x, y in itt.product(self.expected, repeat=2):
+            with self.subTest(x=x, y=y):
+                intersection = self.expected[x] & self.expected[y]
+                union = self.expected[x] | self.expected[y]
+                self.assertEqual(intersection, intersections[x][y])
+                self.assertEqual(union, unions[x][y])
+                self.assertEqual(len(intersection), overlap.get_intersection_size(x, y))
+                self.assertEqual(len(union), overlap.get_union_size(x, y))
+                self.assertAlmostEqual(len(intersection) / len(union), similarities[x][y])
+
+        self.assertEqual(set(self.expected), set(intersections['S1']))
+        with self.assertRaises(KeyError):
+            _ = intersections['S1']['S5']
+
+
+class TestWarningIndex(unittest.TestCase):
+    def setUp(self):
+        self.graph = make_graph()
+        rng = random.Random(2)
+        for line in range(200):
+            cls = rng.choice([MissingNamespaceNameWarning, MissingNamespaceRegexWarning, UndefinedNamespaceWarning])
+            context = {ANNOTATIONS: {'Confidence': {rng.choice(['High', 'Low']): True}}} if rng.random() < 0.5 else {}
+            exc = cls(100 + line, n(), 0, rng.choice(['HGNC', 'MESH', 'X']), str(rng.randrange(20)))
+            self.graph.warnings.append((None, exc, context))
+
+    def test_functions(self):
+        """Test the functions give the same results from the index as from scanning the warnings."""
+        graph = self.graph
+        incorrect = (MissingNamespaceNameWarning, MissingNamespaceRegexWarning)
+        for namespace in ('HGNC', 'MESH', 'X', 'Y'):
+            with self.subTest(namespace=namespace):
+                self.assertEqual(
+                    {
+                        exc.name
+                        for _, exc, _ in graph.warnings
+                        if isinstance(exc, incorrect) and exc.namespace == namespace
+                    },
+                    error_summary.get_incorrect_names_by_namespace(graph, namespace),
+                )
+                self.assertEqual(
+                    {
+                        exc.name
+                        for _, exc, _ in graph.warnings
+                        if isinstance(exc, UndefinedNamespaceWarning) and exc.namespace == namespace
+                    },
+                    error_summary.get_undefined_namespace_names(graph, namespace),
+                )
+
+        self.assertEqual(count_error_types(graph), error_summary.count_error_types(graph))
+        self.assertEqual(count_naked_names(graph), error_summary.count_naked_names(graph))
+        self.assertEqual(get_naked_names(graph), error_summary.get_naked_names(graph))
+        self.assertEqual(calculate_incorrect_name_dict(graph), error_summary.calculate_incorrect_name_dict(graph))
+        self.assertEqual(
+            calculate_error_by_annotation(graph, 'Confidence'),
+            error_summary.calculate_error_by_annotation(graph, 'Confidence'),
+        )
+        self.assertEqual({'HGNC', 'MESH', 'X'}, error_summary.get_namespaces_with_incorrect_names(graph))
+        self.assertEqual(
+            {exc.namespace for _, exc, _ in graph.warnings if isinstance(exc, UndefinedNamespaceWarning)},
+            error_summary.get_undefined_namespaces(graph),
+        )
+        self.assertEqual(
+            error_summary.get_incorrect_names_by_namespace(graph, 'MESH'),
+            error_summary.get_incorrect_names(graph)['MESH'],
+        )
+
+        line_numbers = {}
+        for _, exc, _ in graph.warnings:
+            line_numbers.setdefault(str(exc), []).append(exc.line_number)
+        self.assertEqual(line_numbers, error_summary.group_errors(graph))
+
+    def test_names_including_errors(self):
+        """Test getting the names in the graph along with the incorrect names."""
+        with self.assertRaises(IndexError):
+            error_summary.get_names_including_errors(self.graph)
+
+        self.graph.namespace_url.update({'MESH': n(), 'bel': n()})
+        result = error_summary.get_names_including_errors(self.graph)
+        self.assertEqual(
+            {'0', '1', '2'} | error_summary.get_incorrect_names_by_namespace(self.graph, 'MESH'),
+            result['MESH'],
+        )
+        self.assertEqual(result['HGNC'], error_summary.get_names_including_errors_by_namespace(self.graph, 'HGNC'))
+
+    def test_index(self):
+        """Test the index is reused until warnings are added."""
+        index = error_summary.get_warning_index(self.graph)
+        self.assertIs(index, error_summary.get_warning_index(self.graph))
+
+        warning_ids = index.get_warning_ids_by_type(MissingNamespaceNameWarning, UndefinedAnnotationWarning)
+        self.assertEqual(
+            [
+                warning_id
+                for warning_id, (_, exc, _) in enumerate(self.graph.warnings)
+                if isinstance(exc, (MissingNamespaceNameWarning, UndefinedAnnotationWarning))
+            ],
+            warning_ids,
+        )
+        [(_, exc, _)] = index.get_warnings(index.line_number_warnings[5])
+        self.assertIsInstance(exc, NakedNameWarning)
+
+        self.graph.warnings.append((None, NakedNameWarning(5, 'g', 0, 'other'), {}))
+        index = error_summary.get_warning_index(self.graph)
+        self.assertEqual(2, len(index.line_number_warnings[5]))
+        self.assertEqual({'naked', 'other'}, error_summary.get_naked_names(self.graph))
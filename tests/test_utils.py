@@ -1,8 +1,14 @@
 # -*- coding: utf-8 -*-
 
+import itertools as itt
+import random
 import unittest
 
-from pybel_tools.utils import min_tanimoto_set_similarity
+from pybel_tools.utils import (
+    calculate_global_tanimoto_set_distances, calculate_minhash_signatures, calculate_tanimoto_set_distances,
+    calculate_tanimoto_similarity_matrix, find_similar_set_pairs, get_incidence_matrix, get_lsh_bands,
+    min_tanimoto_set_similarity, similarity_matrix_to_dict, tanimoto_set_similarity,
+)
 
 
 class TestMinSimilarity(unittest.TestCase):
@@ -26,3 +32,108 @@ class TestMinSimilarity(unittest.TestCase):
         a = {1, 2}
         b = {1, 2}
         self.assertEqual(1.0, min_tanimoto_set_similarity(a, b))
+
+
+class TestSimilarityMatrix(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.sets = {
+            f'set{i}': set(rng.sample(range(30), rng.randint(0, 8)))
+            for i in range(20)
+        }
+        self.sets['empty'] = set()
+
+    def test_incidence(self):
+        labels, elements, incidence = get_incidence_matrix({'a': [1, 2, 2], 'b': [3]})
+        self.assertEqual(['a', 'b'], labels)
+        self.assertEqual([1, 2, 3], elements)
+        self.assertEqual([[1, 1, 0], [0, 0, 1]], incidence.toarray().tolist())
+
+    def test_tanimoto(self):
+        """Test the similarities from a matrix product are the same as from pairs of sets."""
+        result = calculate_tanimoto_set_distances(self.sets)
+        for x, y in itt.product(self.sets, repeat=2):
+            expected = 1.0 if x == y else tanimoto_set_similarity(self.sets[x], self.sets[y])
+            self.assertAlmostEqual(expected, result[x][y], msg=f'{x}, {y}')
+
+        matrix, labels = calculate_tanimoto_similarity_matrix(self.sets, dense=False)
+        self.assertLess(matrix.nnz, len(labels) ** 2)
+        self.assertEqual(result, similarity_matrix_to_dict(matrix, labels))
+
+    def test_global_tanimoto(self):
+        """Test the global similarities use the sizes of the sets on the diagonal."""
+        universe = set(itt.chain.from_iterable(self.sets.values()))
+        result = calculate_global_tanimoto_set_distances(self.sets)
+        for x, y in itt.product(self.sets, repeat=2):
+            expected = 1.0 - len(self.sets[x] | self.sets[y]) / len(universe)
+            self.assertAlmostEqual(expected, result[x][y], msg=f'{x}, {y}')
+        self.assertEqual(1.0, result['empty']['empty'])
+
+
+def make_similar_sets(seed: int, count: int = 300):
+    """Make sets that are noisy copies of a few base sets, so there are pairs with all levels of similarity."""
+    rng = random.Random(seed)
+    bases = [set(rng.sample(range(5000), 60)) for _ in range(30)]
+    rv = {}
+    for i in range(count):
+        base = rng.choice(bases)
+        keep = rng.random()
+        rv[i] = {x for x in base if rng.random() < keep} | set(rng.sample(range(5000), rng.randint(0, 20)))
+    rv[count] = set()
+    return rv
+
+
+class TestMinHash(unittest.TestCase):
+    def test_signatures(self):
+        """Test signatures only depend on the elements of the sets and the seed."""
+        _, _, incidence = get_incidence_matrix({'a': [3, 1, 2], 'b': [1, 2, 3], 'c': [1, 2], 'd': []})
+        signatures = calculate_minhash_signatures(incidence, num_perm=64, seed=1)
+        self.assertEqual((4, 64), signatures.shape)
+        self.assertEqual(signatures[0].tolist(), signatures[1].tolist())
+        self.assertNotEqual(signatures[0].tolist(), signatures[2].tolist())
+        self.assertEqual(signatures.tolist(), calculate_minhash_signatures(incidence, num_perm=64, seed=1).tolist())
+        self.assertTrue((signatures[3] > signatures[0]).all())
+
+    def test_bands(self):
+        """Test lower thresholds get more bands of fewer rows."""
+        bands, rows = get_lsh_bands(0.5, 128)
+        self.assertLessEqual(bands * rows, 128)
+        self.assertLess(bands, get_lsh_bands(0.3, 128)[0])
+
+    def test_against_exact(self):
+        """Test the pairs found with MinHash and LSH against the exact similarities."""
+        threshold = 0.5
+        sets = make_similar_sets(seed=2)
+        matrix, labels = calculate_tanimoto_similarity_matrix(sets)
+        exact = {
+            (labels[i], labels[j]): matrix[i, j]
+            for i, j in itt.combinations(range(len(labels)), 2)
+        }
+
+        approximate = find_similar_set_pairs(sets, threshold=threshold, num_perm=256, seed=3)
+        self.assertTrue(all(i < j for i, j in approximate))
+        self.assertLessEqual(0.75, len(approximate) / sum(threshold <= value for value in exact.values()))
+        for pair, similarity in approximate.items():
+            self.assertLessEqual(threshold, similarity)
+            self.assertAlmostEqual(exact[pair], similarity, delta=0.15)
+
+        high = [pair for pair, value in exact.items() if threshold + 0.15 <= value]
+        self.assertLess(20, len(high))
+        self.assertLessEqual(0.95, sum(pair in approximate for pair in high) / len(high))
+
+        reordered = find_similar_set_pairs(
+            dict(reversed(list(sets.items()))), threshold=threshold, num_perm=256, seed=3,
+        )
+        self.assertEqual(approximate, {(j, i): similarity for (i, j), similarity in reordered.items()})
+
+    def test_bipartite(self):
+        """Test only pairs with one set from each collection are found when two are given."""
+        sets = make_similar_sets(seed=4)
+        left = {f'left{key}': value for key, value in sets.items() if key % 2}
+        right = {f'right{key}': value for key, value in sets.items() if not key % 2}
+        approximate = find_similar_set_pairs(left, right, threshold=0.6, seed=5)
+        self.assertLess(0, len(approximate))
+        for x, y in approximate:
+            self.assertIn(x, left)
+            self.assertIn(y, right)
+            self.assertAlmostEqual(tanimoto_set_similarity(left[x], right[y]), approximate[x, y], delta=0.2)